@@ -0,0 +1,134 @@
+"""
+Action Registry Module
+Maps action names to handlers with declared argument schemas; plugins register extra actions
+"""
+
+import importlib
+import json
+
+
+class ActionSpec:
+    """One registered action: its handler, the fields it needs and how to run it in a page batch"""
+
+    def __init__(self, name, handler, required=(), batch_step=None, settle=0.5, example=None,
+                 numeric=(), choices=None):
+        """
+        Args:
+            name (str): Action name used in AI plans, e.g. 'click'
+            handler: Async callable (BrowserActions, action dict) that performs the action
+            required (tuple): Action fields that must be present as strings ('selector', 'value', ...)
+            batch_step: Callable action dict -> step for the in-page batch script, or None if the
+                        action needs Playwright (input events, navigation, waiting)
+            settle (float): Seconds to pause after the action so the page can react
+            example (dict): Example action shown to the AI (plugin actions only)
+            numeric (tuple): Required fields that may also be numbers (e.g. the wait duration)
+            choices (dict): Field -> allowed values, compared case-insensitively
+        """
+        self.name = name
+        self.handler = handler
+        self.required = tuple(required)
+        self.batch_step = batch_step
+        self.settle = settle
+        self.example = example
+        self.numeric = tuple(numeric)
+        self.choices = choices or {}
+
+    def validate(self, action):
+        """
+        Check an action dictionary against the schema
+
+        Args:
+            action (dict): Action from the AI
+
+        Returns:
+            str: What is wrong with the action, or None if it is valid
+        """
+        for field in self.required:
+            value = action.get(field)
+            if field in self.numeric and isinstance(value, (int, float)) and not isinstance(value, bool):
+                continue  # e.g. "wait": 2000 instead of "2000"
+            if not isinstance(value, str):
+                return f"'{self.name}' needs a '{field}'"
+        for field, allowed in self.choices.items():
+            value = action.get(field)
+            if not isinstance(value, str) or value.lower() not in allowed:
+                return f"'{self.name}' {field} must be one of {', '.join(allowed)}"
+        return None
+
+
+class ActionRegistry:
+    """Table of the actions an ActionExecutor can run"""
+
+    def __init__(self):
+        self._specs = {}
+
+    def register(self, name, handler, required=(), batch_step=None, settle=0.5, example=None,
+                 numeric=(), choices=None):
+        """
+        Register (or replace) an action
+
+        Args:
+            name (str): Action name used in AI plans
+            handler: Async callable (BrowserActions, action dict)
+            required (tuple): Fields the action needs
+            batch_step: Callable action dict -> in-page batch step, for pure-DOM actions
+            settle (float): Seconds to pause after the action
+            example (dict): Example action shown to the AI
+            numeric (tuple): Required fields that may also be numbers
+            choices (dict): Field -> allowed values
+
+        Returns:
+            ActionSpec: The registered spec
+        """
+        spec = ActionSpec(name, handler, required, batch_step, settle, example, numeric, choices)
+        self._specs[name] = spec
+        return spec
+
+    def action(self, name, required=(), batch_step=None, settle=0.5, example=None, numeric=(), choices=None):
+        """Decorator form of register() for plugin handlers"""
+        def decorator(handler):
+            self.register(name, handler, required, batch_step, settle, example, numeric, choices)
+            return handler
+        return decorator
+
+    def get(self, name):
+        """
+        Look up an action
+
+        Args:
+            name (str): Action name
+
+        Returns:
+            ActionSpec: The spec, or None if no such action is registered
+        """
+        return self._specs.get(name)
+
+    def names(self):
+        """Registered action names"""
+        return list(self._specs)
+
+    def prompt_examples(self):
+        """
+        Example lines for actions that declared one, for the AI prompt
+
+        Returns:
+            list: JSON strings, one per example
+        """
+        return [json.dumps(spec.example) for spec in self._specs.values() if spec.example]
+
+    def load_plugins(self, modules):
+        """
+        Import plugin modules and let each register its actions
+
+        A plugin is a module with a register(registry) function.
+
+        Args:
+            modules (list): Importable module names
+        """
+        for module_name in modules:
+            try:
+                module = importlib.import_module(module_name)
+                module.register(self)
+                print(f"✓ Loaded action plugin: {module_name}")
+            except Exception as e:
+                print(f"⚠️ [ActionRegistry]: Plugin '{module_name}' not loaded - {str(e)}")
@@ -5,60 +5,124 @@ Each action is isolated for easy testing and modification
 """
 
 import asyncio
+import os
 from config import Config
+from readiness import ReadinessEngine
+from locator import LocatorResolver
+from capture import PageCapture, EXTENSION_FORMATS
+from action_registry import ActionRegistry
+from page_scripts import get_action_batch_script, get_link_target_script
+
+
+SCROLL_DIRECTIONS = ("up", "down")
+
+
+def scroll_pixels(direction):
+    """
+    Vertical scroll distance for a scroll action's direction
+    
+    Raises:
+        ValueError: If the direction isn't 'up' or 'down'
+    """
+    if not isinstance(direction, str) or direction.lower() not in SCROLL_DIRECTIONS:
+        raise ValueError(f"Scroll direction must be 'up' or 'down', not {direction!r}")
+    return 500 if direction.lower() == "down" else -500
 
 
 class BrowserActions:
     """Encapsulates all browser action methods"""
     
-    def __init__(self, page):
+    def __init__(self, page, readiness=None, locator=None):
         """
         Initialize with a Playwright page object
         
         Args:
             page: Playwright page instance
+            readiness (ReadinessEngine): Shared readiness engine, a private one if omitted
+            locator (LocatorResolver): Shared click target resolver, a private one if omitted
         """
         self.page = page
+        self.readiness = readiness or ReadinessEngine()
+        self.locator = locator or LocatorResolver()
+        self.capture = PageCapture(page)
+        # Optional async (url, ready) callable that navigates instead, e.g. WebManager.navigate
+        self.navigate_hook = None
+        # Optional async (url) callable that opens a clicked link's target itself and
+        # returns True, or False to let the click go ahead, e.g. WebManager.follow_link
+        self.follow_link_hook = None
     
-    async def navigate(self, url):
+    def bind(self, page):
+        """
+        Point these actions at another page (e.g. a promoted prefetch tab)
+        
+        Args:
+            page: Playwright page instance
+        """
+        self.page = page
+        self.capture = PageCapture(page)
+    
+    async def navigate(self, url, ready=None):
         """
         Navigate to a URL
         
         Args:
             url (str): The URL to navigate to
+            ready (str): Readiness strategy, defaults to Config.NAVIGATION_READINESS
             
         Raises:
             Exception: If navigation fails
         """
         try:
-            await self.page.goto(url)
-            await self.page.wait_for_load_state("networkidle")
+            if self.navigate_hook:
+                await self.navigate_hook(url, ready)
+            else:
+                await self.readiness.navigate(self.page, url, ready)
             print(f"✓ Navigated to: {url}")
         except Exception as e:
             raise Exception(f"ERROR [BrowserActions.navigate]: Failed to navigate to '{url}' - {str(e)}")
     
     async def click(self, selector):
         """
-        Click an element by selector or visible text
+        Click an element by selector, visible text, accessible name or label
         
         Args:
-            selector (str): CSS selector or visible text to click
+            selector (str): CSS selector, or the text/name/label of the element to click
             
         Raises:
             Exception: If click fails
         """
         try:
-            try:
-                # Try CSS selector first
-                await self.page.click(selector, timeout=Config.CLICK_TIMEOUT)
-                print(f"✓ Clicked: {selector}")
-            except:
-                # Fall back to text matching
-                await self.page.get_by_text(selector).first.click(timeout=Config.CLICK_TIMEOUT)
-                print(f"✓ Clicked text: {selector}")
+            # All strategies are tried in one in-page query, so text targets don't
+            # wait out a CSS timeout first
+            target, strategy = await self.locator.resolve(self.page, selector)
+            if self.follow_link_hook:
+                url = await self.page.evaluate(get_link_target_script(), target)
+                if url and await self.follow_link_hook(url):
+                    print(f"✓ Followed link ({strategy}): {selector} -> {url}")
+                    return
+            await self.page.click(target, timeout=Config.CLICK_TIMEOUT)
+            print(f"✓ Clicked ({strategy}): {selector}")
         except Exception as e:
             raise Exception(f"ERROR [BrowserActions.click]: Failed to click '{selector}' - {str(e)}")
     
+    async def _on_target(self, selector, act):
+        """
+        Run an action on a selector, healing the selector if Playwright's wait for it times out
+        
+        Args:
+            selector (str): Selector as the AI wrote it
+            act: Async callable taking the selector to act on
+        """
+        try:
+            await act(selector)
+        except Exception:
+            healed = await self.locator.heal(self.page, selector)
+            if healed is None:
+                raise
+            await act(healed)
+            return
+        await self.locator.remember(self.page, selector)
+    
     async def type_text(self, selector, text):
         """
         Type text into an input field
@@ -71,7 +135,7 @@ class BrowserActions:
             Exception: If typing fails
         """
         try:
-            await self.page.fill(selector, text)
+            await self._on_target(selector, lambda target: self.page.fill(target, text, timeout=Config.CLICK_TIMEOUT))
             print(f"✓ Typed into {selector}: {text[:50]}{'...' if len(text) > 50 else ''}")
         except Exception as e:
             raise Exception(f"ERROR [BrowserActions.type_text]: Failed to type into '{selector}' - {str(e)}")
@@ -93,6 +157,26 @@ class BrowserActions:
         except Exception as e:
             raise Exception(f"ERROR [BrowserActions.wait]: Failed to wait - {str(e)}")
     
+    async def run_batch(self, steps):
+        """
+        Run pure-DOM steps (scroll, check, select) in a single page call
+        
+        Args:
+            steps (list): Steps for the action batch script
+            
+        Returns:
+            dict: {done, error}, how many steps ran and why the next one failed
+            
+        Raises:
+            Exception: If the page call itself fails (e.g. the page navigated away)
+        """
+        try:
+            result = await self.page.evaluate(get_action_batch_script(), steps)
+            print(f"✓ Ran {result['done']}/{len(steps)} steps in one page call")
+            return result
+        except Exception as e:
+            raise Exception(f"ERROR [BrowserActions.run_batch]: Failed to run batch - {str(e)}")
+    
     async def scroll(self, direction):
         """
         Scroll the page up or down
@@ -104,7 +188,7 @@ class BrowserActions:
             Exception: If scroll fails
         """
         try:
-            pixels = 500 if direction.lower() == "down" else -500
+            pixels = scroll_pixels(direction)
             await self.page.evaluate(f"window.scrollBy(0, {pixels})")
             print(f"✓ Scrolled {direction}")
         except Exception as e:
@@ -137,7 +221,7 @@ class BrowserActions:
             Exception: If hover fails
         """
         try:
-            await self.page.hover(selector)
+            await self._on_target(selector, lambda target: self.page.hover(target, timeout=Config.CLICK_TIMEOUT))
             print(f"✓ Hovered over: {selector}")
         except Exception as e:
             raise Exception(f"ERROR [BrowserActions.hover]: Failed to hover over '{selector}' - {str(e)}")
@@ -212,13 +296,16 @@ class BrowserActions:
         Take a screenshot of the page
         
         Args:
-            filename (str): Path to save the screenshot
+            filename (str): Path to save the screenshot (.jpg, .webp or .png picks the format)
             
         Raises:
             Exception: If screenshot fails
         """
         try:
-            await self.page.screenshot(path=filename)
+            extension = os.path.splitext(filename)[1].lower()
+            data = await self.capture.capture(format=EXTENSION_FORMATS.get(extension, Config.CAPTURE_FORMAT))
+            with open(filename, "wb") as f:
+                f.write(data)
             print(f"✓ Screenshot saved: {filename}")
         except Exception as e:
             raise Exception(f"ERROR [BrowserActions.screenshot]: Failed to take screenshot - {str(e)}")
@@ -231,7 +318,9 @@ class BrowserActions:
             Exception: If navigation fails
         """
         try:
-            await self.page.go_back()
+            # Return on commit and let the readiness strategy decide when the page is usable
+            await self.page.go_back(wait_until="commit", timeout=Config.NAVIGATION_TIMEOUT)
+            await self.readiness.wait(self.page)
             print("✓ Navigated back")
         except Exception as e:
             raise Exception(f"ERROR [BrowserActions.go_back]: Failed to go back - {str(e)}")
@@ -244,7 +333,9 @@ class BrowserActions:
             Exception: If navigation fails
         """
         try:
-            await self.page.go_forward()
+            # Return on commit and let the readiness strategy decide when the page is usable
+            await self.page.go_forward(wait_until="commit", timeout=Config.NAVIGATION_TIMEOUT)
+            await self.readiness.wait(self.page)
             print("✓ Navigated forward")
         except Exception as e:
             raise Exception(f"ERROR [BrowserActions.go_forward]: Failed to go forward - {str(e)}")
@@ -257,7 +348,9 @@ class BrowserActions:
             Exception: If reload fails
         """
         try:
-            await self.page.reload()
+            # Return on commit and let the readiness strategy decide when the page is usable
+            await self.page.reload(wait_until="commit", timeout=Config.NAVIGATION_TIMEOUT)
+            await self.readiness.wait(self.page)
             print("✓ Page reloaded")
         except Exception as e:
             raise Exception(f"ERROR [BrowserActions.reload]: Failed to reload page - {str(e)}")
@@ -361,94 +454,212 @@ class BrowserActions:
         """Return a list of all available action methods"""
         return [method for method in dir(self) if callable(getattr(self, method)) and not method.startswith("_")]
 
+# Built-in actions; plugins add theirs through ACTIONS.register() or Config.ACTION_PLUGINS
+ACTIONS = ActionRegistry()
+ACTIONS.register("navigate", lambda actions, a: actions.navigate(a["value"], a.get("ready")), required=("value",))
+ACTIONS.register("click", lambda actions, a: actions.click(a["selector"]), required=("selector",))
+# type stays with Playwright: it waits for late inputs and heals changed selectors
+ACTIONS.register("type", lambda actions, a: actions.type_text(a["selector"], a["value"]), required=("selector", "value"))
+ACTIONS.register("wait", lambda actions, a: actions.wait(a["value"]), required=("value",), numeric=("value",))
+ACTIONS.register("scroll", lambda actions, a: actions.scroll(a["value"]), required=("value",),
+                 choices={"value": SCROLL_DIRECTIONS},
+                 batch_step=lambda a: {"op": "scroll", "pixels": scroll_pixels(a["value"])})
+ACTIONS.register("hover", lambda actions, a: actions.hover(a["selector"]), required=("selector",))
+ACTIONS.register("press_key", lambda actions, a: actions.press_key(a["value"]), required=("value",))
+ACTIONS.register("select", lambda actions, a: actions.select_option(a["selector"], a["value"]), required=("selector", "value"),
+                 batch_step=lambda a: {"op": "select", "selector": a["selector"], "value": a["value"]})
+ACTIONS.register("check", lambda actions, a: actions.check_checkbox(a["selector"]), required=("selector",),
+                 batch_step=lambda a: {"op": "check", "selector": a["selector"], "checked": True})
+ACTIONS.register("uncheck", lambda actions, a: actions.uncheck_checkbox(a["selector"]), required=("selector",),
+                 batch_step=lambda a: {"op": "check", "selector": a["selector"], "checked": False})
+ACTIONS.register("back", lambda actions, a: actions.go_back())
+ACTIONS.register("forward", lambda actions, a: actions.go_forward())
+ACTIONS.register("reload", lambda actions, a: actions.reload())
+ACTIONS.register("screenshot", lambda actions, a: actions.screenshot(a["value"]), required=("value",))
+ACTIONS.load_plugins(Config.ACTION_PLUGINS)
+
+
 class ActionExecutor:
     """Executes a list of actions from the AI"""
     
-    def __init__(self, browser_actions):
+    def __init__(self, browser_actions, registry=None):
         """
         Initialize with a BrowserActions instance
         
         Args:
             browser_actions (BrowserActions): Instance of BrowserActions
+            registry (ActionRegistry): Actions to dispatch to, defaults to ACTIONS
         """
         self.actions = browser_actions
+        self.registry = registry or ACTIONS
+        self.batches = 0
+        self.batched_actions = 0
     
     async def execute(self, action_list):
         """
         Execute a list of actions from the AI
         
+        Consecutive pure-DOM actions run in one page call; a step that fails there
+        is retried through its regular handler, which waits for the element.
+        
         Args:
             action_list (list): List of action dictionaries
             
         Returns:
             bool: True if all actions succeeded, False otherwise
         """
-        for i, action in enumerate(action_list, 1):
-            action_type = action.get("action")
-            selector = action.get("selector")
-            value = action.get("value")
-            description = action.get("description", "")
+        total = len(action_list)
+        if not await self._execute_run(action_list, 1, total):
+            return False
+        
+        print(f"\n✓ All {total} actions completed successfully")
+        return True
+    
+    async def execute_stream(self, action_stream):
+        """
+        Execute actions as they arrive from a streaming AI response
+        
+        Batchable actions are held back until an action that isn't arrives (or
+        the stream ends), then run together like in execute().
+        
+        Args:
+            action_stream: Async iterator of action dictionaries
             
-            print(f"\n[{i}/{len(action_list)}] {description}")
+        Returns:
+            bool: True if all actions succeeded, False otherwise
             
-            try:
-                # Route to appropriate action method
-                if action_type == "error":
-                    print(f"✗ AI reported error: {description}")
-                    return False
-                
-                elif action_type == "navigate":
-                    await self.actions.navigate(value)
-                
-                elif action_type == "click":
-                    await self.actions.click(selector)
-                
-                elif action_type == "type":
-                    await self.actions.type_text(selector, value)
-                
-                elif action_type == "wait":
-                    await self.actions.wait(value)
-                
-                elif action_type == "scroll":
-                    await self.actions.scroll(value)
-                
-                elif action_type == "hover":
-                    await self.actions.hover(selector)
-                
-                elif action_type == "press_key":
-                    await self.actions.press_key(value)
-                
-                elif action_type == "select":
-                    await self.actions.select_option(selector, value)
-                
-                elif action_type == "check":
-                    await self.actions.check_checkbox(selector)
-                
-                elif action_type == "uncheck":
-                    await self.actions.uncheck_checkbox(selector)
-                
-                elif action_type == "back":
-                    await self.actions.go_back()
-                
-                elif action_type == "forward":
-                    await self.actions.go_forward()
-                
-                elif action_type == "reload":
-                    await self.actions.reload()
-                
-                elif action_type == "screenshot":
-                    await self.actions.screenshot(value)
-                
-                else:
-                    print(f"✗ Unknown action type: {action_type}")
+        Raises:
+            Exception: If the stream itself fails (e.g. the AI call errors)
+        """
+        count = 0
+        pending = []  # batchable actions waiting for the rest of their run
+        try:
+            async for action in action_stream:
+                count += 1
+                if self._batch_length([action], 0):
+                    pending.append(action)
+                    continue
+                if not await self._execute_run(pending + [action], count - len(pending)):
                     return False
-                
-                # Small delay between actions for stability
-                await asyncio.sleep(0.5)
-                
-            except Exception as e:
-                print(f"✗ {str(e)}")
+                pending = []
+            if not await self._execute_run(pending, count - len(pending) + 1):
                 return False
+        finally:
+            # Stop generation early if an action failed
+            await action_stream.aclose()
         
-        print(f"\n✓ All {len(action_list)} actions completed successfully")
-        return True
\ No newline at end of file
+        print(f"\n✓ All {count} actions completed successfully")
+        return True
+    
+    async def _execute_run(self, action_list, first, total=None):
+        """
+        Execute actions in order, running consecutive batchable ones in one page call
+        
+        Args:
+            action_list (list): Action dictionaries
+            first (int): 1-based position of the first one in the plan
+            total (int): Plan length, or None while it is still streaming
+            
+        Returns:
+            bool: True if all actions succeeded, False otherwise
+        """
+        i = 0
+        while i < len(action_list):
+            run = self._batch_length(action_list, i)
+            if run > 1:
+                done = await self._execute_batch(action_list[i:i + run], first + i, total)
+                i += done
+                if done == run:
+                    continue
+            action = action_list[i]
+            print(f"\n[{first + i}{f'/{total}' if total else ''}] {action.get('description', '')}")
+            if not await self._execute_action(action):
+                return False
+            i += 1
+        return True
+    
+    def _batch_length(self, action_list, start):
+        """Number of consecutive batchable actions beginning at start"""
+        if not Config.ACTION_BATCHING:
+            return 0
+        end = start
+        while end < len(action_list):
+            spec = self.registry.get(action_list[end].get("action"))
+            if spec is None or spec.batch_step is None or spec.validate(action_list[end]):
+                break
+            end += 1
+        return end - start
+    
+    async def _execute_batch(self, batch, first, total):
+        """
+        Run a run of pure-DOM actions in one page call
+        
+        Args:
+            batch (list): Consecutive batchable actions
+            first (int): 1-based position of the first one in the plan
+            total (int): Plan length, or None while it is still streaming
+            
+        Returns:
+            int: How many of the actions completed (the next one is retried singly)
+        """
+        print(f"\n[{first}-{first + len(batch) - 1}{f'/{total}' if total else ''}] " + "; ".join(a.get("description", a["action"]) for a in batch))
+        steps = [self.registry.get(a["action"]).batch_step(a) for a in batch]
+        try:
+            result = await self.actions.run_batch(steps)
+        except Exception as e:
+            print(f"⚠️ {str(e)}")
+            return 0
+        if result["error"]:
+            print(f"→ Step {first + result['done']} retried on its own: {result['error']}")
+        if result["done"]:
+            self.batches += 1
+            self.batched_actions += result["done"]
+            await asyncio.sleep(max(self.registry.get(a["action"]).settle for a in batch[:result["done"]]))
+        return result["done"]
+    
+    async def _execute_action(self, action):
+        """
+        Execute a single action dictionary
+        
+        Args:
+            action (dict): Action from the AI
+            
+        Returns:
+            bool: True if the action succeeded, False otherwise
+        """
+        action_type = action.get("action")
+        
+        if action_type == "error":
+            print(f"✗ AI reported error: {action.get('description', '')}")
+            return False
+        
+        spec = self.registry.get(action_type)
+        if spec is None:
+            print(f"✗ Unknown action type: {action_type}")
+            return False
+        problem = spec.validate(action)
+        if problem:
+            print(f"✗ Invalid action: {problem}")
+            return False
+        
+        try:
+            await spec.handler(self.actions, action)
+            # Small delay between actions for stability
+            await asyncio.sleep(spec.settle)
+            return True
+            
+        except Exception as e:
+            print(f"✗ {str(e)}")
+            return False
+    
+    def stats(self):
+        """
+        Get batching counters
+        
+        Returns:
+            dict: Page calls that ran several actions and how many actions they covered
+        """
+        return {
+            "batches": self.batches,
+            "batched_actions": self.batched_actions
+        }
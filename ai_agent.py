@@ -3,60 +3,81 @@ AI Agent Module
 Handles all interactions with Google's Gemini API
 """
 
+import asyncio
 import json
-import google.generativeai as genai
+import time
+from collections import deque
 from config import Config
+from llm_client import create_backend
+from cache import PersistentLRUCache, normalize_command
+from element_index import serialize_elements
+from prompt_builder import PromptBuilder, PromptSection, PromptStats
+from stream_parser import ActionStreamParser
+from site_resolver import SiteResolver
+from actions import ACTIONS
 
 class AIAgent:
     """Handles AI-powered command interpretation and action generation"""
     
     def __init__(self):
-        """Initialize the AI agent with Gemini"""
+        """Initialize the AI agent with the configured LLM backend"""
         try:
-            genai.configure(api_key=Config.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel("gemini-2.5-flash-lite")
+            self.llm = create_backend()
+            self.nav_cache = PersistentLRUCache(
+                "navigate_url",
+                max_entries=Config.NAV_CACHE_SIZE,
+                ttl=Config.NAV_CACHE_TTL,
+                db_path=Config.CACHE_DB_PATH
+            )
+            self.site_resolver = SiteResolver()
+            self.prompt_builder = PromptBuilder(Config.PROMPT_TOKEN_BUDGET)
+            self.prompt_stats = PromptStats()
+            self.history = deque(maxlen=Config.PROMPT_HISTORY_SIZE)
             print("✓ AI Agent initialized successfully")
         except Exception as e:
-            raise Exception(f"ERROR [AIAgent.__init__]: Failed to initialize Gemini - {str(e)}")
+            raise Exception(f"ERROR [AIAgent.__init__]: Failed to initialize {Config.LLM_BACKEND} backend - {str(e)}")
         
     async def navigate_url(self, user_command):
         """
         Interprets user command to find a target URL.
         Returns: {'url': str or None, 'description': str}
         """
-        prompt = f"""
-        You are a navigation assistant for a simplified web browser.
-        Analyze the user's command and extract a target URL.
+        # Known sites, bookmarks and history resolve offline
+        local = self.site_resolver.resolve(user_command)
+        if local is not None:
+            print(f"✓ Resolved locally ({local['source']}, {local['confidence']}): {local['url']}")
+            return {"url": local["url"], "description": local["description"]}
         
-        Rules:
-        1. If the user mentions a specific website (e.g., "Google", "YouTube", "NUS"), 
-           provide the full HTTPS URL.
-        2. If the user command is vague or doesn't specify a destination, 
-           return null for the url.
-        3. Provide a brief, friendly description of what you are doing.
-
-        User Command: "{user_command}"
+        cache_key = normalize_command(user_command)
+        cached = self.nav_cache.get(cache_key)
+        if cached is not None:
+            print(f"✓ Navigation cache hit: {user_command} -> {cached['url']}")
+            return cached
 
-        Return ONLY a JSON object in this format:
-        {{"url": "https://example.com", "description": "Navigating to example"}}
-        """
+        prompt, report = self._build_navigate_prompt(user_command)
         try:
-            print(f"→ Sending to Gemini for URL navigation: {user_command}")
-            # Using generation_config to enforce JSON mode
-            response = self.model.generate_content(
-                prompt,
-                generation_config={"response_mime_type": "application/json"}
-            )
+            print(f"→ Sending to {self.llm.name} for URL navigation: {user_command}")
+            # JSON mode enforces a parseable response
+            started = time.perf_counter()
+            response_text = await self.llm.generate(prompt, json_mode=True)
+            self.prompt_stats.record("navigate", report, time.perf_counter() - started)
             
             # Parse the JSON string from Gemini into a Python dictionary
-            result = json.loads(response.text)
-            print(f"✓ Gemini URL response: {result}")
+            result = json.loads(response_text)
+            print(f"✓ {self.llm.name} URL response: {result}")
             # Safety check: Ensure the keys exist
-            return {
+            nav_data = {
                 "url": result.get("url"),
                 "description": result.get("description", "Processing your request.")
             }
+            # Only resolved destinations are worth remembering
+            if nav_data["url"]:
+                self.nav_cache.set(cache_key, nav_data)
+            return nav_data
 
+        except asyncio.TimeoutError:
+            print(f"⚠️ [AIAgent]: URL navigation timed out after {Config.LLM_TIMEOUT}s")
+            return {"url": None, "description": "Sorry, that took too long. Please try again."}
         except Exception as e:
             print(f"⚠️ [AIAgent]: Error interpreting command: {e}")
             return {"url": None, "description": "I'm sorry, I couldn't understand that command."}
@@ -67,7 +88,7 @@ class AIAgent:
         
         Args:
             command (str): User's natural language command
-            page_context (dict): Current page information (url, title, html)
+            page_context (dict): Current page information (url, title, elements)
             
         Returns:
             list: List of action dictionaries
@@ -76,34 +97,105 @@ class AIAgent:
             Exception: If Gemini API call fails
         """
         try:
-            prompt = self._build_prompt(command, page_context)
+            prompt, report = self._build_prompt(command, page_context)
             
-            print(f"→ Sending to Gemini: {command}")
-            response = self.model.generate_content(prompt)
+            print(f"→ Sending to {self.llm.name}: {command}")
+            started = time.perf_counter()
+            response_text = await self.llm.generate(prompt)
+            self.prompt_stats.record("interpret", report, time.perf_counter() - started)
             
             # Parse JSON response
-            actions = self._parse_response(response.text)
+            actions = self._parse_response(response_text)
             print(f"✓ Received {len(actions)} actions from AI")
             
+            self._remember(command, actions)
             return actions
             
+        except asyncio.TimeoutError:
+            raise Exception(f"ERROR [AIAgent.interpret_command]: Gemini API call timed out after {Config.LLM_TIMEOUT}s")
         except json.JSONDecodeError as e:
             raise Exception(f"ERROR [AIAgent.interpret_command]: Failed to parse AI response as JSON - {str(e)}")
         except Exception as e:
             raise Exception(f"ERROR [AIAgent.interpret_command]: Gemini API call failed - {str(e)}")
     
-    def _build_prompt(self, command, context):
-        """Build the prompt for Gemini"""
-        return f"""You are a browser automation assistant. Given a user command and page context, return a JSON array of actions.
-
-Current Page:
-URL: {context['url']}
-Title: {context['title']}
+    async def stream_command(self, command, page_context):
+        """
+        Stream actions for a command as Gemini generates them
+        
+        Args:
+            command (str): User's natural language command
+            page_context (dict): Current page information (url, title, elements)
+            
+        Yields:
+            dict: Each action as soon as its JSON object is complete
+            
+        Raises:
+            Exception: If the Gemini call fails or the response is malformed
+        """
+        prompt, report = self._build_prompt(command, page_context)
+        parser = ActionStreamParser()
+        actions = []
+        
+        print(f"→ Streaming from {self.llm.name}: {command}")
+        started = time.perf_counter()
+        try:
+            async for chunk in self.llm.stream(prompt):
+                for action in parser.feed(chunk):
+                    if not actions:
+                        report["first_action_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                    actions.append(action)
+                    yield action
+            parser.close()
+        except asyncio.TimeoutError:
+            raise Exception(f"ERROR [AIAgent.stream_command]: Gemini stream timed out after {Config.LLM_TIMEOUT}s")
+        self.prompt_stats.record("interpret_stream", report, time.perf_counter() - started)
+        print(f"✓ Streamed {len(actions)} actions from AI")
+        self._remember(command, actions)
+    
+    def _remember(self, command, actions):
+        """Keep a short summary of a command and its plan for later prompts"""
+        steps = "; ".join(action.get("description") or action.get("action", "") for action in actions)
+        self.history.append(f'"{command}" -> {steps}')
+    
+    def _history_section(self):
+        """Recent commands, newest first so trimming drops the oldest (lowest trim priority)"""
+        if not self.history:
+            return PromptSection("history", "", priority=10)
+        return PromptSection("history", "Recent commands (newest first):\n" + "\n".join(reversed(self.history)), priority=10)
+    
+    def _build_navigate_prompt(self, user_command):
+        """Build the URL navigation prompt and its size report"""
+        return self.prompt_builder.build([
+            PromptSection("instructions", """You are a navigation assistant for a simplified web browser.
+Analyze the user's command and extract a target URL.
 
-Page HTML (simplified):
-{context['html'][:3000]}
+Rules:
+1. If the user mentions a specific website (e.g., "Google", "YouTube", "NUS"),
+   provide the full HTTPS URL.
+2. If the user command is vague or doesn't specify a destination,
+   return null for the url.
+3. Provide a brief, friendly description of what you are doing.""", required=True),
+            self._history_section(),
+            PromptSection("command", f'''User Command: "{user_command}"
 
-User Command: "{command}"
+Return ONLY a JSON object in this format:
+{{"url": "https://example.com", "description": "Navigating to example"}}''', required=True)
+        ])
+    
+    def _build_prompt(self, command, context):
+        """Build the action prompt for Gemini and its size report"""
+        # Actions added by plugins are listed after the built-in examples
+        extra_actions = "".join(f"\n  {example}," for example in ACTIONS.prompt_examples())
+        return self.prompt_builder.build([
+            PromptSection("instructions", "You are a browser automation assistant. Given a user command "
+                          "and page context, return a JSON array of actions.", required=True),
+            PromptSection("page", f"""Current Page:
+URL: {context['url']}
+Title: {context['title']}""", priority=90),
+            PromptSection("elements", f"""Interactive elements ([index] role "name" -> selector @x,y width x height):
+{serialize_elements(context['elements'], self.prompt_builder.budget)}""", priority=50),
+            self._history_section(),
+            PromptSection("command", f'''User Command: "{command}"
 
 Return ONLY a JSON array with this structure:
 [
@@ -111,17 +203,19 @@ Return ONLY a JSON array with this structure:
   {{"action": "click", "selector": "button.submit", "description": "Click submit button"}},
   {{"action": "type", "selector": "input[name='search']", "value": "search text", "description": "Type in search box"}},
   {{"action": "scroll", "value": "down", "description": "Scroll down"}},
-  {{"action": "wait", "value": "2000", "description": "Wait 2 seconds"}},
+  {{"action": "wait", "value": "2000", "description": "Wait 2 seconds"}},{extra_actions}
   {{"action": "error", "description": "Cannot complete - explain why"}}
 ]
 
 Rules:
-- Use CSS selectors or visible text for elements
-- For clicks without clear selector, use visible button/link text
+- Use the selector shown after "->" for the element you want
+- For clicks on elements not in the list, use visible button/link text
 - Scroll value can be "up" or "down"
 - Wait value in milliseconds
+- Navigate may add "ready": "quiescent" for pages that render late, or "load" when the whole page is needed
 - Return error action if command is unclear or impossible
-- ONLY return valid JSON, no markdown, no explanation"""
+- ONLY return valid JSON, no markdown, no explanation''', required=True)
+        ])
     
     def _parse_response(self, response_text):
         """Parse and validate Gemini's response"""
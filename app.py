@@ -6,7 +6,7 @@ Handles all HTTP routes and coordinates with BrowserController
 import asyncio
 import time
 from threading import Thread
-from flask import Flask, request, jsonify, make_response, redirect, url_for
+from flask import Flask, Response, request, jsonify, make_response, redirect, url_for
 from flask_cors import CORS
 
 from config import Config
@@ -15,6 +15,9 @@ from ai_agent import AIAgent
 from web_manager import WebManager
 from html_templates import get_landing_page_html, get_select_interact_page_html, get_browser_page_html
 from voice_agent import VoiceAssistant
+from single_flight import SingleFlight
+from cache import normalize_command
+from resource_profiles import profile_for_mode
 
 # Validate configuration
 try:
@@ -33,6 +36,7 @@ voice_agent = VoiceAssistant()
 ai_agent = AIAgent()
 web_manager = WebManager()
 controller = BrowserController(ai_agent=ai_agent, web_manager=web_manager)
+navigation_flight = SingleFlight(Config.COMMAND_COALESCE_WINDOW)
 
 @app.before_request
 def handle_preflight():
@@ -61,13 +65,42 @@ def get_current_state():
     # Simply tell the browser which page it SHOULD be on
     return jsonify({"current_page": Config.PAGE})
 
+@app.route('/stats')
+def get_stats():
+    """Report cache and performance counters"""
+    return jsonify({
+        "nav_cache": ai_agent.nav_cache.stats(),
+        "plan_cache": controller.plan_cache.stats(),
+        "fast_path": controller.intent_parser.stats(),
+        "site_resolver": ai_agent.site_resolver.stats(),
+        "prompts": ai_agent.prompt_stats.summary(),
+        "element_snapshots": web_manager.snapshot_stats,
+        "readiness": web_manager.readiness.stats(),
+        "locator": web_manager.locator.stats(),
+        "resources": web_manager.resources.stats(),
+        "snapshots": web_manager.snapshots.stats(),
+        "content_extraction": web_manager.content_extractor.stats(),
+        "capture": web_manager.capture.stats() if web_manager.capture else None,
+        "screencast": web_manager.screencast.stats() if web_manager.screencast else None,
+        "profile": web_manager.profile.stats() if web_manager.profile else None,
+        "prefetch": web_manager.prefetch.stats() if web_manager.prefetch else None,
+        "actions": web_manager.action_executor.stats() if web_manager.action_executor else None,
+        "sessions": web_manager.pool.stats() if web_manager.pool else None,
+        "coalescing": {
+            "commands": controller.command_flight.stats(),
+            "navigation": navigation_flight.stats()
+        }
+    })
+
 @app.route('/execute', methods=['POST'])
 def execute_command():
     """
     Execute a natural language command
     
     Expected JSON body:
-        {"command": "your command here"}
+        {"command": "your command here", "session": "optional session id"}
+    
+    Commands with a session run in that session's own isolated browser context.
     
     Returns:
         JSON response with success status and message
@@ -88,12 +121,14 @@ def execute_command():
                 "message": "Empty command"
             }), 400
         
-        print(f"\n> Command received: {command}")
+        session_id = data.get('session')
+        print(f"\n> Command received: {command}" + (f" (session {session_id})" if session_id else ""))
         
         # Execute command asynchronously
         async def run_command():
-            return await controller.execute_command(command)
+            return await controller.execute_command(command, session_id)
         
+        controller.web_manager.ensure_ready()
         future = asyncio.run_coroutine_threadsafe(
             run_command(), 
             controller.web_manager.loop
@@ -108,6 +143,8 @@ def execute_command():
         })
         
     except asyncio.TimeoutError:
+        # Cancel the coroutine so its pending LLM call is dropped too
+        future.cancel()
         error_msg = f"ERROR [app.execute_command]: Command timed out after {Config.COMMAND_TIMEOUT}s"
         print(error_msg)
         return jsonify({
@@ -123,6 +160,141 @@ def execute_command():
             "message": str(e)
         }), 500
 
+@app.route('/sessions/<session_id>', methods=['DELETE'])
+def close_session(session_id):
+    """Close a pooled browser session"""
+    try:
+        if not controller.web_manager.ready.is_set():
+            return jsonify({"success": False, "message": "No such session"}), 404
+        
+        future = asyncio.run_coroutine_threadsafe(
+            controller.close_session(session_id),
+            controller.web_manager.loop
+        )
+        status = future.result(timeout=Config.RESTORE_TIMEOUT)
+        if status is None:
+            return jsonify({"success": False, "message": "No such session"}), 404
+        return jsonify({
+            "success": True,
+            "status": status,
+            "message": "Session closed" if status == "closed" else "Session closes when its running command finishes"
+        }), 200 if status == "closed" else 202
+    except Exception as e:
+        error_msg = f"ERROR [app.close_session]: {str(e)}"
+        print(error_msg)
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 500
+
+@app.route('/resources', methods=['POST'])
+def set_resource_profile():
+    """
+    Switch the resource interception profile at runtime
+    
+    Expected JSON body:
+    {
+        "profile": "text-only"
+    }
+    """
+    try:
+        data = request.json
+        if not data or 'profile' not in data:
+            return jsonify({
+                "success": False,
+                "message": "No profile provided"
+            }), 400
+        
+        profile = data.get('profile', '').strip()
+        
+        apply_resource_profile(profile)
+        return jsonify({"success": True, "message": f"Resource profile set to {profile}"})
+    except Exception as e:
+        error_msg = f"ERROR [app.set_resource_profile]: {str(e)}"
+        print(error_msg)
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+
+def apply_resource_profile(profile):
+    """Switch the resource profile on the browser loop, or directly if it hasn't started"""
+    if web_manager.loop is None:
+        asyncio.run(controller.set_resource_profile(profile))
+        return
+    future = asyncio.run_coroutine_threadsafe(
+        controller.set_resource_profile(profile),
+        web_manager.loop
+    )
+    future.result(timeout=Config.RESTORE_TIMEOUT)
+
+@app.route('/capture')
+def capture_page():
+    """
+    Capture the main page into memory and return the image
+    
+    Query parameters (all optional): format (jpeg, webp, png), quality (0-100),
+    scale (e.g. 0.5), full_page (1 for the whole page)
+    """
+    try:
+        options = {
+            "format": request.args.get('format'),
+            "quality": request.args.get('quality', type=int),
+            "scale": request.args.get('scale', type=float),
+            "full_page": request.args.get('full_page') == '1'
+        }
+        controller.web_manager.ensure_ready()
+        future = asyncio.run_coroutine_threadsafe(
+            controller.web_manager.capture_screenshot(**options),
+            controller.web_manager.loop
+        )
+        data = future.result(timeout=Config.COMMAND_TIMEOUT)
+        image_format = options["format"] or Config.CAPTURE_FORMAT
+        return Response(data, mimetype=f"image/{image_format}")
+    except Exception as e:
+        error_msg = f"ERROR [app.capture_page]: {str(e)}"
+        print(error_msg)
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 500
+
+@app.route('/screencast')
+def screencast():
+    """Stream the main page as MJPEG at Config.SCREENCAST_FPS for monitoring"""
+    try:
+        controller.web_manager.ensure_ready()
+        loop = controller.web_manager.loop
+        stream = asyncio.run_coroutine_threadsafe(
+            controller.web_manager.start_screencast(),
+            loop
+        ).result(timeout=Config.COMMAND_TIMEOUT)
+    except Exception as e:
+        error_msg = f"ERROR [app.screencast]: {str(e)}"
+        print(error_msg)
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 500
+    
+    def frames():
+        """Yield each newer frame as one multipart part until the viewer disconnects"""
+        frame_id = 0
+        try:
+            while stream.running:
+                frame_id, frame = asyncio.run_coroutine_threadsafe(
+                    stream.next_frame(frame_id, timeout=5),
+                    loop
+                ).result(timeout=10)
+                if frame is None:
+                    continue
+                yield (b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                       + str(len(frame)).encode() + b"\r\n\r\n" + frame + b"\r\n")
+        finally:
+            asyncio.run_coroutine_threadsafe(controller.web_manager.stop_screencast(), loop)
+    
+    return Response(frames(), mimetype="multipart/x-mixed-replace; boundary=frame")
+
 @app.route('/simplify', methods=['POST'])
 def simplify_page():
     """
@@ -135,6 +307,7 @@ def simplify_page():
         async def run_simplify():
             return await controller.simplify_page()
         
+        controller.web_manager.ensure_ready()
         future = asyncio.run_coroutine_threadsafe(
             run_simplify(), 
             controller.web_manager.loop
@@ -175,6 +348,7 @@ def restore_page():
         async def run_restore():
             return await controller.restore_page()
         
+        controller.web_manager.ensure_ready()
         future = asyncio.run_coroutine_threadsafe(
             run_restore(), 
             controller.web_manager.loop
@@ -247,17 +421,26 @@ async def handle_browse_async(cmd):
     
     url = nav_data['url']
     
-    # Check if browser page is ready
-    if controller.web_manager.page is not None:
-        # Navigate to new URL
-        await controller.navigate_to(url)
-        return
+    # Start the browser if the page isn't ready yet
+    if controller.web_manager.page is None:
+        await controller.start_browser()
     
-    # Start new browser and navigate
-    await controller.start_browser()
     await controller.navigate_to(url)
+    
+    # Remember the visit so "go to <site>" resolves offline next time
+    page = controller.web_manager.page
+    ai_agent.site_resolver.record_visit(page.url, await page.title())
 
 def process_navigation(command, voice=False):
+    """
+    Centralized entry point for both voice and button inputs.
+    Duplicate commands on the same page (repeated recognition, double presses)
+    share one run.
+    """
+    key = (Config.PAGE, normalize_command(command))
+    navigation_flight.run(key, lambda: _process_navigation(command, voice))
+
+def _process_navigation(command, voice=False):
     """Centralized logic for both voice and button inputs."""
     print(f"→ Processing navigation command: {command} (voice={voice})")
 
@@ -265,51 +448,24 @@ def process_navigation(command, voice=False):
     
     # Handle browsing mode
     if current_page == "/browser":
-        # Check if event loop exists and is running
-        if controller.web_manager.loop is not None and controller.web_manager.loop.is_running():
-            # Browser loop already running, just navigate
-            print("→ Using existing browser event loop")
-            future = asyncio.run_coroutine_threadsafe(
-                handle_browse_async(command),
-                controller.web_manager.loop
-            )
-            try:
-                future.result(timeout=15)
-            except Exception as e:
-                print(f"ERROR [process_navigation]: Navigation failed - {str(e)}")
-                voice_agent.speak("Failed to navigate")
-        else:
-            # Need to create new event loop and start browser
-            print("→ Creating new browser event loop")
-            controller.web_manager.loop = asyncio.new_event_loop()
-            
-            def run_loop():
-                """Run the async event loop in a separate thread"""
-                try:
-                    asyncio.set_event_loop(controller.web_manager.loop)
-                    # Run the browse handler and then keep loop alive
-                    controller.web_manager.loop.run_until_complete(handle_browse_async(command))
-                    print("✓ Browser initialized and navigated")
-                    # Keep loop running for future commands
-                    controller.web_manager.loop.run_forever()
-                except Exception as e:
-                    print(f"ERROR [app.run_loop]: Event loop failed - {str(e)}")
-                    voice_agent.speak("Failed to start browser")
-                finally:
-                    # Cleanup
-                    try:
-                        if controller.web_manager.loop.is_running():
-                            controller.web_manager.loop.close()
-                    except:
-                        pass
-            
-            # Start browser in background thread
-            thread = Thread(target=run_loop, daemon=True)
-            thread.start()
-            
-            # Wait for browser to initialize
-            print("→ Waiting for browser to initialize...")
-            time.sleep(3)
+        try:
+            # Usually already warm; a cold start waits on the readiness event instead of sleeping
+            controller.web_manager.ensure_ready()
+        except Exception as e:
+            print(f"ERROR [process_navigation]: {str(e)}")
+            voice_agent.speak("Failed to start browser")
+            return
+        
+        future = asyncio.run_coroutine_threadsafe(
+            handle_browse_async(command),
+            controller.web_manager.loop
+        )
+        try:
+            future.result(timeout=15)
+        except Exception as e:
+            future.cancel()
+            print(f"ERROR [process_navigation]: Navigation failed - {str(e)}")
+            voice_agent.speak("Failed to navigate")
         return
     
     # Parse commands
@@ -331,6 +487,11 @@ def process_navigation(command, voice=False):
         if current_page == "/":
             if cmd in ['see', 'hear', 'both']:
                 Config.set_setting('INTERACTION_MODE', cmd)
+                try:
+                    apply_resource_profile(profile_for_mode(cmd))
+                except Exception as e:
+                    # The profile is only an optimization; the mode choice still stands
+                    print(f"⚠️ [app._process_navigation]: Resource profile not switched - {str(e) or type(e).__name__}")
                 if cmd == 'see':
                     voice_agent.mute()
                 else:
@@ -378,6 +539,10 @@ def main():
     print(f"\n➡️  Open http://{Config.FLASK_HOST}:{Config.FLASK_PORT} in your browser")
     print("="*60 + "\n")
     
+    # Launch Playwright and Chromium while Flask boots so the first command is warm
+    if Config.PREWARM_BROWSER:
+        web_manager.start_in_background()
+    
     voice_agent.start_non_blocking_listen(callback=voice_callback)
     app.run(
         debug=Config.FLASK_DEBUG,
@@ -3,8 +3,13 @@ Browser Controller Module
 Coordinates between WebManager and AIAgent
 """
 
+from config import Config
 from web_manager import WebManager
 from ai_agent import AIAgent
+from plan_cache import PlanCache
+from intent_grammar import LocalIntentParser
+from single_flight import SingleFlight
+from cache import normalize_command
 
 class BrowserController:
     """High-level controller that coordinates browser and AI operations"""
@@ -14,6 +19,11 @@ class BrowserController:
         try:
             self.web_manager = web_manager if web_manager else WebManager()
             self.ai_agent = ai_agent if ai_agent else AIAgent()
+            self.plan_cache = PlanCache()
+            self.intent_parser = LocalIntentParser()
+            self.command_flight = SingleFlight(Config.COMMAND_COALESCE_WINDOW)
+            # Prefetch ranks links by how often their pages were visited
+            self.web_manager.visit_count = self.ai_agent.site_resolver.visit_count
             print("✓ BrowserController initialized")
         except Exception as e:
             raise Exception(f"ERROR [BrowserController.__init__]: Initialization failed - {str(e)}")
@@ -30,25 +40,86 @@ class BrowserController:
         except Exception as e:
             raise Exception(f"ERROR [BrowserController.start_browser]: {str(e)}")
     
-    async def execute_command(self, command):
+    async def execute_command(self, command, session_id=None):
         """
         Execute a natural language command
         
+        Identical commands arriving while one is running (or just finished)
+        share its execution and result instead of acting twice.
+        
         Args:
             command (str): User's command in natural language
+            session_id (str): Run in this isolated pooled session instead of the main page
             
         Returns:
             bool: True if command executed successfully, False otherwise
         """
+        return await self.command_flight.run_async(
+            (session_id, normalize_command(command)),
+            lambda: self._execute_in_session(command, session_id)
+        )
+    
+    async def _execute_in_session(self, command, session_id):
+        """Lease the pooled session (if any) for the duration of the command"""
+        if session_id is None:
+            return await self._execute_command(command)
+        try:
+            async with self.web_manager.pool.lease(session_id) as session:
+                return await self._execute_command(command, session)
+        except Exception as e:
+            print(f"ERROR [BrowserController.execute_command]: {str(e)}")
+            return False
+    
+    async def _execute_command(self, command, session=None):
+        """Interpret and run a command (see execute_command)"""
         try:
-            # Get current page context
-            context = await self.web_manager.get_page_context()
+            page = (session or self.web_manager).page
+            # Trivial commands (scroll, back, reload, press a key) skip the AI entirely
+            local_actions = self.intent_parser.parse(command)
+            if local_actions is not None:
+                print(f"✓ Handled locally: {command}")
+                return await self.web_manager.execute_actions(local_actions, session)
             
-            # Ask AI to interpret the command
-            actions = await self.ai_agent.interpret_command(command, context)
+            # Reuse a plan from an identical command on a page of the same structure
+            plan_key = None
+            actions = None
+            fingerprint = await self.web_manager.get_structure_fingerprint(session)
+            if fingerprint:
+                plan_key = self.plan_cache.make_key(command, page.url, fingerprint)
+                actions = self.plan_cache.lookup(plan_key)
+                if actions is not None and not await self.web_manager.check_selectors(
+                        PlanCache.selector_checks(actions), session):
+                    print("✗ Cached plan has stale selectors, asking AI")
+                    self.plan_cache.invalidate(plan_key)
+                    actions = None
             
-            # Execute the actions
-            success = await self.web_manager.execute_actions(actions)
+            from_cache = actions is not None
+            if from_cache:
+                print(f"✓ Replaying cached plan ({len(actions)} actions)")
+                success = await self.web_manager.execute_actions(actions, session)
+            else:
+                # Get current page context
+                context = await self.web_manager.get_page_context(session)
+                
+                if Config.LLM_STREAM_ACTIONS:
+                    # Run each action as soon as the AI finishes generating it
+                    actions = []
+                    success = await self.web_manager.execute_action_stream(
+                        self._record(self.ai_agent.stream_command(command, context), actions),
+                        session
+                    )
+                else:
+                    # Ask AI to interpret the command
+                    actions = await self.ai_agent.interpret_command(command, context)
+                    
+                    # Execute the actions
+                    success = await self.web_manager.execute_actions(actions, session)
+            
+            if plan_key:
+                if success and not from_cache:
+                    self.plan_cache.store(plan_key, actions)
+                elif not success and from_cache:
+                    self.plan_cache.invalidate(plan_key)
             
             return success
             
@@ -56,6 +127,16 @@ class BrowserController:
             print(f"ERROR [BrowserController.execute_command]: {str(e)}")
             return False
     
+    @staticmethod
+    async def _record(action_stream, actions):
+        """Pass actions through from a stream while keeping a copy for the plan cache"""
+        try:
+            async for action in action_stream:
+                actions.append(action)
+                yield action
+        finally:
+            await action_stream.aclose()
+    
     async def simplify_page(self):
         """
         Simplify the current page
@@ -82,24 +163,55 @@ class BrowserController:
             print(f"ERROR [BrowserController.restore_page]: {str(e)}")
             return False
     
-    async def navigate_to(self, url):
+    async def navigate_to(self, url, ready=None):
         """
         Navigate to a specific URL
         
         Args:
             url (str): URL to navigate to
+            ready (str): Readiness strategy, defaults to Config.NAVIGATION_READINESS
         """
         try:
             if self.web_manager.page is None:
                 raise Exception("Browser page not initialized. Call start_browser() first.")
             
             print(f"→ Navigating to: {url}")
-            await self.web_manager.page.goto(url)
-            await self.web_manager.page.wait_for_load_state("networkidle")
+            await self.web_manager.navigate(url, ready)
             print(f"✓ Successfully loaded: {url}")
         except Exception as e:
             raise Exception(f"ERROR [BrowserController.navigate_to]: Navigation to '{url}' failed - {str(e)}")
     
+    async def close_session(self, session_id):
+        """
+        Close a pooled session
+        
+        Args:
+            session_id (str): Session identifier
+            
+        Returns:
+            str: 'closed', 'closing' if it closes after its running commands, or None if
+                 there is no such session
+        """
+        try:
+            if self.web_manager.pool is None:
+                return None
+            return await self.web_manager.pool.release(session_id)
+        except Exception as e:
+            print(f"ERROR [BrowserController.close_session]: {str(e)}")
+            return None
+    
+    async def set_resource_profile(self, profile):
+        """
+        Switch the resource profile for the main page and every session
+        
+        Args:
+            profile (str): 'full', 'block-trackers', 'no-media' or 'text-only'
+            
+        Raises:
+            Exception: If the profile name is unknown
+        """
+        await self.web_manager.resources.set_profile(profile)
+    
     async def close(self):
         """Close the browser"""
         try:
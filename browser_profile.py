@@ -0,0 +1,136 @@
+"""
+Browser Profile Module
+Persistent Chromium profile directories with age/size based rotation
+"""
+
+import os
+import shutil
+import time
+
+PROFILE_PREFIX = "profile-"
+
+
+def directory_size(path):
+    """
+    Total size of the files under a directory
+
+    Args:
+        path (str): Directory
+
+    Returns:
+        int: Bytes
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass  # Chromium removes temp files while we walk
+    return total
+
+
+class ProfileManager:
+    """Picks the profile directory to launch with, rotating it out when too old or too large"""
+
+    def __init__(self, root, max_age_days, max_bytes, keep):
+        """
+        Args:
+            root (str): Directory holding the profile directories
+            max_age_days (float): Profiles older than this are rotated
+            max_bytes (int): Profiles larger than this are rotated
+            keep (int): Rotated-out profiles kept on disk besides the active one
+        """
+        self.root = root
+        self.max_age = max_age_days * 24 * 3600
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.active = None
+        self.rotated = 0
+        self.removed = 0
+        self.last_rotation_reason = None
+
+    def _profiles(self):
+        """Existing profile directories, newest first"""
+        try:
+            names = [n for n in os.listdir(self.root) if n.startswith(PROFILE_PREFIX)]
+        except FileNotFoundError:
+            return []
+        paths = [os.path.join(self.root, n) for n in names if os.path.isdir(os.path.join(self.root, n))]
+        return sorted(paths, key=os.path.getmtime, reverse=True)
+
+    def _created_at(self, path):
+        """Creation time recorded when the profile was made"""
+        try:
+            with open(os.path.join(path, ".created"), "r", encoding="utf-8") as f:
+                return float(f.read().strip())
+        except (OSError, ValueError):
+            return os.path.getmtime(path)
+
+    def _rotation_reason(self, path):
+        """Why a profile should be rotated out, or None to keep using it"""
+        age = time.time() - self._created_at(path)
+        if age > self.max_age:
+            return f"older than {self.max_age / 86400:g} days"
+        size = directory_size(path)
+        if size > self.max_bytes:
+            return f"{size // (1024 * 1024)}MB exceeds {self.max_bytes // (1024 * 1024)}MB"
+        return None
+
+    def prepare(self):
+        """
+        Choose the profile directory for this launch (call before the browser starts)
+
+        Returns:
+            str: Profile directory to pass to launch_persistent_context
+
+        Raises:
+            Exception: If the profile directory can't be created
+        """
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            profiles = self._profiles()
+
+            current = profiles[0] if profiles else None
+            if current is not None:
+                reason = self._rotation_reason(current)
+                if reason:
+                    print(f"→ Rotating browser profile ({reason})")
+                    self.last_rotation_reason = reason
+                    self.rotated += 1
+                    current = None
+
+            if current is None:
+                current = os.path.join(self.root, PROFILE_PREFIX + time.strftime("%Y%m%d-%H%M%S"))
+                os.makedirs(current, exist_ok=True)
+                with open(os.path.join(current, ".created"), "w", encoding="utf-8") as f:
+                    f.write(str(time.time()))
+                profiles.insert(0, current)
+
+            # Touch so the active profile sorts first next time
+            os.utime(current)
+            for old in profiles[1 + self.keep:]:
+                shutil.rmtree(old, ignore_errors=True)
+                self.removed += 1
+                print(f"✓ Removed old browser profile {os.path.basename(old)}")
+
+            self.active = current
+            return current
+        except OSError as e:
+            raise Exception(f"ERROR [ProfileManager.prepare]: Cannot prepare profile in '{self.root}' - {str(e)}")
+
+    def stats(self):
+        """
+        Get profile details
+
+        Returns:
+            dict: Active profile, its size, profiles on disk and rotation counters
+        """
+        return {
+            "active": os.path.basename(self.active) if self.active else None,
+            "bytes": directory_size(self.active) if self.active else 0,
+            "profiles": len(self._profiles()),
+            "rotated": self.rotated,
+            "removed": self.removed,
+            "last_rotation_reason": self.last_rotation_reason
+        }
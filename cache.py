@@ -0,0 +1,274 @@
+"""
+Cache Module
+Two-tier LRU + TTL cache: an in-memory LRU in front of an optional SQLite table
+"""
+
+import atexit
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Pending-write marker for a deleted key
+_DELETED = object()
+# Writes committed per SQLite transaction at most
+WRITE_BATCH = 256
+
+
+def normalize_command(command):
+    """
+    Normalize a user command so trivial variations share a cache key
+
+    Args:
+        command (str): Raw command text
+
+    Returns:
+        str: Lowercased command without punctuation or repeated whitespace
+    """
+    text = command.lower().strip()
+    # Keep characters that can be part of a URL ("open nus.edu.sg")
+    text = re.sub(r"[^\w\s./:-]", " ", text)
+    text = text.strip(" .:-")
+    return re.sub(r"\s+", " ", text)
+
+
+class PersistentLRUCache:
+    """
+    LRU cache with TTL eviction, optionally backed by a SQLite table that survives restarts.
+
+    Lookups are served from memory (warmed from disk at startup); disk writes are
+    queued to a writer thread that commits them in batches, so callers on the
+    browser event loop never wait for a commit.
+    """
+
+    def __init__(self, name, max_entries, ttl, db_path=None):
+        """
+        Initialize the cache
+
+        Args:
+            name (str): Cache name, also used as the SQLite table name
+            max_entries (int): Maximum entries kept in memory (disk keeps 10x)
+            ttl (float): Entry lifetime in seconds
+            db_path (str): SQLite file for the disk tier, or None for memory only
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_path = db_path
+        self._pending = {}  # key -> (expires_at, value, json) or _DELETED, queued but not yet committed
+        self._writes = queue.Queue()
+        self._writer = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+                # WAL lets lookups read while the writer thread commits
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{name}" '
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._db.execute(f'DELETE FROM "{name}" WHERE expires_at < ?', (time.time(),))
+                self._db.commit()
+                # Warm the memory tier with the longest-lived entries
+                rows = self._db.execute(
+                    f'SELECT key, value, expires_at FROM "{name}" ORDER BY expires_at ASC LIMIT -1 OFFSET '
+                    f'MAX(0, (SELECT COUNT(*) FROM "{name}") - ?)', (max_entries,)
+                ).fetchall()
+                for key, value, expires_at in rows:
+                    self._memory[key] = (expires_at, json.loads(value))
+                atexit.register(self.close)
+            except (sqlite3.Error, ValueError) as e:
+                print(f"⚠️ [PersistentLRUCache]: Disk tier for '{name}' disabled - {str(e)}")
+                self._db = None
+
+    def get(self, key):
+        """
+        Look up a key in memory, then on disk
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            Any: Cached value, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+                self.expirations += 1
+
+            if self._db is not None:
+                pending = self._pending.get(key)
+                if pending is _DELETED:
+                    row = None
+                elif pending is not None:
+                    row = (pending[1], pending[0])
+                else:
+                    # Point lookup by primary key, only for entries that fell out of memory
+                    row = self._db.execute(
+                        f'SELECT value, expires_at FROM "{self.name}" WHERE key = ?', (key,)
+                    ).fetchone()
+                    if row is not None:
+                        row = (json.loads(row[0]), row[1])
+                if row is not None:
+                    if row[1] >= now:
+                        self._remember(key, row[1], row[0])
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return row[0]
+                    self._queue(key, _DELETED)
+                    self.expirations += 1
+
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a JSON-serializable value
+
+        Args:
+            key (str): Cache key
+            value (Any): Value to store
+            ttl (float): Override the default lifetime in seconds
+        """
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        # Serialized here so a bad value fails its caller, not a whole write batch
+        payload = json.dumps(value) if self._db is not None else None
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._db is not None:
+                self._queue(key, (expires_at, value, payload))
+
+    def delete(self, key):
+        """Remove a key from both tiers"""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._queue(key, _DELETED)
+
+    def clear(self):
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._pending.clear()
+                self._queue(None, _DELETED)
+
+    def _queue(self, key, entry):
+        """Hand a write to the writer thread, starting it on first use (lock held)"""
+        if key is not None:
+            self._pending[key] = entry
+        self._writes.put((key, entry))
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name=f"cache-{self.name}", daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        """Commit queued writes in batches on a connection of its own"""
+        try:
+            db = sqlite3.connect(self._db_path, timeout=5)
+        except sqlite3.Error as e:
+            print(f"⚠️ [PersistentLRUCache]: Writer for '{self.name}' failed - {str(e)}")
+            return
+        while True:
+            batch = [self._writes.get()]
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is None for item in batch)
+            writes = [item for item in batch if item is not None]
+            try:
+                for key, entry in writes:
+                    if key is None:
+                        db.execute(f'DELETE FROM "{self.name}"')
+                    elif entry is _DELETED:
+                        db.execute(f'DELETE FROM "{self.name}" WHERE key = ?', (key,))
+                    else:
+                        db.execute(
+                            f'INSERT OR REPLACE INTO "{self.name}" (key, value, expires_at) VALUES (?, ?, ?)',
+                            (key, entry[2], entry[0])
+                        )
+                if any(key is not None and entry is not _DELETED for key, entry in writes):
+                    # Bound the disk tier by dropping the entries closest to expiry
+                    db.execute(
+                        f'DELETE FROM "{self.name}" WHERE key IN ('
+                        f'SELECT key FROM "{self.name}" ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                        (self.max_entries * 10,)
+                    )
+                db.commit()
+            except sqlite3.Error as e:
+                db.rollback()
+                print(f"⚠️ [PersistentLRUCache]: Failed to persist {len(writes)} '{self.name}' entries - {str(e)}")
+            with self._lock:
+                for key, entry in writes:
+                    if key is not None and self._pending.get(key) is entry:
+                        del self._pending[key]
+            for _ in batch:
+                self._writes.task_done()
+            if stop:
+                db.close()
+                return
+
+    def flush(self):
+        """Block until every queued write is committed"""
+        if self._writer is not None:
+            self._writes.join()
+
+    def close(self):
+        """Commit queued writes and stop the writer thread"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None and writer.is_alive():
+            self._writes.put(None)
+            writer.join()
+
+    def _remember(self, key, expires_at, value):
+        """Insert into the memory tier and evict least recently used entries (lock held)"""
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Get cache counters
+
+        Returns:
+            dict: Hit/miss counters and current memory size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "memory_entries": len(self._memory),
+                "pending_writes": len(self._pending),
+                "persistent": self._db is not None
+            }
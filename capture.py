@@ -0,0 +1,271 @@
+"""
+Capture Module
+In-memory screenshots (JPEG/WebP/PNG, quality, scale, clip) and a frame-dropping CDP screencast
+"""
+
+import asyncio
+import base64
+import threading
+import time
+from config import Config
+
+FORMATS = ("jpeg", "webp", "png")
+
+# File extensions recognised when a screenshot is saved to disk
+EXTENSION_FORMATS = {".jpg": "jpeg", ".jpeg": "jpeg", ".webp": "webp", ".png": "png"}
+
+
+class PageCapture:
+    """Captures a page into memory through the DevTools protocol, with a screenshot() fallback"""
+
+    def __init__(self, page):
+        """
+        Args:
+            page: Playwright page
+        """
+        self.page = page
+        self._cdp = None
+        self._lock = threading.Lock()
+        self.captures = 0
+        self.bytes_out = 0
+        self.capture_ms = 0.0
+
+    async def _session(self):
+        """Return the page's CDP session, or None if the browser doesn't speak CDP"""
+        if self._cdp is None:
+            try:
+                self._cdp = await self.page.context.new_cdp_session(self.page)
+            except Exception:
+                self._cdp = False
+        return self._cdp or None
+
+    async def capture(self, format=None, quality=None, scale=None, clip=None, full_page=False):
+        """
+        Capture the page into an in-memory buffer
+
+        Args:
+            format (str): 'jpeg', 'webp' or 'png', defaults to Config.CAPTURE_FORMAT
+            quality (int): 0-100 for jpeg/webp, defaults to Config.CAPTURE_QUALITY
+            scale (float): Output scale, e.g. 0.5 for half size, defaults to Config.CAPTURE_SCALE
+            clip (dict): Region {x, y, width, height} in page coordinates, defaults to the viewport
+            full_page (bool): Capture the whole scrollable page instead of the viewport
+
+        Returns:
+            bytes: Encoded image
+
+        Raises:
+            Exception: If the format is unknown or the capture fails
+        """
+        format = (format or Config.CAPTURE_FORMAT).lower()
+        if format not in FORMATS:
+            raise Exception(f"ERROR [PageCapture.capture]: Unknown format '{format}' (choose from {', '.join(FORMATS)})")
+        quality = Config.CAPTURE_QUALITY if quality is None else int(quality)
+        scale = Config.CAPTURE_SCALE if scale is None else float(scale)
+
+        started = time.perf_counter()
+        try:
+            cdp = await self._session()
+            if cdp is not None:
+                data = await self._capture_cdp(cdp, format, quality, scale, clip, full_page)
+            else:
+                data = await self._capture_playwright(format, quality, clip, full_page)
+        except Exception as e:
+            raise Exception(f"ERROR [PageCapture.capture]: Failed to capture page - {str(e)}")
+
+        with self._lock:
+            self.captures += 1
+            self.bytes_out += len(data)
+            self.capture_ms += (time.perf_counter() - started) * 1000
+        return data
+
+    async def _capture_cdp(self, cdp, format, quality, scale, clip, full_page):
+        """Page.captureScreenshot: supports WebP and arbitrary scale, no temp files"""
+        if clip is None:
+            # Viewport (or whole page) in page coordinates
+            x, y, width, height = await self.page.evaluate(
+                "(full) => full ? [0, 0, document.documentElement.scrollWidth, document.documentElement.scrollHeight]"
+                " : [window.scrollX, window.scrollY, window.innerWidth, window.innerHeight]",
+                full_page
+            )
+            clip = {"x": x, "y": y, "width": width, "height": height}
+        params = {
+            "format": format,
+            "clip": dict(clip, scale=scale),
+            "captureBeyondViewport": full_page,
+            "optimizeForSpeed": True
+        }
+        if format != "png":
+            params["quality"] = quality
+        result = await cdp.send("Page.captureScreenshot", params)
+        return base64.b64decode(result["data"])
+
+    async def _capture_playwright(self, format, quality, clip, full_page):
+        """page.screenshot: JPEG or PNG at device scale only"""
+        if format == "webp":
+            format = "jpeg"
+        options = {"type": format, "full_page": full_page and clip is None}
+        if format == "jpeg":
+            options["quality"] = quality
+        if clip is not None:
+            options["clip"] = clip
+        return await self.page.screenshot(**options)
+
+    def screencast(self, fps=None, quality=None, max_width=None, max_height=None):
+        """
+        Create a screencast of this page (call start() to begin)
+
+        Args:
+            fps (float): Target frames per second, defaults to Config.SCREENCAST_FPS
+            quality (int): JPEG quality, defaults to Config.SCREENCAST_QUALITY
+            max_width (int): Largest frame width, defaults to Config.SCREENCAST_MAX_WIDTH
+            max_height (int): Largest frame height, defaults to Config.SCREENCAST_MAX_HEIGHT
+
+        Returns:
+            Screencast: Unstarted screencast
+        """
+        return Screencast(self, fps, quality, max_width, max_height)
+
+    def stats(self):
+        """
+        Get capture counters
+
+        Returns:
+            dict: Captures, bytes produced and average capture time
+        """
+        with self._lock:
+            return {
+                "captures": self.captures,
+                "bytes": self.bytes_out,
+                "avg_capture_ms": round(self.capture_ms / self.captures, 1) if self.captures else None
+            }
+
+
+class Screencast:
+    """
+    CDP screencast paced to a target fps that only ever keeps the newest frame.
+
+    Chrome sends the next frame only after the previous one is acknowledged, so
+    acknowledgements are delayed to the fps interval (Chrome doesn't encode
+    frames nobody will see). Frames no consumer picked up before a newer one
+    arrived are counted as dropped; consumers always get the newest frame.
+    """
+
+    def __init__(self, capture, fps=None, quality=None, max_width=None, max_height=None):
+        """
+        Args:
+            capture (PageCapture): Capture of the page to stream
+            fps (float): Target frames per second
+            quality (int): JPEG quality
+            max_width (int): Largest frame width
+            max_height (int): Largest frame height
+        """
+        self.capture = capture
+        self.fps = fps or Config.SCREENCAST_FPS
+        self.quality = Config.SCREENCAST_QUALITY if quality is None else quality
+        self.max_width = max_width or Config.SCREENCAST_MAX_WIDTH
+        self.max_height = max_height or Config.SCREENCAST_MAX_HEIGHT
+        self.running = False
+        self._cdp = None
+        self._frame = None
+        self._frame_id = 0
+        self._taken = True
+        self._new_frame = asyncio.Event()
+        self._last_ack = 0.0
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def start(self):
+        """
+        Start streaming frames
+
+        Raises:
+            Exception: If the browser doesn't support CDP screencasts
+        """
+        if self.running:
+            return
+        self._cdp = await self.capture._session()
+        if self._cdp is None:
+            raise Exception("ERROR [Screencast.start]: Screencasts need a Chromium CDP session")
+        self._cdp.on("Page.screencastFrame", self._on_frame)
+        await self._cdp.send("Page.startScreencast", {
+            "format": "jpeg",
+            "quality": self.quality,
+            "maxWidth": self.max_width,
+            "maxHeight": self.max_height,
+            "everyNthFrame": 1
+        })
+        self.running = True
+        print(f"✓ Screencast started ({self.fps} fps)")
+
+    def _on_frame(self, params):
+        """Keep the newest frame, wake waiting consumers and acknowledge it once the fps interval has passed"""
+        self.received += 1
+        if not self._taken:
+            self.dropped += 1  # nobody took the previous frame
+        self._frame = base64.b64decode(params["data"])
+        self._frame_id += 1
+        self._taken = False
+        arrived, self._new_frame = self._new_frame, asyncio.Event()
+        arrived.set()
+        asyncio.ensure_future(self._ack(params["sessionId"]))
+
+    async def _ack(self, session_id):
+        """Acknowledge a frame no sooner than one fps interval after the previous one"""
+        loop = asyncio.get_running_loop()
+        delay = self._last_ack + 1 / self.fps - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._last_ack = loop.time()
+        if self.running:
+            try:
+                await self._cdp.send("Page.screencastFrameAck", {"sessionId": session_id})
+            except Exception:
+                pass
+
+    async def next_frame(self, last_id=0, timeout=None):
+        """
+        Wait for a frame newer than the one a consumer last got
+
+        Args:
+            last_id (int): Frame id the consumer already has (0 for none)
+            timeout (float): Seconds to wait, None waits until a frame arrives
+
+        Returns:
+            tuple: (frame id, JPEG bytes), with None bytes if no newer frame arrived in time
+        """
+        if self._frame_id <= last_id:
+            try:
+                await asyncio.wait_for(self._new_frame.wait(), timeout)
+            except asyncio.TimeoutError:
+                return last_id, None
+        self._taken = True
+        self.delivered += 1
+        return self._frame_id, self._frame
+
+    async def stop(self):
+        """Stop streaming frames"""
+        if not self.running:
+            return
+        self.running = False
+        self._cdp.remove_listener("Page.screencastFrame", self._on_frame)
+        try:
+            await self._cdp.send("Page.stopScreencast")
+        except Exception as e:
+            print(f"⚠️ [Screencast.stop]: {str(e)}")
+        print(f"✓ Screencast stopped ({self.delivered} delivered, {self.dropped} dropped)")
+
+    def stats(self):
+        """
+        Get screencast counters
+
+        Returns:
+            dict: Frames received, delivered and dropped
+        """
+        return {
+            "running": self.running,
+            "fps": self.fps,
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
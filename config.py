@@ -27,11 +27,106 @@ class Config:
         "--allow-running-insecure-content"
     ]
     
+    PREWARM_BROWSER = True  # launch Chromium in the background while Flask boots
+    
+    # Persistent profile: keeps the HTTP cache, cookies and DNS warm across restarts
+    PERSISTENT_PROFILE = os.getenv("PERSISTENT_PROFILE", "0") == "1"
+    PROFILE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "profiles")
+    PROFILE_DISK_CACHE_BYTES = 256 * 1024 * 1024  # Chromium HTTP disk cache limit
+    PROFILE_MAX_AGE_DAYS = 14  # start a fresh profile after this long
+    PROFILE_MAX_BYTES = 1024 * 1024 * 1024  # or once the profile grows past this
+    PROFILE_KEEP = 1  # rotated-out profiles kept on disk besides the active one
+    BROWSER_STARTUP_TIMEOUT = 30  # seconds callers wait for the browser to be ready
+    
+    # Capture settings (screenshots and the /screencast monitor)
+    CAPTURE_FORMAT = "jpeg"  # 'jpeg', 'webp' or 'png'
+    CAPTURE_QUALITY = 70  # 0-100, jpeg/webp only
+    CAPTURE_SCALE = 1.0  # output scale, e.g. 0.5 for half-size images
+    SCREENCAST_FPS = 5  # target frames per second
+    SCREENCAST_QUALITY = 60  # jpeg quality of screencast frames
+    SCREENCAST_MAX_WIDTH = 1280
+    SCREENCAST_MAX_HEIGHT = 800
+
+    # Speculative prefetch of likely next pages in background tabs of the main window
+    PREFETCH_LINKS = os.getenv("PREFETCH_LINKS", "0") == "1"
+    PREFETCH_MAX_TABS = 2  # background tabs at once
+    PREFETCH_TAB_MEMORY_MB = 200  # JS heap above which a prefetched page is dropped
+    PREFETCH_TTL = 120  # seconds before a prefetched page is considered stale
+
+    # Session pool settings (isolated contexts for /execute calls with a "session")
+    SESSION_POOL_MAX = 8  # contexts open at once
+    SESSION_IDLE_TIMEOUT = 600  # seconds before an unused session is closed
+    SESSION_MAX_CONCURRENCY = 1  # commands running at once within one session
+
+    # Action settings
+    ACTION_PLUGINS = [m.strip() for m in os.getenv("ACTION_PLUGINS", "").split(",") if m.strip()]  # modules with register(registry)
+    ACTION_BATCHING = True  # run consecutive scroll/check/select actions in one page call
+    
     # Timeouts (in seconds)
     COMMAND_TIMEOUT = 30
     SIMPLIFY_TIMEOUT = 10
     RESTORE_TIMEOUT = 10
     CLICK_TIMEOUT = 5000  # milliseconds
+    LLM_TIMEOUT = 20  # per Gemini call deadline
+
+    # Navigation readiness settings
+    NAVIGATION_READINESS = "interactive"  # commit, domcontentloaded, load, networkidle, interactive or quiescent
+    NAVIGATION_TIMEOUT = 15000  # milliseconds for the navigation to commit (or reach a load state)
+    READINESS_TIMEOUT = 5000  # milliseconds to wait for an in-page strategy before carrying on
+    DOM_QUIET_WINDOW = 300  # milliseconds without DOM changes that count as quiescent
+
+    # LLM settings
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # 'gemini' or 'standin' (offline, scripted)
+    GEMINI_MODEL = "gemini-2.5-flash-lite"
+    LLM_MAX_CONCURRENCY = 4  # LLM calls in flight at once
+
+    # Stand-in backend settings (LLM_BACKEND='standin')
+    STANDIN_SCRIPT_PATH = os.getenv("STANDIN_SCRIPT_PATH")  # JSON list of {"match", "response"} rules
+    STANDIN_LATENCY_MS = float(os.getenv("STANDIN_LATENCY_MS", "400"))
+    STANDIN_JITTER_MS = float(os.getenv("STANDIN_JITTER_MS", "100"))
+    STANDIN_SEED = 1234  # jitter is reproducible across runs
+    STANDIN_CHUNK_CHARS = 40  # streamed chunk size
+
+    LLM_STREAM_ACTIONS = True  # start executing actions while the AI is still generating
+
+    COMMAND_COALESCE_WINDOW = 1.0  # seconds a finished command still absorbs duplicates
+
+    # Prompt settings
+    ELEMENT_INDEX_MAX = 300  # elements extracted from the page
+    PROMPT_TOKEN_BUDGET = 2000  # estimated tokens per prompt, low-priority sections trimmed first
+    PROMPT_HISTORY_SIZE = 5  # recent commands included in prompts
+
+    # Cache settings
+    CACHE_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "cache.sqlite3")
+    NAV_CACHE_SIZE = 256  # entries kept in memory
+    NAV_CACHE_TTL = 7 * 24 * 3600  # seconds
+    PLAN_CACHE_SIZE = 512  # entries kept in memory
+    PLAN_CACHE_TTL = 3 * 24 * 3600  # seconds
+    EXTRACTION_CACHE_SIZE = 256  # URLs whose main content location is remembered
+    EXTRACTION_CACHE_TTL = 7 * 24 * 3600  # seconds
+    LOCATOR_CACHE_SIZE = 512  # sites whose winning click locator strategy is remembered
+    LOCATOR_CACHE_TTL = 30 * 24 * 3600  # seconds
+    FINGERPRINT_CACHE_SIZE = 1024  # selectors whose targeted element is remembered for healing
+    FINGERPRINT_CACHE_TTL = 30 * 24 * 3600  # seconds
+    HEAL_MIN_SCORE = 0.6  # 0-1 similarity an element needs to stand in for a missed selector
+
+    # Simplify/restore snapshot settings
+    SNAPSHOT_MEMORY_BYTES = 8 * 1024 * 1024  # compressed snapshot bytes kept in memory
+    SNAPSHOT_CODEC = "auto"  # 'zstd' (needs zstandard), 'zlib', or 'auto' for zstd when installed
+    SNAPSHOT_SPILL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "snapshots.bin")  # None drops evicted snapshots
+    SNAPSHOT_SPILL_BYTES = 64 * 1024 * 1024  # memory-mapped ring file for evicted snapshots
+
+    # Site resolver settings
+    SITE_ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "site_aliases.json")
+    SITE_HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "site_history.json")
+    SITE_HISTORY_MAX = 500  # visited pages remembered
+    SITE_HISTORY_SAVE_DELAY = 5.0  # seconds visits are collected before the history file is rewritten
+    SITE_RESOLVER_MIN_CONFIDENCE = 0.75  # below this the AI resolves the destination
+
+    # Resource interception ('full', 'block-trackers', 'no-media', 'text-only', or 'auto':
+    # text-only in 'hear' mode, full otherwise)
+    RESOURCE_PROFILE = os.getenv("RESOURCE_PROFILE", "auto")
+    TRACKER_BLOCKLIST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tracker_blocklist.txt")
 
     INTERACTION_MODE = 'both' # Default
     INPUT_MODE = 'keyboard'   # Default
@@ -55,7 +150,7 @@ class Config:
     @classmethod
     def validate(cls):
         """Validate required configuration"""
-        if not cls.GEMINI_API_KEY:
+        if cls.LLM_BACKEND.lower() == "gemini" and not cls.GEMINI_API_KEY:
             raise ValueError("ERROR [Config]: GEMINI_API_KEY not found in environment variables")
         return True
     
@@ -0,0 +1,76 @@
+"""
+Content Extractor Module
+Finds a page's main content for simplify, caching the result per URL and content hash
+"""
+
+import threading
+from collections import deque
+from config import Config
+from cache import PersistentLRUCache
+from page_scripts import get_simplify_script
+
+# Content versions remembered per URL (e.g. a news front page across a day)
+HASHES_PER_URL = 4
+
+
+class ContentExtractor:
+    """Runs the in-page main content scorer, skipping it when this URL and content were seen before"""
+
+    def __init__(self):
+        """Initialize the extraction cache"""
+        self.cache = PersistentLRUCache(
+            "content_extraction",
+            max_entries=Config.EXTRACTION_CACHE_SIZE,
+            ttl=Config.EXTRACTION_CACHE_TTL,
+            db_path=Config.CACHE_DB_PATH
+        )
+        self._timings = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self.sources = {}
+
+    async def simplify(self, page):
+        """
+        Switch a page to its reader view, extracting (or recalling) its main content
+
+        Args:
+            page: Playwright page
+
+        Returns:
+            dict: Extraction result (hash, path, score, source, blocks, extract_ms),
+                  or None if the page has no body
+        """
+        url = page.url.split("#")[0]
+        hints = self.cache.get(url) or {}
+        result = await page.evaluate(get_simplify_script(), hints)
+        if not result:
+            return None
+
+        if result["source"] in ("scored", "fallback"):
+            hints.pop(result["hash"], None)
+            hints[result["hash"]] = {"path": result["path"], "score": result["score"]}
+            while len(hints) > HASHES_PER_URL:
+                hints.pop(next(iter(hints)))
+            self.cache.set(url, hints)
+
+        with self._lock:
+            self.sources[result["source"]] = self.sources.get(result["source"], 0) + 1
+            if result["source"] != "active":
+                self._timings.append(result["extract_ms"])
+        print(f"✓ Main content ({result['source']}) {result['path']} in {result['extract_ms']:.0f}ms")
+        return result
+
+    def stats(self):
+        """
+        Get extraction counters
+
+        Returns:
+            dict: Results by source, extraction time percentiles and cache counters
+        """
+        with self._lock:
+            timings = sorted(self._timings)
+            return {
+                "sources": dict(self.sources),
+                "p50_extract_ms": timings[len(timings) // 2] if timings else None,
+                "p95_extract_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] if timings else None,
+                "cache": self.cache.stats()
+            }
@@ -0,0 +1,207 @@
+"""
+Context Pool Module
+Isolated browser contexts leased per session inside one Chromium process
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from config import Config
+from actions import BrowserActions, ActionExecutor
+
+
+class BrowserSession:
+    """One isolated BrowserContext with its own page, executor and element snapshot"""
+
+    def __init__(self, session_id, context, page, readiness=None, locator=None):
+        """
+        Args:
+            session_id (str): Caller-chosen session identifier
+            context: Playwright BrowserContext owned by this session
+            page: The session's page
+            readiness (ReadinessEngine): Shared readiness engine
+            locator (LocatorResolver): Shared click target resolver
+        """
+        self.session_id = session_id
+        self.context = context
+        self.page = page
+        self.action_executor = ActionExecutor(BrowserActions(page, readiness, locator))
+        # Same shape as WebManager.element_snapshot so WebManager can serve either
+        self.element_snapshot = {"id": None, "version": None, "entries": {}, "order": []}
+        # Commands within one session run one at a time by default
+        self.semaphore = asyncio.Semaphore(Config.SESSION_MAX_CONCURRENCY)
+        self.active = 0
+        self.closing = False  # released while commands were running; closed after the last one
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class BrowserContextPool:
+    """Leases isolated contexts per session, up to a maximum, evicting idle ones"""
+
+    def __init__(self, get_browser, context_options=None, init_scripts=None, readiness=None, resources=None,
+                 locator=None):
+        """
+        Args:
+            get_browser: Async callable returning the Playwright Browser to create contexts in
+            context_options (dict): Keyword arguments for browser.new_context
+            init_scripts (list): Scripts registered with add_init_script on every context
+            readiness (ReadinessEngine): Readiness engine shared with the main page
+            resources (ResourceInterceptor): Resource profile applied to every context
+            locator (LocatorResolver): Click target resolver shared with the main page
+        """
+        self.get_browser = get_browser
+        self.context_options = context_options or {}
+        self.init_scripts = init_scripts or []
+        self.readiness = readiness
+        self.resources = resources
+        self.locator = locator
+        self.sessions = {}
+        self._lock = asyncio.Lock()
+        self._reaper = None
+        self.created = 0
+        self.evicted = 0
+
+    async def _create(self, session_id):
+        """Create a fresh context and page for a session"""
+        browser = await self.get_browser()
+        context = await browser.new_context(**self.context_options)
+        for script in self.init_scripts:
+            await context.add_init_script(script=script)
+        if self.resources:
+            await self.resources.attach(context)
+        page = await context.new_page()
+        self.created += 1
+        print(f"✓ Session '{session_id}' started ({len(self.sessions) + 1}/{Config.SESSION_POOL_MAX})")
+        return BrowserSession(session_id, context, page, self.readiness, self.locator)
+
+    async def acquire(self, session_id):
+        """
+        Get the session for an id, creating it if needed
+
+        Args:
+            session_id (str): Session identifier
+
+        Returns:
+            BrowserSession: The session's context, page and executor
+
+        Raises:
+            Exception: If the pool is full and every session is busy
+        """
+        async with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                await self._evict_idle()
+                if len(self.sessions) >= Config.SESSION_POOL_MAX:
+                    # Make room by closing the least recently used idle session
+                    idle = [s for s in self.sessions.values() if s.active == 0]
+                    if not idle:
+                        raise Exception(f"ERROR [BrowserContextPool.acquire]: All {Config.SESSION_POOL_MAX} sessions are busy")
+                    await self._close(min(idle, key=lambda s: s.last_used))
+                session = await self._create(session_id)
+                self.sessions[session_id] = session
+            session.last_used = time.monotonic()
+            return session
+
+    @asynccontextmanager
+    async def lease(self, session_id):
+        """
+        Lease a session for the duration of a command, respecting its concurrency limit
+
+        Args:
+            session_id (str): Session identifier
+
+        Yields:
+            BrowserSession: The leased session
+        """
+        session = await self.acquire(session_id)
+        session.active += 1
+        try:
+            async with session.semaphore:
+                yield session
+        finally:
+            session.active -= 1
+            session.last_used = time.monotonic()
+            if session.closing and session.active == 0:
+                async with self._lock:
+                    await self._close(session)
+
+    async def _evict_idle(self):
+        """Close sessions unused for longer than the idle timeout (lock held)"""
+        now = time.monotonic()
+        for session in list(self.sessions.values()):
+            if session.active == 0 and now - session.last_used > Config.SESSION_IDLE_TIMEOUT:
+                await self._close(session)
+
+    async def _close(self, session):
+        """Close one session's context (lock held)"""
+        # A released session's id may already belong to a new session
+        if self.sessions.get(session.session_id) is session:
+            del self.sessions[session.session_id]
+        self.evicted += 1
+        try:
+            await session.context.close()
+            print(f"✓ Session '{session.session_id}' closed")
+        except Exception as e:
+            print(f"ERROR [BrowserContextPool._close]: Failed to close '{session.session_id}' - {str(e)}")
+
+    async def release(self, session_id):
+        """
+        Close a session explicitly
+
+        A session with commands still running is closed once the last one finishes;
+        its id is free for a new session right away.
+
+        Args:
+            session_id (str): Session identifier
+
+        Returns:
+            str: 'closed', 'closing' if it closes after its running commands, or None if
+                 there is no such session
+        """
+        async with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None
+            if session.active > 0:
+                session.closing = True
+                del self.sessions[session_id]
+                print(f"→ Session '{session_id}' closes after {session.active} running command(s)")
+                return "closing"
+            await self._close(session)
+            return "closed"
+
+    def start_reaper(self):
+        """Periodically evict idle sessions on the running event loop"""
+        async def reap():
+            while True:
+                await asyncio.sleep(max(1, Config.SESSION_IDLE_TIMEOUT / 2))
+                async with self._lock:
+                    await self._evict_idle()
+
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(reap())
+
+    async def close(self):
+        """Close every session and stop the reaper"""
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+        async with self._lock:
+            for session in list(self.sessions.values()):
+                await self._close(session)
+
+    def stats(self):
+        """
+        Get pool counters
+
+        Returns:
+            dict: Open/active sessions and lifetime created/evicted counts
+        """
+        return {
+            "open": len(self.sessions),
+            "active": sum(1 for s in self.sessions.values() if s.active),
+            "max": Config.SESSION_POOL_MAX,
+            "created": self.created,
+            "evicted": self.evicted
+        }
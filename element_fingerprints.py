@@ -0,0 +1,86 @@
+"""
+Element Fingerprints Module
+Remembers what each targeted element looked like so a selector that stops matching can be healed
+"""
+
+import threading
+from config import Config
+from cache import PersistentLRUCache
+from plan_cache import url_pattern
+
+
+class FingerprintStore:
+    """Fingerprints (attributes, text, DOM path, position) of elements targeted by a selector, per page template"""
+
+    def __init__(self):
+        """Initialize the fingerprint cache"""
+        self.cache = PersistentLRUCache(
+            "element_fingerprints",
+            max_entries=Config.FINGERPRINT_CACHE_SIZE,
+            ttl=Config.FINGERPRINT_CACHE_TTL,
+            db_path=Config.CACHE_DB_PATH
+        )
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.healed = 0
+        self.heal_misses = 0
+
+    @staticmethod
+    def _key(url, selector):
+        """Pages of one template (e.g. two product pages) share their fingerprints"""
+        return f"{url_pattern(url)} {selector}"
+
+    def get(self, url, selector):
+        """
+        Look up the fingerprint recorded for a selector on pages like this one
+
+        Args:
+            url (str): Page URL
+            selector (str): Selector (or click text) as the AI wrote it
+
+        Returns:
+            dict: Fingerprint, or None if the selector never matched here
+        """
+        return self.cache.get(self._key(url, selector))
+
+    def record(self, url, selector, fingerprint, stored=None):
+        """
+        Remember the element a selector targeted
+
+        Args:
+            url (str): Page URL
+            selector (str): Selector (or click text) as the AI wrote it
+            fingerprint (dict): Fingerprint from the page
+            stored (dict): Fingerprint already on record, to skip rewriting an unchanged one
+        """
+        if not fingerprint:
+            return
+        # The position alone shifts with every layout change; not worth a disk write
+        if stored and {k: v for k, v in stored.items() if k != "box"} == {k: v for k, v in fingerprint.items() if k != "box"}:
+            return
+        self.cache.set(self._key(url, selector), fingerprint)
+        with self._lock:
+            self.recorded += 1
+
+    def count_heal(self, healed):
+        """Count a selector miss that was (or couldn't be) healed"""
+        with self._lock:
+            if healed:
+                self.healed += 1
+            else:
+                self.heal_misses += 1
+
+    def stats(self):
+        """
+        Get healing counters
+
+        Returns:
+            dict: Fingerprints recorded, selectors healed, misses without a usable match and cache counters
+        """
+        with self._lock:
+            return {
+                "recorded": self.recorded,
+                "healed": self.healed,
+                "heal_misses": self.heal_misses,
+                "cache": self.cache.stats()
+            }
@@ -0,0 +1,52 @@
+"""
+Element Index Module
+Serializes the in-page interactive element index for AI prompts under a token budget
+"""
+
+from prompt_builder import estimate_tokens
+
+
+def format_element(element):
+    """
+    Format one index entry as a single prompt line
+
+    Args:
+        element (dict): Entry from the in-page element index
+
+    Returns:
+        str: e.g. '[3] button "Search" -> #search-btn @820,12 80x32'
+    """
+    x, y, width, height = element["box"]
+    line = f'[{element["index"]}] {element["role"]} "{element["name"]}" -> {element["selector"]} @{x},{y} {width}x{height}'
+    if not element["in_viewport"]:
+        line += " (offscreen)"
+    return line
+
+
+def serialize_elements(elements, token_budget):
+    """
+    Serialize elements in index order until the token budget is used up
+
+    Args:
+        elements (list): Entries from the in-page element index (viewport first)
+        token_budget (int): Maximum tokens for the serialized index
+
+    Returns:
+        str: One line per element, with a note if any were left out
+    """
+    lines = []
+    used = 0
+    for element in elements:
+        line = format_element(element)
+        cost = estimate_tokens(line) + 1
+        if used + cost > token_budget:
+            break
+        lines.append(line)
+        used += cost
+
+    omitted = len(elements) - len(lines)
+    if omitted:
+        lines.append(f"... {omitted} more elements omitted")
+    if not lines:
+        return "(no visible interactive elements)"
+    return "\n".join(lines)
@@ -3,71 +3,104 @@ HTML Templates Module
 Contains all HTML, CSS, and JavaScript for overlay and landing page
 """
 
+import hashlib
+
 def get_overlay_script():
-    """Returns the JavaScript code to inject the AI control overlay"""
-    return """
+    """
+    Returns the JavaScript code that attaches the AI control overlay.
+
+    Registered once per context with add_init_script, so it runs at document
+    start in every frame (only the top frame gets an overlay). It is idempotent:
+    re-running it with the same version only re-attaches a missing overlay, and a
+    new version replaces the old one. SPA route changes and body swaps re-attach
+    it without another round trip from Python.
+    """
+    script = """
     (function() {
-        const existing = document.getElementById('ai-control-overlay');
-        if (existing) existing.remove();
+        if (window.top !== window) return;
+        const VERSION = '__OVERLAY_VERSION__';
+        if (window.__pmbOverlay && window.__pmbOverlay.version === VERSION) {
+            window.__pmbOverlay.attach();
+            return;
+        }
         
-        const overlay = document.createElement('div');
-        overlay.id = 'ai-control-overlay';
-        overlay.innerHTML = `
-            <div style="position: fixed; top: 10px; right: 10px; width: 350px;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                border-radius: 12px; box-shadow: 0 10px 40px rgba(0,0,0,0.3);
-                z-index: 999999; font-family: -apple-system, sans-serif; color: white;">
-                <div style="padding: 15px; border-bottom: 1px solid rgba(255,255,255,0.2);">
-                    <div style="display: flex; justify-content: space-between; align-items: center;">
-                        <h3 style="margin: 0; font-size: 16px; font-weight: 600;">🤖 AI Browser Control</h3>
-                        <button onclick="document.getElementById('ai-control-overlay').style.display='none'" 
-                            style="background: rgba(255,255,255,0.2); border: none; color: white; 
-                                   padding: 5px 10px; border-radius: 6px; cursor: pointer; font-size: 12px;">
-                            Hide
-                        </button>
-                    </div>
-                </div>
-                <div style="padding: 15px;">
-                    <input type="text" id="ai-command-input" placeholder="Type your command..." 
-                        style="width: 100%; padding: 10px; border: none; border-radius: 8px; 
-                               font-size: 14px; box-sizing: border-box; 
-                               background: rgba(255,255,255,0.9); color: #333;">
-                    <button onclick="executeCommand()" 
-                        style="width: 100%; margin-top: 10px; padding: 10px; 
-                               background: rgba(255,255,255,0.2); border: none; 
-                               color: white; border-radius: 8px; cursor: pointer; 
-                               font-weight: 600; font-size: 14px;">
-                        Execute
-                    </button>
-                    <div style="margin-top: 15px; display: grid; grid-template-columns: 1fr 1fr; gap: 8px;">
-                        <button onclick="executeQuick('scroll down')" class="quick-btn">⬇️ Scroll Down</button>
-                        <button onclick="executeQuick('scroll up')" class="quick-btn">⬆️ Scroll Up</button>
-                        <button onclick="executeQuick('go back')" class="quick-btn">⬅️ Go Back</button>
-                        <button onclick="simplifyPage()" class="quick-btn">✨ Simplify</button>
+        function attach() {
+            if (!document.body) return;
+            watchBody();
+            const existing = document.getElementById('ai-control-overlay');
+            if (existing && existing.dataset.version === VERSION) return;
+            if (existing) existing.remove();
+            
+            const overlay = document.createElement('div');
+            overlay.id = 'ai-control-overlay';
+            overlay.dataset.version = VERSION;
+            overlay.innerHTML = `
+                <div style="position: fixed; top: 10px; right: 10px; width: 350px;
+                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                    border-radius: 12px; box-shadow: 0 10px 40px rgba(0,0,0,0.3);
+                    z-index: 999999; font-family: -apple-system, sans-serif; color: white;">
+                    <div style="padding: 15px; border-bottom: 1px solid rgba(255,255,255,0.2);">
+                        <div style="display: flex; justify-content: space-between; align-items: center;">
+                            <h3 style="margin: 0; font-size: 16px; font-weight: 600;">🤖 AI Browser Control</h3>
+                            <button onclick="document.getElementById('ai-control-overlay').style.display='none'" 
+                                style="background: rgba(255,255,255,0.2); border: none; color: white; 
+                                       padding: 5px 10px; border-radius: 6px; cursor: pointer; font-size: 12px;">
+                                Hide
+                            </button>
+                        </div>
                     </div>
-                    <div id="ai-status" style="margin-top: 10px; padding: 8px; 
-                        background: rgba(0,0,0,0.2); border-radius: 6px; 
-                        font-size: 12px; min-height: 40px; display: none;">
+                    <div style="padding: 15px;">
+                        <input type="text" id="ai-command-input" placeholder="Type your command..." 
+                            style="width: 100%; padding: 10px; border: none; border-radius: 8px; 
+                                   font-size: 14px; box-sizing: border-box; 
+                                   background: rgba(255,255,255,0.9); color: #333;">
+                        <button onclick="executeCommand()" 
+                            style="width: 100%; margin-top: 10px; padding: 10px; 
+                                   background: rgba(255,255,255,0.2); border: none; 
+                                   color: white; border-radius: 8px; cursor: pointer; 
+                                   font-weight: 600; font-size: 14px;">
+                            Execute
+                        </button>
+                        <div style="margin-top: 15px; display: grid; grid-template-columns: 1fr 1fr; gap: 8px;">
+                            <button onclick="executeQuick('scroll down')" class="quick-btn">⬇️ Scroll Down</button>
+                            <button onclick="executeQuick('scroll up')" class="quick-btn">⬆️ Scroll Up</button>
+                            <button onclick="executeQuick('go back')" class="quick-btn">⬅️ Go Back</button>
+                            <button onclick="simplifyPage()" class="quick-btn">✨ Simplify</button>
+                        </div>
+                        <div id="ai-status" style="margin-top: 10px; padding: 8px; 
+                            background: rgba(0,0,0,0.2); border-radius: 6px; 
+                            font-size: 12px; min-height: 40px; display: none;">
+                        </div>
                     </div>
                 </div>
-            </div>
-            <style>
-                .quick-btn {
-                    padding: 8px; background: rgba(255,255,255,0.15);
-                    border: none; color: white; border-radius: 6px;
-                    cursor: pointer; font-size: 12px; transition: all 0.2s;
-                }
-                .quick-btn:hover {
-                    background: rgba(255,255,255,0.25);
-                    transform: translateY(-2px);
-                }
-            </style>
-        `;
+                <style>
+                    .quick-btn {
+                        padding: 8px; background: rgba(255,255,255,0.15);
+                        border: none; color: white; border-radius: 6px;
+                        cursor: pointer; font-size: 12px; transition: all 0.2s;
+                    }
+                    .quick-btn:hover {
+                        background: rgba(255,255,255,0.25);
+                        transform: translateY(-2px);
+                    }
+                </style>
+            `;
         
-        document.body.appendChild(overlay);
-        document.getElementById('ai-command-input').addEventListener('keypress', function(e) {
-            if (e.key === 'Enter') executeCommand();
-        });
+            document.body.appendChild(overlay);
+            document.getElementById('ai-command-input').addEventListener('keypress', function(e) {
+                if (e.key === 'Enter') executeCommand();
+            });
+        }
+        
+        // Re-attach if the page replaces or empties <body> (SPA renders, simplify)
+        let observedBody = null;
+        const observer = new MutationObserver(attach);
+        function watchBody() {
+            if (document.body && document.body !== observedBody) {
+                observedBody = document.body;
+                observer.observe(observedBody, {childList: true});
+            }
+        }
         
         window.executeCommand = async function() {
             const input = document.getElementById('ai-command-input');
@@ -113,8 +146,27 @@ def get_overlay_script():
             status.textContent = message;
             setTimeout(() => status.style.display = 'none', 3000);
         };
+        
+        window.__pmbOverlay = {version: VERSION, attach};
+        if (document.documentElement) observer.observe(document.documentElement, {childList: true});
+        
+        // Client-side route changes don't fire load events
+        ['pushState', 'replaceState'].forEach(method => {
+            const original = history[method];
+            history[method] = function() {
+                const result = original.apply(this, arguments);
+                setTimeout(attach, 0);
+                return result;
+            };
+        });
+        window.addEventListener('popstate', () => setTimeout(attach, 0));
+        
+        if (document.body) attach();
+        else document.addEventListener('DOMContentLoaded', attach, {once: true});
     })();
     """
+    version = hashlib.sha1(script.encode("utf-8")).hexdigest()[:10]
+    return script.replace("__OVERLAY_VERSION__", version)
 
 def get_landing_page_html():
     """Returns the HTML for the landing page"""
@@ -0,0 +1,150 @@
+"""
+Intent Grammar Module
+Local rule-based parser for trivial commands that don't need the AI
+"""
+
+import re
+from cache import normalize_command
+from site_resolver import KNOWN_TLDS
+
+# Spoken key names -> Playwright key names
+KEY_NAMES = {
+    "enter": "Enter", "return": "Enter",
+    "escape": "Escape", "esc": "Escape",
+    "tab": "Tab", "space": "Space", "spacebar": "Space",
+    "backspace": "Backspace", "delete": "Delete",
+    "up": "ArrowUp", "arrow up": "ArrowUp", "up arrow": "ArrowUp",
+    "down": "ArrowDown", "arrow down": "ArrowDown", "down arrow": "ArrowDown",
+    "left": "ArrowLeft", "arrow left": "ArrowLeft", "left arrow": "ArrowLeft",
+    "right": "ArrowRight", "arrow right": "ArrowRight", "right arrow": "ArrowRight",
+    "home": "Home", "end": "End",
+    "page up": "PageUp", "page down": "PageDown",
+}
+
+COUNT_WORDS = {
+    "once": 1, "one": 1, "twice": 2, "two": 2, "three": 3, "thrice": 3,
+    "four": 4, "five": 5,
+}
+
+# Filler that doesn't change the meaning of a command
+FILLER = re.compile(r"^(please |can you |could you |now |just )+|( please| now| for me)+$")
+
+MAX_REPEAT = 10
+
+
+def _count(text):
+    """Parse a repeat count like '3', '3 times' or 'twice' (defaults to 1)"""
+    if not text:
+        return 1
+    text = text.replace("times", "").replace("time", "").strip()
+    count = int(text) if text.isdigit() else COUNT_WORDS.get(text, 1)
+    return max(1, min(count, MAX_REPEAT))
+
+
+def _scroll(match):
+    direction = "up" if match.group("dir") in ("up", "upwards") else "down"
+    return [
+        {"action": "scroll", "value": direction, "description": f"Scroll {direction}"}
+        for _ in range(_count(match.group("count")))
+    ]
+
+
+def _scroll_edge(match):
+    key = "Home" if match.group("edge") in ("top", "start", "beginning") else "End"
+    return [{"action": "press_key", "value": key, "description": f"Scroll to the {match.group('edge')}"}]
+
+
+def _press(match):
+    key = KEY_NAMES.get(match.group("key"))
+    if key is None:
+        return None
+    return [
+        {"action": "press_key", "value": key, "description": f"Press {key}"}
+        for _ in range(_count(match.group("count")))
+    ]
+
+
+def _wait(match):
+    amount = float(match.group("amount"))
+    milliseconds = int(amount if match.group("unit").startswith("m") else amount * 1000)
+    return [{"action": "wait", "value": str(milliseconds), "description": f"Wait {milliseconds}ms"}]
+
+
+def _navigate(match):
+    url = match.group("url")
+    host = url.split("://")[-1].split("/")[0]
+    if host.rsplit(".", 1)[-1] not in KNOWN_TLDS:
+        return None
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+    return [{"action": "navigate", "value": url, "description": f"Navigate to {url}"}]
+
+
+def _fixed(action, description):
+    return lambda match: [{"action": action, "description": description}]
+
+
+COUNT = r"(?: (?P<count>\d+|once|twice|thrice|one|two|three|four|five)(?: times?)?)?"
+
+GRAMMAR = [
+    (re.compile(r"(?:scroll|page|move|go)? ?(?P<dir>down|up|upwards|downwards)(?: a bit| the page| page)?" + COUNT),
+     _scroll),
+    (re.compile(r"(?:scroll|go|jump|move) (?:to|back to) (?:the )?(?P<edge>top|bottom|start|beginning|end)(?: of the page)?"),
+     _scroll_edge),
+    (re.compile(r"(?:go |navigate |move )?back(?: a page| one page)?|previous page|go to (?:the )?previous page"),
+     _fixed("back", "Go back")),
+    (re.compile(r"(?:go |navigate |move )?forward(?: a page| one page)?"),
+     _fixed("forward", "Go forward")),
+    (re.compile(r"(?:reload|refresh)(?: the)?(?: page| this page| tab)?"),
+     _fixed("reload", "Reload the page")),
+    (re.compile(r"(?:press|hit|tap|push)(?: the)? (?P<key>[a-z ]+?)(?: key| button)?" + COUNT),
+     _press),
+    (re.compile(r"wait(?: for)? (?P<amount>\d+(?:\.\d+)?) ?(?P<unit>seconds?|secs?|s|milliseconds?|ms)"),
+     _wait),
+    (re.compile(r"(?:go to|open|navigate to|visit|load) (?P<url>(?:https?://)?[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}(?:/\S*)?)"),
+     _navigate),
+]
+
+
+class LocalIntentParser:
+    """Maps trivial commands directly onto actions, bypassing the AI"""
+
+    def __init__(self):
+        """Initialize counters"""
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, command):
+        """
+        Try to interpret a command locally
+
+        Args:
+            command (str): User's natural language command
+
+        Returns:
+            list: Action dictionaries, or None if the AI is needed
+        """
+        text = FILLER.sub("", normalize_command(command)).strip()
+        for pattern, build in GRAMMAR:
+            match = pattern.fullmatch(text)
+            if match:
+                actions = build(match)
+                if actions:
+                    self.hits += 1
+                    return actions
+        self.misses += 1
+        return None
+
+    def stats(self):
+        """
+        Get fast-path counters
+
+        Returns:
+            dict: Commands short-circuited locally vs sent to the AI
+        """
+        total = self.hits + self.misses
+        return {
+            "short_circuited": self.hits,
+            "sent_to_ai": self.misses,
+            "short_circuit_rate": round(self.hits / total, 3) if total else 0.0
+        }
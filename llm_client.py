@@ -0,0 +1,252 @@
+"""
+LLM Client Module
+Pluggable async LLM backends that never block the browser event loop:
+Gemini for real use, and a scripted local stand-in for offline profiling and load tests
+"""
+
+import asyncio
+import json
+import random
+import re
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+
+
+class LLMBackend(ABC):
+    """Base class: concurrency limit and per-call deadlines around a backend's completion calls"""
+
+    name = "base"
+
+    def __init__(self):
+        """Initialize the concurrency limiter"""
+        # Semaphores are bound to a loop, so one is created per loop lazily
+        self._semaphores = {}
+
+    def _semaphore(self):
+        """Return the concurrency limiter for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(Config.LLM_MAX_CONCURRENCY)
+        return self._semaphores[loop]
+
+    async def generate(self, prompt, json_mode=False, timeout=None):
+        """
+        Generate a completion for a prompt
+
+        Args:
+            prompt (str): Prompt text
+            json_mode (bool): Ask the model for a JSON response
+            timeout (float): Deadline in seconds, defaults to Config.LLM_TIMEOUT
+
+        Returns:
+            str: Response text
+
+        Raises:
+            asyncio.TimeoutError: If the deadline passes (the call is cancelled)
+            Exception: If the backend call fails
+        """
+        timeout = Config.LLM_TIMEOUT if timeout is None else timeout
+        async with self._semaphore():
+            return await asyncio.wait_for(self._complete(prompt, json_mode), timeout)
+
+    async def stream(self, prompt, timeout=None):
+        """
+        Stream a completion chunk by chunk
+
+        A task holding a concurrency slot reads the backend into a queue, so the
+        deadline and the slot only cover the backend call, not the time the
+        consumer spends between chunks (e.g. running the actions already parsed).
+
+        Args:
+            prompt (str): Prompt text
+            timeout (float): Deadline in seconds for the backend stream, defaults to Config.LLM_TIMEOUT
+
+        Yields:
+            str: Response text chunks as they arrive
+
+        Raises:
+            asyncio.TimeoutError: If the backend hasn't finished streaming by the deadline
+            Exception: If the backend call fails
+        """
+        timeout = Config.LLM_TIMEOUT if timeout is None else timeout
+        received = asyncio.Queue()
+
+        async def read():
+            chunks = self._stream(prompt)
+            try:
+                async for chunk in chunks:
+                    if chunk:
+                        received.put_nowait(chunk)
+            finally:
+                await chunks.aclose()
+
+        async def pump():
+            async with self._semaphore():
+                await asyncio.wait_for(read(), timeout)
+
+        task = asyncio.ensure_future(pump())
+        task.add_done_callback(lambda _: received.put_nowait(None))
+        try:
+            while True:
+                chunk = await received.get()
+                if chunk is None:
+                    task.result()  # re-raises a timeout or backend error
+                    return
+                yield chunk
+        finally:
+            # The consumer stopped early (error, cancellation): free the slot
+            if not task.done():
+                task.cancel()
+
+    @abstractmethod
+    async def _complete(self, prompt, json_mode):
+        """Return the full response text (implemented by backends)"""
+
+    async def _stream(self, prompt):
+        """Yield response text chunks (backends without streaming yield one chunk)"""
+        yield await self._complete(prompt, False)
+
+    def close(self):
+        """Release backend resources"""
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini via google-generativeai"""
+
+    name = "gemini"
+
+    def __init__(self):
+        """Configure the Gemini SDK and model"""
+        super().__init__()
+        import google.generativeai as genai
+
+        genai.configure(api_key=Config.GEMINI_API_KEY)
+        self.model = genai.GenerativeModel(Config.GEMINI_MODEL)
+        # Bounded offload pool, only used if the SDK has no native async call
+        self._executor = ThreadPoolExecutor(
+            max_workers=Config.LLM_MAX_CONCURRENCY,
+            thread_name_prefix="llm"
+        )
+
+    async def _complete(self, prompt, json_mode):
+        """Issue the request natively async, or offload the sync call to the pool"""
+        generation_config = {"response_mime_type": "application/json"} if json_mode else None
+        if hasattr(self.model, "generate_content_async"):
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config=generation_config
+            )
+        else:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                self._executor,
+                lambda: self.model.generate_content(prompt, generation_config=generation_config)
+            )
+        return response.text
+
+    async def _stream(self, prompt):
+        """Stream natively, or deliver the whole response as one chunk"""
+        if not hasattr(self.model, "generate_content_async"):
+            yield await self._complete(prompt, False)
+            return
+
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            yield chunk.text
+
+    def close(self):
+        """Shut down the offload pool"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class StandInBackend(LLMBackend):
+    """
+    Deterministic local stand-in that replays scripted responses.
+
+    Script file (Config.STANDIN_SCRIPT_PATH) is a JSON list of rules, first match wins:
+        [{"match": "open .*youtube", "response": {"url": "https://www.youtube.com", "description": "..."}},
+         {"match": "search for (.+)", "response": [{"action": "type", ...}]}]
+    "match" is a regex searched in the user command of the prompt. Latency is
+    Config.STANDIN_LATENCY_MS +/- Config.STANDIN_JITTER_MS from a seeded generator,
+    so runs are reproducible.
+    """
+
+    name = "standin"
+
+    COMMAND = re.compile(r'User Command: "(.*)"')
+    DEFAULT_NAVIGATION = {"url": None, "description": "The stand-in backend has no script for this command."}
+    DEFAULT_ACTIONS = [{"action": "scroll", "value": "down", "description": "Scroll down (stand-in)"}]
+
+    def __init__(self, script_path=None):
+        """
+        Args:
+            script_path (str): JSON rule file, defaults to Config.STANDIN_SCRIPT_PATH
+        """
+        super().__init__()
+        self.rules = []
+        self.random = random.Random(Config.STANDIN_SEED)
+        self.calls = 0
+        path = script_path or Config.STANDIN_SCRIPT_PATH
+        if path:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.rules = [(re.compile(rule["match"], re.IGNORECASE), rule["response"]) for rule in json.load(f)]
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ [StandInBackend]: Could not load script {path} - {str(e)}")
+
+    def _respond(self, prompt, json_mode):
+        """Pick the scripted response for a prompt"""
+        match = self.COMMAND.search(prompt)
+        command = match.group(1) if match else prompt
+        for pattern, response in self.rules:
+            if pattern.search(command):
+                return response if isinstance(response, str) else json.dumps(response)
+        return json.dumps(self.DEFAULT_NAVIGATION if json_mode else self.DEFAULT_ACTIONS)
+
+    def _delay(self):
+        """Seconds of simulated model latency"""
+        jitter = self.random.uniform(-Config.STANDIN_JITTER_MS, Config.STANDIN_JITTER_MS)
+        return max(0.0, Config.STANDIN_LATENCY_MS + jitter) / 1000
+
+    async def _complete(self, prompt, json_mode):
+        self.calls += 1
+        await asyncio.sleep(self._delay())
+        return self._respond(prompt, json_mode)
+
+    async def _stream(self, prompt):
+        """Spread the simulated latency over fixed-size chunks of the response"""
+        self.calls += 1
+        text = self._respond(prompt, False)
+        size = Config.STANDIN_CHUNK_CHARS
+        chunks = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        per_chunk = self._delay() / len(chunks)
+        for chunk in chunks:
+            await asyncio.sleep(per_chunk)
+            yield chunk
+
+
+BACKENDS = {
+    GeminiBackend.name: GeminiBackend,
+    StandInBackend.name: StandInBackend,
+}
+
+
+def create_backend(name=None):
+    """
+    Create the LLM backend selected in Config
+
+    Args:
+        name (str): Backend name, defaults to Config.LLM_BACKEND
+
+    Returns:
+        LLMBackend: Backend instance
+
+    Raises:
+        Exception: If the backend name is unknown
+    """
+    name = (name or Config.LLM_BACKEND).lower()
+    if name not in BACKENDS:
+        raise Exception(f"ERROR [llm_client.create_backend]: Unknown LLM backend '{name}' (choose from {', '.join(BACKENDS)})")
+    print(f"→ Using LLM backend: {name}")
+    return BACKENDS[name]()
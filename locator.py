@@ -0,0 +1,180 @@
+"""
+Locator Module
+Resolves click targets by CSS, text, accessible name and label in one in-page query,
+remembering which strategy works on each site, and heals selectors that stopped matching
+"""
+
+import itertools
+import re
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+from config import Config
+from cache import PersistentLRUCache
+from page_scripts import get_locate_script, get_fingerprint_script, get_heal_script
+from element_fingerprints import FingerprintStore
+
+STRATEGIES = ("css", "text", "role", "label")
+
+# Playwright selector engines ('text=', 'xpath=', chained '>>') are passed through as-is
+PLAYWRIGHT_SELECTOR = re.compile(r"^(css|text|xpath|role|id|data-testid|internal:[\w-]+)=|>>|^//")
+
+
+class LocatorResolver:
+    """Finds the one element a selector or label means, trying every strategy per poll"""
+
+    def __init__(self):
+        """Initialize the per-site strategy cache and the element fingerprint store"""
+        self.cache = PersistentLRUCache(
+            "locator_strategies",
+            max_entries=Config.LOCATOR_CACHE_SIZE,
+            ttl=Config.LOCATOR_CACHE_TTL,
+            db_path=Config.CACHE_DB_PATH
+        )
+        self.fingerprints = FingerprintStore()
+        self._tokens = itertools.count(1)
+        self._timings = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self.strategies = {}
+        self.ambiguous = 0
+        self.not_found = 0
+
+    def order(self, url):
+        """
+        Strategies to try on a page, the ones that won most often on its site first
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            list: Strategy names
+        """
+        wins = self.cache.get(urlsplit(url).netloc) or {}
+        return sorted(STRATEGIES, key=lambda strategy: -wins.get(strategy, 0))
+
+    async def resolve(self, page, target, timeout=None):
+        """
+        Locate the element a click target refers to
+
+        Args:
+            page: Playwright page
+            target (str): CSS selector, visible text, accessible name or label
+            timeout (int): Milliseconds to wait for a match, defaults to Config.CLICK_TIMEOUT
+
+        Returns:
+            tuple: (selector that matches exactly that element, strategy that found it -
+                    'healed' if it was relocated by its fingerprint after the wait timed out)
+
+        Raises:
+            Exception: If nothing visible matches within the timeout
+        """
+        if PLAYWRIGHT_SELECTOR.search(target):
+            return target, "playwright"
+
+        timeout = Config.CLICK_TIMEOUT if timeout is None else timeout
+        url = page.url
+        stored = self.fingerprints.get(url, target)
+        token = str(next(self._tokens))
+        started = time.perf_counter()
+        try:
+            # Runs right away, then polls until the element shows up
+            handle = await page.wait_for_function(
+                get_locate_script(),
+                arg={"target": target, "order": self.order(url), "token": token},
+                polling=100,
+                timeout=timeout
+            )
+            result = await handle.json_value()
+        except Exception as e:
+            # Only once the real target had its chance to render: it may have changed on the site
+            healed = await self.heal(page, None, stored)
+            if healed:
+                return healed, "healed"
+            with self._lock:
+                self.not_found += 1
+            raise Exception(f"ERROR [LocatorResolver.resolve]: Nothing visible matches '{target}' - {str(e).splitlines()[0]}")
+
+        strategy = result["strategy"]
+        with self._lock:
+            self._timings.append((time.perf_counter() - started) * 1000)
+            self.strategies[strategy] = self.strategies.get(strategy, 0) + 1
+            if result["matches"] > 1:
+                self.ambiguous += 1
+        self.fingerprints.record(url, target, result["fingerprint"], stored)
+        if result["matches"] == 1:
+            host = urlsplit(url).netloc
+            wins = self.cache.get(host) or {}
+            wins[strategy] = wins.get(strategy, 0) + 1
+            self.cache.set(host, wins)
+        return f'[data-pmb-locate="{token}"]', strategy
+
+    async def remember(self, page, selector):
+        """
+        Record the fingerprint of the element a selector just targeted successfully
+
+        Args:
+            page: Playwright page
+            selector (str): Selector as the AI wrote it
+        """
+        if PLAYWRIGHT_SELECTOR.search(selector):
+            return
+        url = page.url
+        try:
+            fingerprint = await page.evaluate(get_fingerprint_script(), selector)
+        except Exception:
+            return  # e.g. the action navigated away
+        self.fingerprints.record(url, selector, fingerprint, self.fingerprints.get(url, selector))
+
+    async def heal(self, page, selector, fingerprint=None):
+        """
+        Relocate the element a selector used to target (call only after waiting for it timed out)
+
+        Args:
+            page: Playwright page
+            selector (str): Selector as the AI wrote it; if it still matches something, nothing is healed.
+                            None skips that check (click targets may be text)
+            fingerprint (dict): Fingerprint to match, defaults to the one recorded for the selector
+
+        Returns:
+            str: Selector matching the relocated element, or None if none is similar enough
+        """
+        if selector is not None:
+            if PLAYWRIGHT_SELECTOR.search(selector):
+                return None
+            fingerprint = self.fingerprints.get(page.url, selector)
+        if not fingerprint:
+            return None
+        token = str(next(self._tokens))
+        try:
+            result = await page.evaluate(get_heal_script(), {
+                "selector": selector, "fingerprint": fingerprint, "token": token, "minScore": Config.HEAL_MIN_SCORE
+            })
+        except Exception:
+            result = None
+        # The stand-in's fingerprint is not recorded: the selector still means the original element
+        self.fingerprints.count_heal(result is not None)
+        if result is None:
+            return None
+        print(f"→ Healed '{selector or fingerprint.get('text') or fingerprint['tag']}' by its fingerprint (score {result['score']})")
+        return f'[data-pmb-locate="{token}"]'
+
+    def stats(self):
+        """
+        Get resolver counters
+
+        Returns:
+            dict: Wins per strategy, ambiguous and missed targets, resolve time percentiles,
+                  healing counters
+        """
+        with self._lock:
+            timings = sorted(self._timings)
+            return {
+                "strategies": dict(self.strategies),
+                "ambiguous": self.ambiguous,
+                "not_found": self.not_found,
+                "p50_resolve_ms": round(timings[len(timings) // 2], 1) if timings else None,
+                "p95_resolve_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1) if timings else None,
+                "cache": self.cache.stats(),
+                "fingerprints": self.fingerprints.stats()
+            }
@@ -0,0 +1,868 @@
+"""
+Page Scripts Module
+JavaScript evaluated inside the page for structure inspection
+"""
+
+import json
+
+def get_structure_fingerprint_script():
+    """
+    Returns a JavaScript function that hashes the page's structural template.
+
+    Only tag names, ids, form layouts and control names/types are used, and each
+    signature is counted once, so two pages from the same site template (e.g. two
+    search result pages) share a fingerprint while their text differs.
+    """
+    return """
+    () => {
+        const signatures = new Set();
+        const walk = (el, depth) => {
+            if (depth > 4) return;
+            for (const child of el.children) {
+                if (['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE'].includes(child.tagName)) continue;
+                if (child.id === 'ai-control-overlay') continue;
+                signatures.add(depth + ':' + child.tagName + (child.id ? '#' + child.id : ''));
+                walk(child, depth + 1);
+            }
+        };
+        if (document.body) walk(document.body, 0);
+
+        document.querySelectorAll('form').forEach(form => {
+            const fields = Array.from(form.elements)
+                .map(f => f.tagName + ':' + (f.type || '') + ':' + (f.name || f.id || ''))
+                .join(',');
+            signatures.add('form:' + (form.getAttribute('action') || '') + '[' + fields + ']');
+        });
+        document.querySelectorAll('input, select, textarea, button').forEach(el => {
+            if (el.name || el.id) signatures.add('ctl:' + el.tagName + ':' + (el.name || el.id));
+        });
+
+        // FNV-1a over the sorted signatures
+        let hash = 0x811c9dc5;
+        for (const ch of Array.from(signatures).sort().join('|')) {
+            hash ^= ch.charCodeAt(0);
+            hash = Math.imul(hash, 0x01000193) >>> 0;
+        }
+        return hash.toString(16).padStart(8, '0');
+    }
+    """
+
+def get_selector_check_script():
+    """
+    Returns a JavaScript function that checks which selectors still resolve.
+
+    Takes a list of [selector, allow_text] pairs. A selector resolves if it matches
+    an element as CSS, or (when allow_text is true) appears as visible page text,
+    mirroring the text fallback in BrowserActions.click.
+    """
+    return """
+    (checks) => checks.map(([selector, allowText]) => {
+        try {
+            if (document.querySelector(selector)) return true;
+        } catch (e) {
+            // Not valid CSS, may still be visible text
+        }
+        return allowText && !!document.body && document.body.innerText.includes(selector);
+    })
+    """
+
+# Shared helpers defining collectElements(maxElements): visible interactive elements,
+# viewport first, as {el, role, name, selector, box, in_viewport}
+_ELEMENT_HELPERS = r"""
+        const INTERACTIVE = [
+            'a[href]', 'button', 'input:not([type="hidden"])', 'select', 'textarea', 'summary',
+            '[role="button"]', '[role="link"]', '[role="checkbox"]', '[role="radio"]',
+            '[role="tab"]', '[role="menuitem"]', '[role="option"]', '[role="switch"]',
+            '[role="combobox"]', '[role="searchbox"]', '[role="textbox"]',
+            '[contenteditable=""]', '[contenteditable="true"]', '[onclick]'
+        ].join(',');
+        const INPUT_ROLES = {
+            checkbox: 'checkbox', radio: 'radio', button: 'button', submit: 'button',
+            reset: 'button', image: 'button', search: 'searchbox', range: 'slider'
+        };
+        const quote = v => '"' + v.replace(/\\/g, '\\\\').replace(/"/g, '\\"') + '"';
+        const clean = v => (v || '').replace(/\s+/g, ' ').trim().slice(0, 80);
+        const isUnique = sel => {
+            try { return document.querySelectorAll(sel).length === 1; } catch (e) { return false; }
+        };
+
+        const roleOf = el => {
+            const explicit = el.getAttribute('role');
+            if (explicit) return explicit.split(' ')[0];
+            const tag = el.tagName.toLowerCase();
+            if (tag === 'a') return 'link';
+            if (tag === 'button' || tag === 'summary') return 'button';
+            if (tag === 'select') return el.multiple ? 'listbox' : 'combobox';
+            if (tag === 'textarea') return 'textbox';
+            if (tag === 'input') return INPUT_ROLES[(el.type || 'text').toLowerCase()] || 'textbox';
+            return el.isContentEditable ? 'textbox' : 'generic';
+        };
+
+        const nameOf = el => {
+            const labelledBy = el.getAttribute('aria-labelledby');
+            if (labelledBy) {
+                const text = labelledBy.split(' ')
+                    .map(id => document.getElementById(id))
+                    .filter(Boolean).map(n => n.innerText).join(' ');
+                if (clean(text)) return clean(text);
+            }
+            const direct = el.getAttribute('aria-label');
+            if (clean(direct)) return clean(direct);
+            if (el.labels && el.labels.length) return clean(el.labels[0].innerText);
+            if (el.tagName === 'INPUT' && ['button', 'submit', 'reset'].includes(el.type)) {
+                return clean(el.value);
+            }
+            return clean(el.innerText) || clean(el.getAttribute('alt'))
+                || clean(el.getAttribute('title')) || clean(el.getAttribute('placeholder'))
+                || clean((el.querySelector('img[alt]') || {}).alt);
+        };
+
+        const selectorOf = el => {
+            const tag = el.tagName.toLowerCase();
+            if (el.id && isUnique('#' + CSS.escape(el.id))) return '#' + CSS.escape(el.id);
+            for (const attr of ['data-testid', 'data-test', 'name', 'aria-label', 'placeholder', 'title', 'href']) {
+                const value = el.getAttribute(attr);
+                if (!value || value.length > 120) continue;
+                const sel = tag + '[' + attr + '=' + quote(value) + ']';
+                if (isUnique(sel)) return sel;
+            }
+            // Positional path up to the nearest ancestor with an id
+            const parts = [];
+            for (let node = el; node && node.nodeType === 1 && node !== document.documentElement; node = node.parentElement) {
+                if (node !== el && node.id) {
+                    parts.unshift('#' + CSS.escape(node.id));
+                    break;
+                }
+                let index = 1;
+                for (let sib = node.previousElementSibling; sib; sib = sib.previousElementSibling) {
+                    if (sib.tagName === node.tagName) index++;
+                }
+                parts.unshift(node.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+            }
+            return parts.join(' > ');
+        };
+
+        const collectElements = maxElements => {
+            const vw = window.innerWidth, vh = window.innerHeight;
+            const inView = [], offView = [];
+            for (const el of document.querySelectorAll(INTERACTIVE)) {
+                if (el.closest('#ai-control-overlay')) continue;
+                const rect = el.getBoundingClientRect();
+                if (rect.width === 0 || rect.height === 0) continue;
+                const style = getComputedStyle(el);
+                if (style.visibility === 'hidden' || style.display === 'none' || style.opacity === '0') continue;
+                if (el.disabled) continue;
+
+                const visible = rect.bottom > 0 && rect.right > 0 && rect.top < vh && rect.left < vw;
+                (visible ? inView : offView).push({
+                    el, visible,
+                    box: [Math.round(rect.left), Math.round(rect.top + window.scrollY),
+                          Math.round(rect.width), Math.round(rect.height)]
+                });
+            }
+            return inView.concat(offView).slice(0, maxElements).map(item => ({
+                el: item.el,
+                role: roleOf(item.el),
+                name: nameOf(item.el),
+                selector: selectorOf(item.el),
+                box: item.box,
+                in_viewport: item.visible
+            }));
+        };
+"""
+
+def get_element_index_script():
+    """
+    Returns a JavaScript function that indexes the page's visible interactive elements.
+
+    Each entry has the element's role, accessible name, a selector that uniquely
+    matches it, its bounding box and whether it is inside the viewport. Elements in
+    the viewport come first so a token budget keeps the ones the user can see.
+    """
+    return "(maxElements) => {" + _ELEMENT_HELPERS + r"""
+        return collectElements(maxElements).map(({el, ...entry}, index) => ({index, ...entry}));
+    }
+    """
+
+def get_snapshot_agent_script():
+    """
+    Returns a JavaScript function that installs the incremental snapshot agent.
+
+    The agent (window.__pmbSnapshot) watches the DOM with a MutationObserver and
+    keeps a versioned element index. since(version) rescans only if something
+    changed and returns just the entries added, changed or removed after that
+    version, plus the element order if it moved. A version the agent can no
+    longer diff against gets a full snapshot. Installing twice is a no-op.
+    """
+    return "() => {\n        if (window.__pmbSnapshot) return window.__pmbSnapshot.id;" + _ELEMENT_HELPERS + r"""
+        const agent = {
+            id: Math.random().toString(36).slice(2),
+            version: 0,
+            dirty: true,
+            keys: new WeakMap(),
+            nextKey: 1,
+            last: new Map(),    // key -> serialized entry at the current version
+            order: [],
+            log: [],            // [{version, changed, removed, reordered}], most recent last
+        };
+        const LOG_SIZE = 50;
+        const keyOf = el => {
+            if (!agent.keys.has(el)) agent.keys.set(el, agent.nextKey++);
+            return agent.keys.get(el);
+        };
+        const markDirty = () => { agent.dirty = true; };
+
+        const inOverlay = node => {
+            const el = node.nodeType === 1 ? node : node.parentElement;
+            return !!(el && el.closest('#ai-control-overlay'));
+        };
+        new MutationObserver(records => {
+            // Overlay status updates don't change the page
+            if (records.some(r => !inOverlay(r.target))) markDirty();
+        }).observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+        window.addEventListener('scroll', markDirty, {passive: true, capture: true});
+        window.addEventListener('resize', markDirty, {passive: true});
+
+        agent.refresh = maxElements => {
+            if (!agent.dirty) return;
+            agent.dirty = false;
+            const current = new Map();
+            const order = [];
+            for (const {el, ...entry} of collectElements(maxElements)) {
+                const key = keyOf(el);
+                current.set(key, JSON.stringify(entry));
+                order.push(key);
+            }
+            const changed = [], removed = [];
+            for (const [key, value] of current) if (agent.last.get(key) !== value) changed.push(key);
+            for (const key of agent.last.keys()) if (!current.has(key)) removed.push(key);
+            const reordered = order.join(',') !== agent.order.join(',');
+            if (changed.length || removed.length || reordered) {
+                agent.version++;
+                agent.log.push({version: agent.version, changed, removed, reordered});
+                if (agent.log.length > LOG_SIZE) agent.log.shift();
+            }
+            agent.last = current;
+            agent.order = order;
+        };
+
+        agent.since = (version, maxElements) => {
+            agent.refresh(maxElements);
+            const entries = keys => keys.filter(k => agent.last.has(k))
+                .map(k => Object.assign({key: k}, JSON.parse(agent.last.get(k))));
+            const oldest = agent.log.length ? agent.log[0].version - 1 : agent.version;
+            if (version === null || version > agent.version || version < oldest) {
+                return {id: agent.id, version: agent.version, full: true,
+                        upserts: entries(agent.order), removed: [], order: agent.order};
+            }
+            const changed = new Set(), removed = new Set();
+            let reordered = false;
+            for (const step of agent.log) {
+                if (step.version <= version) continue;
+                step.changed.forEach(k => { changed.add(k); removed.delete(k); });
+                step.removed.forEach(k => { removed.add(k); changed.delete(k); });
+                reordered = reordered || step.reordered;
+            }
+            return {id: agent.id, version: agent.version, full: false,
+                    upserts: entries(Array.from(changed)), removed: Array.from(removed),
+                    order: reordered ? agent.order : null};
+        };
+
+        window.__pmbSnapshot = agent;
+        return agent.id;
+    }
+    """
+
+def get_snapshot_since_script():
+    """
+    Returns a JavaScript function that asks the snapshot agent for changes.
+
+    Takes [agent_id, version, max_elements]; a different agent id (the page was
+    replaced) gets a full snapshot. Returns null if the agent isn't installed.
+    """
+    return """
+    ([agentId, version, maxElements]) => {
+        const agent = window.__pmbSnapshot;
+        if (!agent) return null;
+        return agent.since(agent.id === agentId ? version : null, maxElements);
+    }
+    """
+
+def get_interactive_ready_script():
+    """
+    Returns a JavaScript predicate that is true once the page can be used.
+
+    Ready means the body has parsed and at least one visible, enabled
+    interactive element is inside the viewport (the overlay doesn't count).
+    """
+    return """
+    () => {
+        if (!document.body) return false;
+        const candidates = document.querySelectorAll(
+            'a[href], button, input:not([type="hidden"]), select, textarea, [role="button"], [role="link"], [role="searchbox"]'
+        );
+        for (const el of candidates) {
+            if (el.disabled || el.closest('#ai-control-overlay')) continue;
+            const rect = el.getBoundingClientRect();
+            if (rect.width > 0 && rect.height > 0 && rect.top < window.innerHeight && rect.bottom > 0) return true;
+        }
+        return false;
+    }
+    """
+
+def get_dom_quiet_script():
+    """
+    Returns a JavaScript predicate that is true once the DOM has stopped changing.
+
+    Takes the quiet window in milliseconds. The first call installs a mutation
+    observer that timestamps every change; the predicate then holds once the
+    document has parsed and nothing has changed for the whole window.
+    """
+    return """
+    (quietMs) => {
+        if (!window.__pmbQuiet) {
+            const state = {last: performance.now()};
+            new MutationObserver(() => { state.last = performance.now(); })
+                .observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+            window.__pmbQuiet = state;
+        }
+        return document.readyState !== 'loading' && performance.now() - window.__pmbQuiet.last >= quietMs;
+    }
+    """
+
+# Reader view, active while <html data-pmb-simplified> is set. Everything outside the
+# main node and its ancestors is hidden, so nothing is removed from the page.
+_SIMPLIFY_CSS = """
+html[data-pmb-simplified] body *:not([data-pmb-keep]):not([data-pmb-main]):not([data-pmb-main] *):not(#ai-control-overlay):not(#ai-control-overlay *) {
+    display: none !important;
+}
+html[data-pmb-simplified] [data-pmb-main] :is(script, style, iframe, noscript, [role="banner"], [role="navigation"],
+    header, footer, nav, aside, .advertisement, .ads, .cookie-banner, .popup, .modal, .sidebar) {
+    display: none !important;
+}
+html[data-pmb-simplified], html[data-pmb-simplified] [data-pmb-keep] {
+    display: block !important; width: auto !important; max-width: none !important; height: auto !important;
+    margin: 0 !important; padding: 0 !important; float: none !important; position: static !important;
+    transform: none !important; overflow: visible !important; background: white !important;
+}
+html[data-pmb-simplified] [data-pmb-main] {
+    display: block !important; max-width: 800px !important; margin: 0 auto !important; padding: 20px !important;
+    float: none !important; position: static !important; font-family: Georgia, serif !important;
+    font-size: 18px !important; line-height: 1.6 !important; background: white !important; color: #333 !important;
+}
+"""
+
+# Readability-style main content scoring, shared by the simplify script
+_CONTENT_HELPERS = r"""
+        const POSITIVE = /article|body|content|entry|main|page|post|text|blog|story/i;
+        const NEGATIVE = /comment|meta|footer|footnote|sidebar|nav|menu|advert|\bads?\b|banner|promo|related|share|social|sponsor|popup|modal|cookie|widget|masthead/i;
+        const TAG_WEIGHT = {ARTICLE: 10, MAIN: 10, SECTION: 3, DIV: 5, PRE: 3, TD: 3, BLOCKQUOTE: 3,
+                            FORM: -3, OL: -3, UL: -3, DL: -3, LI: -3, TH: -5, H1: -5, H2: -5, H3: -5};
+        const BOILERPLATE = 'nav, header, footer, aside, form, [role="navigation"], [role="banner"], [role="contentinfo"], #ai-control-overlay';
+
+        const classWeight = el => {
+            const names = (typeof el.className === 'string' ? el.className : '') + ' ' + el.id;
+            return (NEGATIVE.test(names) ? -25 : 0) + (POSITIVE.test(names) ? 25 : 0);
+        };
+
+        // FNV-1a over the page text (first 100k characters) plus its length
+        const contentHash = () => {
+            const text = document.body.textContent;
+            let hash = 0x811c9dc5;
+            for (let i = 0; i < Math.min(text.length, 100000); i++) {
+                hash ^= text.charCodeAt(i);
+                hash = Math.imul(hash, 0x01000193);
+            }
+            return (hash >>> 0).toString(16) + ':' + text.length;
+        };
+
+        const pathOf = el => {
+            if (el === document.body) return 'body';
+            const parts = [];
+            for (let node = el; node && node !== document.body; node = node.parentElement) {
+                if (node.id && document.querySelectorAll('#' + CSS.escape(node.id)).length === 1) {
+                    parts.unshift('#' + CSS.escape(node.id));
+                    return parts.join(' > ');
+                }
+                let index = 1;
+                for (let sib = node.previousElementSibling; sib; sib = sib.previousElementSibling) {
+                    if (sib.tagName === node.tagName) index++;
+                }
+                parts.unshift(node.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+            }
+            return 'body > ' + parts.join(' > ');
+        };
+
+        const linkDensity = (el, textLength) => {
+            let linkText = 0;
+            for (const a of el.querySelectorAll('a')) linkText += a.textContent.trim().length;
+            return textLength ? Math.min(1, linkText / textLength) : 1;
+        };
+
+        // One pass over text blocks: each adds points to its parent, half to the
+        // grandparent and a third to the next ancestor; the best-scoring container
+        // after a link density penalty is the main content
+        const findMainContent = () => {
+            const scores = new Map();
+            let blocks = 0;
+            for (const block of document.body.querySelectorAll('p, pre, td, blockquote')) {
+                if (block.closest(BOILERPLATE)) continue;
+                const text = block.textContent.trim();
+                if (text.length < 25) continue;
+                blocks++;
+                const points = text.split(',').length + Math.min(Math.floor(text.length / 100), 3);
+                let ancestor = block.parentElement;
+                for (let level = 1; level <= 3 && ancestor && ancestor !== document.documentElement; level++) {
+                    if (!scores.has(ancestor)) {
+                        scores.set(ancestor, (TAG_WEIGHT[ancestor.tagName] || 0) + classWeight(ancestor));
+                    }
+                    scores.set(ancestor, scores.get(ancestor) + points / level);
+                    ancestor = ancestor.parentElement;
+                }
+            }
+
+            // Link density needs the full text, so only the strongest few pay for it
+            let best = null, bestScore = -Infinity;
+            const top = Array.from(scores.entries()).sort((a, b) => b[1] - a[1]).slice(0, 10);
+            for (const [el, score] of top) {
+                const textLength = el.textContent.trim().length;
+                const adjusted = score * (1 - linkDensity(el, textLength));
+                if (adjusted > bestScore) {
+                    best = el;
+                    bestScore = adjusted;
+                }
+            }
+
+            if (best && best !== document.body && best.textContent.trim().length >= 140) {
+                return {el: best, score: Math.round(bestScore * 10) / 10, source: 'scored', blocks};
+            }
+            const semantic = document.querySelector('main, article, [role="main"], .content, #content');
+            return {el: semantic || document.body, score: null, source: 'fallback', blocks};
+        };
+"""
+
+def get_simplify_script():
+    """
+    Returns a JavaScript function that switches the page to a reader view in place.
+
+    Takes the cached extractions for this URL ({content hash: {path, score}}). If
+    the page's content hash has one whose path still matches, scoring is skipped;
+    otherwise the main content is found by scoring. The main node and its
+    ancestors are marked with data attributes and a constructed stylesheet (not
+    subject to the page's style CSP) hides the rest, so scripts, form state and
+    listeners survive.
+
+    Returns {hash, path, score, source, blocks, extract_ms}, where source is
+    'scored', 'fallback' (nothing scored well), 'cache' or 'active' (already
+    simplified), or null if there is no body to simplify.
+    """
+    return "(hints) => {" + _CONTENT_HELPERS + r"""
+        if (!document.body) return null;
+        const state = window.__pmbSimplify || (window.__pmbSimplify = {active: false, sheet: null, scroll: 0, result: null});
+        if (state.active) return {...state.result, source: 'active', extract_ms: 0};
+
+        const started = performance.now();
+        const hash = contentHash();
+        const hint = hints && hints[hash];
+        let found = null;
+        if (hint) {
+            try {
+                const el = document.querySelector(hint.path);
+                if (el) found = {el, score: hint.score, source: 'cache', blocks: 0};
+            } catch (e) {}
+        }
+        if (!found) found = findMainContent();
+        const main = found.el;
+        const extractMs = Math.round((performance.now() - started) * 10) / 10;
+
+        document.querySelectorAll('[data-pmb-keep], [data-pmb-main]').forEach(el => {
+            el.removeAttribute('data-pmb-keep');
+            el.removeAttribute('data-pmb-main');
+        });
+        main.setAttribute('data-pmb-main', '');
+        for (let el = main.parentElement; el && el !== document.documentElement; el = el.parentElement) {
+            el.setAttribute('data-pmb-keep', '');
+        }
+
+        if (!state.sheet) {
+            state.sheet = new CSSStyleSheet();
+            state.sheet.replaceSync(__SIMPLIFY_CSS__);
+        }
+        if (!document.adoptedStyleSheets.includes(state.sheet)) {
+            document.adoptedStyleSheets = [...document.adoptedStyleSheets, state.sheet];
+        }
+        state.scroll = window.scrollY;
+        document.documentElement.setAttribute('data-pmb-simplified', '');
+        state.active = true;
+        window.scrollTo(0, 0);
+
+        state.result = {hash, path: pathOf(main), score: found.score, source: found.source,
+                        blocks: found.blocks, extract_ms: extractMs};
+        return state.result;
+    }
+    """.replace("__SIMPLIFY_CSS__", json.dumps(_SIMPLIFY_CSS))
+
+def get_restore_script():
+    """
+    Returns a JavaScript function that leaves the in-place reader view.
+
+    A single attribute toggle plus the saved scroll position. Returns false if
+    the page isn't in the reader view (e.g. it navigated since).
+    """
+    return """
+    () => {
+        const state = window.__pmbSimplify;
+        if (!state || !state.active) return false;
+        document.documentElement.removeAttribute('data-pmb-simplified');
+        state.active = false;
+        window.scrollTo(0, state.scroll);
+        return true;
+    }
+    """
+
+def get_link_candidates_script():
+    """
+    Returns a JavaScript function that lists the page's prominent outgoing links.
+
+    Takes the maximum number of links. Each entry has the absolute URL (without
+    fragment) and a prominence score from its on-screen size, whether it is in
+    the viewport and whether it sits in the main content or in navigation.
+    Links to the current page, downloads and non-http(s) links are skipped.
+    """
+    return """
+    (maxLinks) => {
+        const here = location.href.split('#')[0];
+        const best = new Map();
+        for (const a of document.querySelectorAll('a[href]')) {
+            if (a.hasAttribute('download') || a.closest('#ai-control-overlay')) continue;
+            const url = a.href.split('#')[0];
+            if (!/^https?:/.test(url) || url === here) continue;
+            const rect = a.getBoundingClientRect();
+            if (rect.width === 0 || rect.height === 0) continue;
+
+            const inView = rect.bottom > 0 && rect.top < window.innerHeight;
+            let prominence = (inView ? 1 : 0.3) * Math.min(3, Math.sqrt(rect.width * rect.height) / 50);
+            if (a.closest('main, article, [role="main"]')) prominence += 0.5;
+            if (a.closest('nav, footer, [role="navigation"], [role="contentinfo"]')) prominence -= 0.3;
+            // A URL linked several times keeps its most prominent link
+            if (!best.has(url) || best.get(url).prominence < prominence) {
+                best.set(url, {url, prominence: Math.round(prominence * 100) / 100,
+                               text: (a.innerText || a.title || '').trim().slice(0, 80)});
+            }
+        }
+        return Array.from(best.values()).sort((a, b) => b.prominence - a.prominence).slice(0, maxLinks);
+    }
+    """
+
+def get_link_target_script():
+    """
+    Returns a JavaScript function that tells where clicking an element would navigate.
+
+    Takes a CSS selector. Returns the absolute URL (without fragment) of the link
+    the element is or sits in, or null when a click would not simply load another
+    page in this tab: no link, a download, a new-window target, a non-http(s) URL
+    or a link to the current page.
+    """
+    return """
+    (selector) => {
+        let el;
+        try {
+            el = document.querySelector(selector);
+        } catch (e) {
+            return null;  // not CSS
+        }
+        const a = el && el.closest('a[href]');
+        if (!a || a.hasAttribute('download')) return null;
+        if (a.target && !['_self', '_top', '_parent'].includes(a.target)) return null;
+        const url = a.href.split('#')[0];
+        if (!/^https?:/.test(url) || url === location.href.split('#')[0]) return null;
+        return url;
+    }
+    """
+
+def get_action_batch_script():
+    """
+    Returns a JavaScript function that runs a list of pure-DOM action steps in one call.
+
+    Steps are {op: 'scroll', pixels}, {op: 'check', selector, checked} or
+    {op: 'select', selector, value}. input/change events are fired, so framework
+    bound controls see the change. Stops at the first step that fails and returns
+    {done, error}: how many steps ran and why the next one could not.
+    """
+    return """
+    (steps) => {
+        const find = (selector) => {
+            const el = document.querySelector(selector);
+            if (!el) throw new Error('no element matches ' + selector);
+            if (el.disabled) throw new Error(selector + ' is disabled');
+            return el;
+        };
+        const fire = (el, ...types) => types.forEach(t => el.dispatchEvent(new Event(t, {bubbles: true})));
+
+        for (let i = 0; i < steps.length; i++) {
+            const step = steps[i];
+            try {
+                if (step.op === 'scroll') {
+                    window.scrollBy(0, step.pixels);
+                } else if (step.op === 'check') {
+                    const el = find(step.selector);
+                    if (el.checked !== step.checked) el.click();
+                    if (el.checked !== step.checked) throw new Error(step.selector + ' did not change state');
+                } else if (step.op === 'select') {
+                    const el = find(step.selector);
+                    if (!(el instanceof HTMLSelectElement)) throw new Error(step.selector + ' is not a select');
+                    const options = Array.from(el.options);
+                    const option = options.find(o => o.value === step.value)
+                        || options.find(o => o.label.trim() === step.value);
+                    if (!option) throw new Error('no option ' + step.value + ' in ' + step.selector);
+                    el.value = option.value;
+                    fire(el, 'input', 'change');
+                } else {
+                    throw new Error('unknown step ' + step.op);
+                }
+            } catch (e) {
+                return {done: i, error: e.message};
+            }
+        }
+        return {done: steps.length, error: null};
+    }
+    """
+
+# Shared helpers (after _ELEMENT_HELPERS) defining fingerprintOf(el), the identifying
+# features of an element, and bestMatch(fingerprint, minScore), the visible element that
+# resembles a recorded fingerprint most, as {el, score}, or null
+_FINGERPRINT_HELPERS = r"""
+        const FINGERPRINT_ATTRS = ['name', 'type', 'role', 'aria-label', 'placeholder', 'data-testid', 'title', 'alt', 'href'];
+        const isVisible = el => {
+            const rect = el.getBoundingClientRect();
+            if (rect.width === 0 || rect.height === 0) return false;
+            const style = getComputedStyle(el);
+            return style.visibility !== 'hidden' && style.display !== 'none';
+        };
+        const usable = el => !el.closest('#ai-control-overlay') && !el.disabled && isVisible(el);
+        const pathOf = el => {
+            const tags = [];
+            for (let node = el.parentElement; node && node !== document.body && tags.length < 6; node = node.parentElement) {
+                tags.unshift(node.tagName.toLowerCase());
+            }
+            return tags.join('>');
+        };
+
+        const fingerprintOf = el => {
+            const rect = el.getBoundingClientRect();
+            const attrs = {};
+            for (const attr of FINGERPRINT_ATTRS) {
+                const value = el.getAttribute(attr);
+                if (value && value.length <= 200) attrs[attr] = value;
+            }
+            return {
+                tag: el.tagName.toLowerCase(),
+                id: el.id || '',
+                classes: Array.from(el.classList).slice(0, 8),
+                attrs,
+                text: clean(el.innerText || el.value),
+                path: pathOf(el),
+                box: [Math.round(rect.left + window.scrollX), Math.round(rect.top + window.scrollY),
+                      Math.round(rect.width), Math.round(rect.height)]
+            };
+        };
+
+        // Weighted share of the recorded features the candidate still has
+        const similarity = (fp, el) => {
+            let got = 0, total = 0;
+            const feature = (weight, score) => { total += weight; got += weight * score; };
+            if (fp.id) feature(3, el.id === fp.id ? 1 : 0);
+            for (const [attr, value] of Object.entries(fp.attrs)) {
+                feature(attr === 'href' || attr === 'type' ? 1 : 2, el.getAttribute(attr) === value ? 1 : 0);
+            }
+            if (fp.text) {
+                const text = clean(el.innerText || el.value);
+                feature(2, text === fp.text ? 1 : (text && (text.includes(fp.text) || fp.text.includes(text)) ? 0.5 : 0));
+            }
+            if (fp.classes.length) {
+                const classes = new Set(el.classList);
+                const shared = fp.classes.filter(c => classes.has(c)).length;
+                feature(1.5, shared / (fp.classes.length + classes.size - shared));
+            }
+            feature(1, pathOf(el) === fp.path ? 1 : 0);
+            const rect = el.getBoundingClientRect();
+            const dx = rect.left + window.scrollX + rect.width / 2 - (fp.box[0] + fp.box[2] / 2);
+            const dy = rect.top + window.scrollY + rect.height / 2 - (fp.box[1] + fp.box[3] / 2);
+            feature(1, Math.max(0, 1 - Math.hypot(dx, dy) / 500));
+            return got / total;
+        };
+
+        const bestMatch = (fp, minScore) => {
+            let best = null, runnerUp = 0;
+            for (const el of document.querySelectorAll(fp.tag)) {
+                if (!usable(el)) continue;
+                const score = similarity(fp, el);
+                if (!best || score > best.score) {
+                    runnerUp = best ? best.score : 0;
+                    best = {el, score};
+                } else if (score > runnerUp) {
+                    runnerUp = score;
+                }
+            }
+            // Two near-identical candidates (e.g. list rows) are a guess, not a match
+            if (!best || best.score < minScore || best.score - runnerUp < 0.05) return null;
+            best.score = Math.round(best.score * 100) / 100;
+            return best;
+        };
+"""
+
+def get_locate_script():
+    """
+    Returns a JavaScript function that resolves a click target by several strategies at once.
+
+    Takes {target, order, token}. The target is tried as CSS, as the visible text of
+    an interactive element (or the innermost element with exactly that text), as an
+    accessible name and as a form label or placeholder, in the given order. The first
+    strategy with exactly one visible match wins (matches inside the viewport break
+    ties); if every strategy is ambiguous, the first match of the first strategy that
+    found any is used. The element is marked with data-pmb-locate=token and
+    {strategy, matches, fingerprint} is returned (the fingerprint only for a unique
+    match), or null if nothing visible matches yet.
+    """
+    return "(args) => {" + _ELEMENT_HELPERS + _FINGERPRINT_HELPERS + r"""
+        const {target, order, token} = args;
+        const norm = v => (v || '').replace(/\s+/g, ' ').trim().toLowerCase();
+        const wanted = norm(target);
+        const inViewport = el => {
+            const rect = el.getBoundingClientRect();
+            return rect.bottom > 0 && rect.right > 0 && rect.top < window.innerHeight && rect.left < window.innerWidth;
+        };
+        let interactiveEls = null;
+        const interactive = () => interactiveEls || (interactiveEls = Array.from(document.querySelectorAll(INTERACTIVE)).filter(usable));
+        // Exact matches if there are any, otherwise substring matches
+        const matching = (els, textOf) => {
+            const exact = els.filter(el => norm(textOf(el)) === wanted);
+            return exact.length ? exact : els.filter(el => norm(textOf(el)).includes(wanted));
+        };
+        // Normalized text of an element, or null as soon as it is longer than the target
+        // (a big ancestor is not read in full)
+        const textWithin = el => {
+            let text = '', length = 0;
+            const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+            for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+                length += norm(node.data).length;
+                if (length > wanted.length) return null;
+                text += node.data;
+            }
+            return norm(text);
+        };
+        // A link wrapping a button (or a span with the text) counts once
+        const innermost = els => els.filter(el => !els.some(other => other !== el && el.contains(other)));
+
+        const STRATEGIES = {
+            css: () => {
+                try {
+                    return Array.from(document.querySelectorAll(target)).filter(usable);
+                } catch (e) {
+                    return [];  // not valid CSS
+                }
+            },
+            text: () => {
+                const found = innermost(matching(interactive(), el => el.innerText));
+                if (found.length) return found;
+                // Clickable text outside the interactive element list (div/span handlers): only
+                // text nodes that are part of the target are followed up to the innermost
+                // element holding exactly it, each ancestor checked once
+                const exact = [];
+                const checked = new Set();
+                const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+                for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+                    const piece = norm(node.data);
+                    if (!piece || !wanted.includes(piece)) continue;
+                    for (let el = node.parentElement; el && !checked.has(el); el = el.parentElement) {
+                        checked.add(el);
+                        const text = textWithin(el);
+                        if (text === null) break;
+                        if (text === wanted && usable(el)) exact.push(el);
+                    }
+                }
+                return innermost(exact);
+            },
+            role: () => innermost(matching(interactive(), nameOf)),
+            label: () => {
+                const found = new Set();
+                for (const label of document.querySelectorAll('label')) {
+                    if (norm(label.innerText) === wanted && label.control && usable(label.control)) found.add(label.control);
+                }
+                for (const el of interactive()) {
+                    if (norm(el.getAttribute('placeholder')) === wanted) found.add(el);
+                }
+                return Array.from(found);
+            }
+        };
+
+        if (!wanted || !document.body) return null;
+        let fallback = null;
+        let chosen = null;
+        for (const strategy of order) {
+            let found = STRATEGIES[strategy]();
+            if (found.length > 1) {
+                const visible = found.filter(inViewport);
+                if (visible.length) found = visible;
+            }
+            if (found.length === 1) {
+                chosen = {el: found[0], strategy, matches: 1};
+                break;
+            }
+            if (found.length && !fallback) fallback = {el: found[0], strategy, matches: found.length};
+        }
+        chosen = chosen || fallback;
+        if (!chosen) return null;
+
+        for (const old of document.querySelectorAll('[data-pmb-locate]')) old.removeAttribute('data-pmb-locate');
+        chosen.el.setAttribute('data-pmb-locate', token);
+        return {strategy: chosen.strategy, matches: chosen.matches,
+                fingerprint: chosen.matches === 1 ? fingerprintOf(chosen.el) : null};
+    }
+    """
+
+def get_fingerprint_script():
+    """
+    Returns a JavaScript function that fingerprints the element a selector targets.
+
+    Takes a CSS selector. Returns the fingerprint when exactly one visible element
+    matches, otherwise null.
+    """
+    return "(selector) => {" + _ELEMENT_HELPERS + _FINGERPRINT_HELPERS + r"""
+        let visible;
+        try {
+            visible = Array.from(document.querySelectorAll(selector)).filter(usable);
+        } catch (e) {
+            return null;  // not CSS
+        }
+        return visible.length === 1 ? fingerprintOf(visible[0]) : null;
+    }
+    """
+
+def get_heal_script():
+    """
+    Returns a JavaScript function that relocates a missing element by its fingerprint.
+
+    Takes {selector, fingerprint, token, minScore}; meant to run only after waiting
+    for the target has timed out. When a selector is given and still matches
+    something, the miss wasn't a changed selector and null is returned. Otherwise the
+    visible element most like the fingerprint is marked with data-pmb-locate=token
+    and {score} is returned, or null if nothing is similar enough.
+    """
+    return "(args) => {" + _ELEMENT_HELPERS + _FINGERPRINT_HELPERS + r"""
+        const {selector, fingerprint, token, minScore} = args;
+        if (!document.body) return null;
+        if (selector) {
+            try {
+                if (document.querySelector(selector)) return null;
+            } catch (e) {
+                return null;  // not CSS
+            }
+        }
+        const match = bestMatch(fingerprint, minScore);
+        if (!match) return null;
+        for (const old of document.querySelectorAll('[data-pmb-locate]')) old.removeAttribute('data-pmb-locate');
+        match.el.setAttribute('data-pmb-locate', token);
+        return {score: match.score};
+    }
+    """
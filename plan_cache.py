@@ -0,0 +1,113 @@
+"""
+Plan Cache Module
+Reuses AI action plans for repeat commands on structurally identical pages
+"""
+
+import re
+from urllib.parse import urlsplit, parse_qsl
+from config import Config
+from cache import PersistentLRUCache, normalize_command
+
+# Actions whose selector must still match before a cached plan is replayed
+SELECTOR_ACTIONS = {"click", "type", "hover", "select", "check", "uncheck"}
+# Actions after which the current page can no longer vouch for later selectors
+PAGE_CHANGING_ACTIONS = {"navigate", "back", "forward", "reload"}
+
+
+def url_pattern(url):
+    """
+    Reduce a URL to its template so pages of the same kind share a pattern
+
+    Args:
+        url (str): Page URL
+
+    Returns:
+        str: host + path with id-like segments replaced by '*', plus sorted query keys
+    """
+    parts = urlsplit(url)
+    segments = []
+    for segment in parts.path.split("/"):
+        # Numeric ids, hashes and slugs with digits vary between pages of one template
+        if re.fullmatch(r"\d+|[0-9a-f]{8,}|[\w-]*\d[\w-]{5,}", segment, re.IGNORECASE):
+            segment = "*"
+        segments.append(segment)
+    query_keys = sorted({key for key, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    pattern = parts.netloc.lower() + "/".join(segments)
+    if query_keys:
+        pattern += "?" + "&".join(query_keys)
+    return pattern
+
+
+class PlanCache:
+    """Caches action plans keyed by command, URL pattern and page structure fingerprint"""
+
+    def __init__(self):
+        """Initialize the plan cache"""
+        self.cache = PersistentLRUCache(
+            "action_plans",
+            max_entries=Config.PLAN_CACHE_SIZE,
+            ttl=Config.PLAN_CACHE_TTL,
+            db_path=Config.CACHE_DB_PATH
+        )
+        self.stale = 0
+
+    def make_key(self, command, url, fingerprint):
+        """
+        Build the cache key for a command on a page
+
+        Args:
+            command (str): User's command
+            url (str): Current page URL
+            fingerprint (str): Structural DOM fingerprint from the page
+
+        Returns:
+            str: Cache key
+        """
+        return f"{normalize_command(command)}|{url_pattern(url)}|{fingerprint}"
+
+    def lookup(self, key):
+        """Return the cached action list for a key, or None"""
+        return self.cache.get(key)
+
+    def store(self, key, actions):
+        """
+        Cache a plan that executed successfully
+
+        Args:
+            key (str): Cache key from make_key
+            actions (list): Executed action dictionaries
+        """
+        if not actions or any(action.get("action") == "error" for action in actions):
+            return
+        self.cache.set(key, actions)
+
+    def invalidate(self, key):
+        """Drop a plan whose selectors went stale or whose replay failed"""
+        self.stale += 1
+        self.cache.delete(key)
+
+    @staticmethod
+    def selector_checks(actions):
+        """
+        List the selectors a plan depends on
+
+        Args:
+            actions (list): Action dictionaries
+
+        Returns:
+            list: [selector, allow_text] pairs for the in-page selector check
+        """
+        checks = []
+        for action in actions:
+            action_type = action.get("action")
+            if action_type in PAGE_CHANGING_ACTIONS:
+                break
+            if action_type in SELECTOR_ACTIONS and action.get("selector"):
+                checks.append([action["selector"], action_type == "click"])
+        return checks
+
+    def stats(self):
+        """Return cache counters including stale-plan invalidations"""
+        stats = self.cache.stats()
+        stats["stale"] = self.stale
+        return stats
@@ -0,0 +1,224 @@
+"""
+Prefetch Module
+Speculatively loads the most likely next pages in background tabs of the main context
+"""
+
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from config import Config
+from page_scripts import get_link_candidates_script
+
+# Links that may change state on the server when fetched; never prefetched
+UNSAFE_LINK = re.compile(r"log-?out|sign-?out|log-?off|delete|remove|unsubscribe|cancel|checkout|cart|/add\b", re.IGNORECASE)
+
+
+def normalize_url(url):
+    """
+    Normalize a URL for matching a navigation against prefetched tabs
+
+    Args:
+        url (str): URL
+
+    Returns:
+        str: Lowercase scheme and host, no fragment, no trailing slash on the path
+    """
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/") or ""
+    query = "?" + parts.query if parts.query else ""
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}{query}"
+
+
+class PrefetchTab:
+    """One background tab loading (or holding) a prefetched page"""
+
+    def __init__(self, url, page, task):
+        self.url = url
+        self.page = page
+        self.task = task
+        self.started = time.monotonic()
+
+
+class PrefetchPool:
+    """Keeps a few background tabs with the top-ranked link targets of the active page"""
+
+    def __init__(self, context, visit_count=None):
+        """
+        Args:
+            context: Playwright BrowserContext of the main page (tabs share its cookies)
+            visit_count: Callable url -> times visited, used to rank links by history
+        """
+        self.context = context
+        self.visit_count = visit_count or (lambda url: 0)
+        self.tabs = OrderedDict()  # normalized url -> PrefetchTab
+        self._scheduler = None
+        self.prefetched = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.over_memory = 0
+
+    def rank(self, links):
+        """
+        Order candidate links by prominence on the page and visit history
+
+        Args:
+            links (list): Entries from the link candidates script
+
+        Returns:
+            list: URLs, most likely next first
+        """
+        host_visits = {}
+        scored = []
+        for link in links:
+            url = link["url"]
+            if UNSAFE_LINK.search(url):
+                continue
+            host = urlsplit(url).netloc
+            if host not in host_visits:
+                host_visits[host] = sum(self.visit_count(u) for u in (f"https://{host}/", f"http://{host}/"))
+            score = link["prominence"] + 2 * math.log1p(self.visit_count(url)) + 0.5 * math.log1p(host_visits[host])
+            scored.append((score, url))
+        scored.sort(reverse=True)
+        return [url for _, url in scored]
+
+    def schedule(self, page):
+        """
+        Replace the background tabs with the top links of a freshly loaded page
+
+        Args:
+            page: The active page, already navigated
+        """
+        if self._scheduler and not self._scheduler.done():
+            self._scheduler.cancel()
+        self._scheduler = asyncio.ensure_future(self._refill(page))
+
+    async def _refill(self, page):
+        """Rank the page's links and start loading the best ones not already prefetched"""
+        try:
+            links = await page.evaluate(get_link_candidates_script(), Config.PREFETCH_MAX_TABS * 10)
+            wanted = OrderedDict()  # normalized url -> url
+            for url in self.rank(links):
+                wanted.setdefault(normalize_url(url), url)
+                if len(wanted) == Config.PREFETCH_MAX_TABS:
+                    break
+
+            for key in [k for k in self.tabs if k not in wanted]:
+                await self._close(self.tabs.pop(key), wasted=True)
+
+            for key, url in wanted.items():
+                if key not in self.tabs:
+                    tab_page = await self.context.new_page()
+                    self.tabs[key] = PrefetchTab(url, tab_page, asyncio.ensure_future(self._load(tab_page, url)))
+                    self.prefetched += 1
+            # New tabs come to the front in a headed browser; keep the user's page there
+            await page.bring_to_front()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ [PrefetchPool]: Prefetch skipped - {str(e)}")
+
+    async def _load(self, page, url):
+        """
+        Load a prefetched page
+
+        Returns:
+            str: Final URL after redirects, or None if loading failed or the page
+                 is over the memory budget (its tab is closed right away)
+        """
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=Config.NAVIGATION_TIMEOUT)
+            heap = await page.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize : 0")
+            if heap <= Config.PREFETCH_TAB_MEMORY_MB * 1024 * 1024:
+                return page.url
+            self.over_memory += 1
+            print(f"⚠️ [PrefetchPool]: {url} uses {heap // (1024 * 1024)}MB of JS heap, dropped")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ [PrefetchPool]: Could not prefetch {url} - {str(e).splitlines()[0]}")
+        await page.close()
+        return None
+
+    async def take(self, url):
+        """
+        Claim the prefetched tab for a URL, if one loaded successfully
+
+        Args:
+            url (str): URL about to be navigated to
+
+        Returns:
+            Page: The loaded background page (now owned by the caller), or None
+        """
+        self._expire()
+        key = normalize_url(url)
+        # Match the requested URL, or where a prefetched link redirected to
+        tab = self.tabs.get(key) or next(
+            (t for t in self.tabs.values() if t.task.done() and not t.task.cancelled()
+             and t.task.result() and normalize_url(t.task.result()) == key), None)
+        if tab is None:
+            self.misses += 1
+            return None
+
+        self.tabs.pop(normalize_url(tab.url), None)
+        try:
+            # Still loading: waiting for it is still quicker than starting over
+            final_url = await asyncio.wait_for(asyncio.shield(tab.task), Config.READINESS_TIMEOUT / 1000)
+        except asyncio.TimeoutError:
+            final_url = None
+        if final_url is None:
+            await self._close(tab, wasted=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        print(f"✓ Using prefetched tab for {url}")
+        return tab.page
+
+    def _expire(self):
+        """Drop prefetched pages older than PREFETCH_TTL, their content may have moved on"""
+        now = time.monotonic()
+        for key in [k for k, t in self.tabs.items() if now - t.started > Config.PREFETCH_TTL]:
+            asyncio.ensure_future(self._close(self.tabs.pop(key), wasted=True))
+
+    async def _close(self, tab, wasted=False):
+        """Stop loading and close a background tab"""
+        if wasted:
+            self.wasted += 1
+        tab.task.cancel()
+        try:
+            await tab.page.close()
+        except Exception:
+            pass
+
+    def discard(self):
+        """Drop every background tab without waiting, e.g. when the page moved on by itself"""
+        if self._scheduler and not self._scheduler.done():
+            self._scheduler.cancel()
+        while self.tabs:
+            asyncio.ensure_future(self._close(self.tabs.popitem()[1], wasted=True))
+
+    async def clear(self):
+        """Close every background tab"""
+        if self._scheduler and not self._scheduler.done():
+            self._scheduler.cancel()
+        while self.tabs:
+            await self._close(self.tabs.popitem()[1], wasted=True)
+
+    def stats(self):
+        """
+        Get prefetch counters
+
+        Returns:
+            dict: Open tabs, pages prefetched, navigations served from a tab and tabs thrown away
+        """
+        return {
+            "tabs": list(self.tabs),
+            "prefetched": self.prefetched,
+            "hits": self.hits,
+            "misses": self.misses,
+            "wasted": self.wasted,
+            "over_memory": self.over_memory
+        }
@@ -0,0 +1,151 @@
+"""
+Prompt Builder Module
+Assembles AI prompts from prioritized sections under a token budget and records their cost
+"""
+
+import threading
+from collections import defaultdict, deque
+
+# Rough characters-per-token ratio for English text and CSS selectors
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimate how many tokens a piece of text costs
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Approximate token count
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class PromptSection:
+    """A named piece of a prompt with a trim priority"""
+
+    def __init__(self, name, text, priority=50, required=False):
+        """
+        Args:
+            name (str): Section name used in size reports
+            text (str): Section text
+            priority (int): Higher priorities are trimmed last
+            required (bool): Never trimmed (instructions, the command itself)
+        """
+        self.name = name
+        self.text = text
+        self.priority = priority
+        self.required = required
+
+    @property
+    def tokens(self):
+        return estimate_tokens(self.text)
+
+
+class PromptBuilder:
+    """Fits prompt sections into a token budget by trimming low-priority sections first"""
+
+    def __init__(self, budget):
+        """
+        Args:
+            budget (int): Maximum estimated tokens per prompt
+        """
+        self.budget = budget
+
+    def build(self, sections):
+        """
+        Join sections in order, trimming by priority until the prompt fits the budget
+
+        Optional sections are cut line by line from their end (so the element
+        index keeps its in-viewport entries), and dropped if nothing fits.
+
+        Args:
+            sections (list): PromptSection objects in prompt order
+
+        Returns:
+            tuple: (prompt text, report dict with total and per-section tokens)
+        """
+        trimmed = []
+        marker = "\n... (trimmed)"
+        # Counted in characters, separators included, so the joined prompt is what fits
+        over = len(self._join(sections)) - self.budget * CHARS_PER_TOKEN
+
+        for section in sorted(sections, key=lambda s: s.priority):
+            if over <= 0:
+                break
+            if section.required or not section.text:
+                continue
+
+            lines = section.text.split("\n")
+            kept = len(section.text)
+            while lines and over - (len(section.text) - kept - len(marker)) > 0:
+                kept -= len(lines.pop()) + 1
+            section.text = "\n".join(lines) + marker if lines else ""
+            over = len(self._join(sections)) - self.budget * CHARS_PER_TOKEN
+            trimmed.append(section.name)
+
+        prompt = self._join(sections)
+        report = {
+            "tokens": estimate_tokens(prompt),
+            "budget": self.budget,
+            "sections": {section.name: section.tokens for section in sections},
+            "trimmed": trimmed
+        }
+        return prompt, report
+
+    @staticmethod
+    def _join(sections):
+        return "\n\n".join(section.text for section in sections if section.text)
+
+
+class PromptStats:
+    """Keeps recent prompt size and latency records per prompt kind"""
+
+    def __init__(self, max_records=200):
+        """
+        Args:
+            max_records (int): Records kept per prompt kind
+        """
+        self._records = defaultdict(lambda: deque(maxlen=max_records))
+        self._lock = threading.Lock()
+
+    def record(self, kind, report, latency):
+        """
+        Record one AI call
+
+        Args:
+            kind (str): Prompt kind, e.g. "navigate" or "interpret"
+            report (dict): Report returned by PromptBuilder.build
+            latency (float): Seconds the AI call took
+        """
+        with self._lock:
+            self._records[kind].append(dict(report, latency_ms=round(latency * 1000, 1)))
+        print(f"✓ [{kind}] prompt {report['tokens']} tokens, {latency * 1000:.0f}ms"
+              + (f", trimmed {', '.join(report['trimmed'])}" if report["trimmed"] else ""))
+
+    def summary(self):
+        """
+        Summarize recorded calls
+
+        Returns:
+            dict: Per kind: calls, average/max tokens, trim rate and latency percentiles
+        """
+        with self._lock:
+            summary = {}
+            for kind, records in self._records.items():
+                if not records:
+                    continue
+                latencies = sorted(record["latency_ms"] for record in records)
+                tokens = [record["tokens"] for record in records]
+                summary[kind] = {
+                    "calls": len(records),
+                    "avg_tokens": round(sum(tokens) / len(tokens)),
+                    "max_tokens": max(tokens),
+                    "trim_rate": round(sum(1 for r in records if r["trimmed"]) / len(records), 3),
+                    "p50_latency_ms": latencies[len(latencies) // 2],
+                    "p95_latency_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                    "last": records[-1]
+                }
+            return summary
@@ -0,0 +1,171 @@
+"""
+Readiness Module
+Decides when a navigated page is usable, instead of always waiting for network idle
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from config import Config
+from page_scripts import get_interactive_ready_script, get_dom_quiet_script
+
+# Strategies Playwright can wait for itself through goto(wait_until=...)
+LOAD_STATES = ("commit", "domcontentloaded", "load", "networkidle")
+
+# Strategies checked in the page after the navigation commits
+PAGE_STRATEGIES = ("interactive", "quiescent", "predicate")
+
+STRATEGIES = LOAD_STATES + PAGE_STRATEGIES
+
+
+class ReadinessEngine:
+    """Waits for a page with the chosen readiness strategy and records how long each took"""
+
+    def __init__(self, max_records=200):
+        """
+        Args:
+            max_records (int): Timing records kept per strategy
+        """
+        self._records = defaultdict(lambda: deque(maxlen=max_records))
+        self._lock = threading.Lock()
+
+    def resolve(self, strategy=None, predicate=None):
+        """
+        Pick the strategy for a command
+
+        Args:
+            strategy (str): Strategy asked for by the command, if any
+            predicate: Custom predicate, implies the "predicate" strategy
+
+        Returns:
+            str: Strategy name
+
+        Raises:
+            Exception: If the strategy is unknown or "predicate" has no predicate
+        """
+        if predicate is not None and strategy is None:
+            strategy = "predicate"
+        strategy = (strategy or Config.NAVIGATION_READINESS).lower()
+        if strategy not in STRATEGIES:
+            raise Exception(f"ERROR [ReadinessEngine.resolve]: Unknown readiness strategy '{strategy}' (choose from {', '.join(STRATEGIES)})")
+        if strategy == "predicate" and predicate is None:
+            raise Exception("ERROR [ReadinessEngine.resolve]: The 'predicate' strategy needs a predicate")
+        return strategy
+
+    async def navigate(self, page, url, strategy=None, predicate=None):
+        """
+        Navigate and return as soon as the page is ready by the chosen strategy
+
+        Args:
+            page: Playwright page
+            url (str): URL to open
+            strategy (str): Readiness strategy, defaults to Config.NAVIGATION_READINESS
+            predicate: JavaScript predicate expression, or an async callable taking the page
+
+        Returns:
+            dict: Timing record (strategy, commit_ms, ready_ms, timed_out)
+
+        Raises:
+            Exception: If the navigation itself fails
+        """
+        strategy = self.resolve(strategy, predicate)
+        started = time.perf_counter()
+        wait_until = strategy if strategy in LOAD_STATES else "commit"
+        await page.goto(url, wait_until=wait_until, timeout=Config.NAVIGATION_TIMEOUT)
+        committed = time.perf_counter()
+
+        timed_out = False
+        if strategy in PAGE_STRATEGIES:
+            timed_out = not await self._wait_in_page(page, strategy, predicate)
+
+        return self._record(strategy, url, started, committed, timed_out)
+
+    async def wait(self, page, strategy=None, predicate=None):
+        """
+        Wait for the current page to become ready, e.g. after back, forward or reload
+
+        Args:
+            page: Playwright page
+            strategy (str): Readiness strategy, defaults to Config.NAVIGATION_READINESS
+            predicate: JavaScript predicate expression, or an async callable taking the page
+
+        Returns:
+            dict: Timing record (strategy, commit_ms, ready_ms, timed_out)
+        """
+        strategy = self.resolve(strategy, predicate)
+        started = time.perf_counter()
+        if strategy in LOAD_STATES:
+            try:
+                if strategy != "commit":
+                    await page.wait_for_load_state(strategy, timeout=Config.READINESS_TIMEOUT)
+                timed_out = False
+            except Exception:
+                timed_out = True
+        else:
+            timed_out = not await self._wait_in_page(page, strategy, predicate)
+        return self._record(strategy, page.url, started, started, timed_out)
+
+    async def _wait_in_page(self, page, strategy, predicate):
+        """
+        Poll an in-page readiness check, giving up after Config.READINESS_TIMEOUT
+
+        Returns:
+            bool: True if the page became ready, False if the wait timed out
+        """
+        try:
+            if strategy == "interactive":
+                await page.wait_for_function(get_interactive_ready_script(), timeout=Config.READINESS_TIMEOUT)
+            elif strategy == "quiescent":
+                await page.wait_for_function(get_dom_quiet_script(), arg=Config.DOM_QUIET_WINDOW,
+                                             polling=100, timeout=Config.READINESS_TIMEOUT)
+            elif isinstance(predicate, str):
+                await page.wait_for_function(predicate, timeout=Config.READINESS_TIMEOUT)
+            else:
+                deadline = time.perf_counter() + Config.READINESS_TIMEOUT / 1000
+                while not await predicate(page):
+                    if time.perf_counter() > deadline:
+                        return False
+                    await page.wait_for_timeout(100)
+            return True
+        except Exception as e:
+            # A page that never settles is still usable, so carry on rather than fail
+            print(f"⚠️ [ReadinessEngine]: '{strategy}' not reached in {Config.READINESS_TIMEOUT}ms, continuing - {str(e).splitlines()[0]}")
+            return False
+
+    def _record(self, strategy, url, started, committed, timed_out):
+        """Store and log one timing record"""
+        now = time.perf_counter()
+        record = {
+            "strategy": strategy,
+            "url": url,
+            "commit_ms": round((committed - started) * 1000, 1),
+            "ready_ms": round((now - started) * 1000, 1),
+            "timed_out": timed_out
+        }
+        with self._lock:
+            self._records[strategy].append(record)
+        print(f"✓ Page ready ({strategy}) in {record['ready_ms']:.0f}ms"
+              + (" (timed out)" if timed_out else ""))
+        return record
+
+    def stats(self):
+        """
+        Summarize readiness timings
+
+        Returns:
+            dict: Per strategy: waits, timeout rate and ready-time percentiles
+        """
+        with self._lock:
+            summary = {}
+            for strategy, records in self._records.items():
+                if not records:
+                    continue
+                ready = sorted(record["ready_ms"] for record in records)
+                summary[strategy] = {
+                    "waits": len(records),
+                    "timeout_rate": round(sum(1 for r in records if r["timed_out"]) / len(records), 3),
+                    "p50_ready_ms": ready[len(ready) // 2],
+                    "p95_ready_ms": ready[min(len(ready) - 1, int(len(ready) * 0.95))],
+                    "last": records[-1]
+                }
+            return summary
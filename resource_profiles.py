@@ -0,0 +1,185 @@
+"""
+Resource Profiles Module
+Request interception profiles that keep heavy or unwanted resources from loading
+"""
+
+import threading
+from urllib.parse import urlsplit
+from config import Config
+
+# Resource types each profile blocks, and whether it also blocks tracker hosts
+RESOURCE_PROFILES = {
+    "full": {"types": frozenset(), "trackers": False},
+    "block-trackers": {"types": frozenset(), "trackers": True},
+    "no-media": {"types": frozenset({"image", "media", "font"}), "trackers": True},
+    "text-only": {"types": frozenset({"image", "media", "font", "stylesheet", "texttrack"}), "trackers": True},
+}
+
+# Profile used for each interaction mode when RESOURCE_PROFILE is "auto"
+MODE_PROFILES = {"see": "full", "both": "full", "hear": "text-only"}
+
+# Rough transfer size of one blocked resource, for the bytes-saved estimate
+TYPICAL_BYTES = {
+    "image": 45_000,
+    "media": 500_000,
+    "font": 35_000,
+    "stylesheet": 25_000,
+    "texttrack": 5_000,
+    "script": 30_000,
+}
+DEFAULT_BYTES = 10_000
+
+
+def profile_for_mode(mode):
+    """
+    Pick the resource profile for an interaction mode
+
+    Args:
+        mode (str): Config.INTERACTION_MODE value ('see', 'hear' or 'both')
+
+    Returns:
+        str: Profile name (Config.RESOURCE_PROFILE unless it is "auto")
+    """
+    if Config.RESOURCE_PROFILE != "auto":
+        return Config.RESOURCE_PROFILE
+    return MODE_PROFILES.get(mode, "full")
+
+
+def load_blocklist(path):
+    """
+    Load tracker domains, one per line
+
+    Args:
+        path (str): Blocklist file
+
+    Returns:
+        frozenset: Lowercase domains
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return frozenset(line.strip().lower() for line in f if line.strip() and not line.startswith("#"))
+    except OSError as e:
+        print(f"⚠️ [resource_profiles]: Could not load blocklist {path} - {str(e)}")
+        return frozenset()
+
+
+class ResourceInterceptor:
+    """Routes requests of every attached context through the active resource profile"""
+
+    def __init__(self, profile="full", blocklist_path=None):
+        """
+        Args:
+            profile (str): Initial profile name
+            blocklist_path (str): Tracker domain list, defaults to Config.TRACKER_BLOCKLIST_PATH
+        """
+        self.blocklist = load_blocklist(blocklist_path or Config.TRACKER_BLOCKLIST_PATH)
+        self.profile = self._check(profile)
+        self._contexts = []
+        self._routed = set()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.blocked = {}
+        self.bytes_saved = 0
+
+    def _check(self, profile):
+        """Validate a profile name"""
+        if profile not in RESOURCE_PROFILES:
+            raise Exception(f"ERROR [ResourceInterceptor]: Unknown resource profile '{profile}' (choose from {', '.join(RESOURCE_PROFILES)})")
+        return profile
+
+    async def attach(self, context):
+        """
+        Apply the active profile to a context and keep it in step with later switches
+
+        Args:
+            context: Playwright BrowserContext
+        """
+        self._contexts.append(context)
+        context.on("close", lambda _: self._forget(context))
+        await self._apply(context)
+
+    def _forget(self, context):
+        """Drop a closed context"""
+        if context in self._contexts:
+            self._contexts.remove(context)
+        self._routed.discard(id(context))
+
+    async def _apply(self, context):
+        """Install or remove the route handler to match the active profile"""
+        routed = id(context) in self._routed
+        # Any route disables Chromium's HTTP cache, so "full" removes it entirely
+        if self.profile == "full" and routed:
+            await context.unroute("**/*", self._handle)
+            self._routed.discard(id(context))
+        elif self.profile != "full" and not routed:
+            await context.route("**/*", self._handle)
+            self._routed.add(id(context))
+
+    async def set_profile(self, profile):
+        """
+        Switch every attached context to another profile
+
+        Args:
+            profile (str): Profile name
+
+        Raises:
+            Exception: If the profile name is unknown
+        """
+        self.profile = self._check(profile)
+        for context in list(self._contexts):
+            try:
+                await self._apply(context)
+            except Exception as e:
+                print(f"⚠️ [ResourceInterceptor]: Could not update a context - {str(e)}")
+                self._forget(context)
+        print(f"✓ Resource profile: {profile}")
+
+    def _is_tracker(self, url):
+        """True if the URL's host or any parent domain is on the blocklist"""
+        host = (urlsplit(url).hostname or "").lower()
+        labels = host.split(".")
+        return any(".".join(labels[i:]) in self.blocklist for i in range(len(labels) - 1))
+
+    def _block_reason(self, request):
+        """Return the blocked category for a request, or None to let it through"""
+        settings = RESOURCE_PROFILES[self.profile]
+        if request.resource_type == "document" and request.is_navigation_request():
+            try:
+                if request.frame.parent_frame is None:
+                    return None  # never block the page itself
+            except Exception:
+                pass
+        if request.resource_type in settings["types"]:
+            return request.resource_type
+        if settings["trackers"] and self._is_tracker(request.url):
+            return "tracker"
+        return None
+
+    async def _handle(self, route, request):
+        """Route handler: abort blocked requests, pass the rest on"""
+        reason = self._block_reason(request)
+        with self._lock:
+            self.requests += 1
+            if reason:
+                self.blocked[reason] = self.blocked.get(reason, 0) + 1
+                self.bytes_saved += TYPICAL_BYTES.get(request.resource_type, DEFAULT_BYTES)
+        if reason:
+            await route.abort("blockedbyclient")
+        else:
+            await route.fallback()
+
+    def stats(self):
+        """
+        Get interception counters
+
+        Returns:
+            dict: Active profile, requests seen while routed, blocked counts and estimated bytes saved
+        """
+        with self._lock:
+            return {
+                "profile": self.profile,
+                "requests": self.requests,
+                "blocked": dict(self.blocked),
+                "blocked_total": sum(self.blocked.values()),
+                "estimated_bytes_saved": self.bytes_saved
+            }
@@ -0,0 +1,118 @@
+"""
+Single Flight Module
+Coalesces identical commands so duplicates share one execution and one result
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Runs a function once per key while it's in flight (and for a short window after)"""
+
+    def __init__(self, window):
+        """
+        Initialize the coalescing table
+
+        Args:
+            window (float): Seconds a finished result is still shared with late duplicates
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> [future, finished_at or None, waiters]
+        self.executed = 0
+        self.coalesced = 0
+
+    def _join(self, key, create):
+        """
+        Return (entry, is_leader) for a key, creating the future if nothing is shared (lock held)
+        """
+        now = time.monotonic()
+        for stale in [k for k, (_, finished, _) in self._calls.items()
+                      if finished is not None and now - finished > self.window]:
+            del self._calls[stale]
+
+        entry = self._calls.get(key)
+        if entry is not None:
+            entry[2] += 1
+            self.coalesced += 1
+            return entry, False
+
+        future = create()
+        entry = [future, None, 1]
+        self._calls[key] = entry
+        future.add_done_callback(lambda _: entry.__setitem__(1, time.monotonic()))
+        self.executed += 1
+        return entry, True
+
+    def run(self, key, fn):
+        """
+        Run fn for key from a worker thread, or wait for the identical call already running
+
+        Args:
+            key: Hashable identity of the command
+            fn: Zero-argument callable
+
+        Returns:
+            Any: The shared result
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        with self._lock:
+            entry, leader = self._join(key, Future)
+        future = entry[0]
+
+        if leader:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+        else:
+            print(f"→ Coalesced duplicate command: {key}")
+        return future.result()
+
+    async def run_async(self, key, coro_factory):
+        """
+        Run a coroutine for key on the event loop, or await the identical one already running
+
+        Args:
+            key: Hashable identity of the command
+            coro_factory: Zero-argument callable returning a coroutine
+
+        Returns:
+            Any: The shared result
+        """
+        with self._lock:
+            entry, leader = self._join(key, lambda: asyncio.ensure_future(coro_factory()))
+        task = entry[0]
+
+        if not leader:
+            print(f"→ Coalesced duplicate command: {key}")
+        try:
+            # Shield so one caller timing out doesn't cancel the others' result
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Once every caller has given up, the shared call is cancelled too
+            with self._lock:
+                entry[2] -= 1
+                abandoned = entry[2] == 0
+            if abandoned:
+                task.cancel()
+            raise
+
+    def stats(self):
+        """
+        Get coalescing counters
+
+        Returns:
+            dict: Executions vs duplicates that shared a result
+        """
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": sum(1 for _, finished, _ in self._calls.values() if finished is None)
+            }
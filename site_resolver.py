@@ -0,0 +1,312 @@
+"""
+Site Resolver Module
+Offline resolution of "go to X" destinations from aliases, bookmarks and visit history
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+from config import Config
+
+BUILTIN_ALIASES = {
+    "google": "https://www.google.com",
+    "youtube": "https://www.youtube.com",
+    "gmail": "https://mail.google.com",
+    "google maps": "https://www.google.com/maps",
+    "maps": "https://www.google.com/maps",
+    "google news": "https://news.google.com",
+    "news": "https://news.google.com",
+    "google drive": "https://drive.google.com",
+    "wikipedia": "https://www.wikipedia.org",
+    "github": "https://github.com",
+    "stack overflow": "https://stackoverflow.com",
+    "reddit": "https://www.reddit.com",
+    "facebook": "https://www.facebook.com",
+    "instagram": "https://www.instagram.com",
+    "twitter": "https://x.com",
+    "x": "https://x.com",
+    "linkedin": "https://www.linkedin.com",
+    "amazon": "https://www.amazon.com",
+    "netflix": "https://www.netflix.com",
+    "spotify": "https://open.spotify.com",
+    "bbc": "https://www.bbc.com",
+    "bbc news": "https://www.bbc.com/news",
+    "cnn": "https://www.cnn.com",
+    "weather": "https://weather.com",
+    "nus": "https://www.nus.edu.sg",
+    "national university of singapore": "https://www.nus.edu.sg",
+    "nusmods": "https://nusmods.com",
+    "canvas": "https://canvas.nus.edu.sg",
+}
+
+# Leading verbs and trailing nouns around the destination in a "go to X" command
+COMMAND_PREFIX = re.compile(
+    r"^(?:please )?(?:go to|goto|open|open up|navigate to|take me to|bring me to|bring up|"
+    r"show me|visit|launch|load|browse to|head to|switch to)\s+(?:the\s+)?"
+)
+COMMAND_SUFFIX = re.compile(r"\s+(?:website|web site|site|page|homepage|home page|app)(?: please)?$")
+# Top-level domains opened directly as typed; other "x.y" destinations ("notes.txt",
+# "readme.md" - .md is also Moldova) are matched by name or left to the AI
+KNOWN_TLDS = {
+    "com", "org", "net", "edu", "gov", "mil", "int", "info", "biz", "io", "ai", "app", "dev",
+    "co", "me", "tv", "us", "uk", "sg", "my", "au", "nz", "ca", "de", "fr", "es", "it", "nl",
+    "se", "no", "fi", "dk", "ch", "at", "be", "ie", "jp", "kr", "cn", "tw", "hk", "in", "id",
+    "th", "vn", "ph", "br", "mx", "ar", "za", "ru", "eu", "news", "blog", "shop", "xyz", "tech",
+}
+DOMAIN = re.compile(r"^(?:https?://)?[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}(?:[/?#]\S*)?$")
+
+# History matches are slightly less trusted than names the user set up on purpose
+SOURCE_WEIGHT = {"alias": 1.0, "bookmark": 1.0, "history": 0.9}
+
+
+def _trigrams(text):
+    """Character trigrams of a padded string"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _normalize(text):
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s.:/-]", " ", text.lower())).strip()
+
+
+class SiteResolver:
+    """Fuzzy-matches destination names against aliases, bookmarks and history"""
+
+    def __init__(self, aliases_path=None, history_path=None):
+        """
+        Initialize the resolver and build its trigram index
+
+        Args:
+            aliases_path (str): JSON file with user "aliases" and "bookmarks" (name -> URL)
+            history_path (str): JSON file where visited sites are recorded
+        """
+        self.aliases_path = aliases_path or Config.SITE_ALIASES_PATH
+        self.history_path = history_path or Config.SITE_HISTORY_PATH
+        self.entries = {}  # name -> (url, source)
+        self.index = defaultdict(set)  # trigram -> names
+        self.history = self._load_json(self.history_path)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._save_timer = None
+        self.hits = 0
+        self.misses = 0
+
+        for name, url in BUILTIN_ALIASES.items():
+            self._add(name, url, "alias")
+        user = self._load_json(self.aliases_path)
+        for name, url in user.get("bookmarks", {}).items():
+            self._add(name, url, "bookmark")
+        for name, url in user.get("aliases", {}).items():
+            self._add(name, url, "alias")
+        for url, visit in self.history.items():
+            self._add_history(url, visit.get("title"))
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _load_json(path):
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ [SiteResolver]: Could not read {path} - {str(e)}")
+            return {}
+
+    def _add(self, name, url, source):
+        """Add a name to the index; explicit aliases and bookmarks win over history"""
+        name = _normalize(name)
+        if not name:
+            return
+        existing = self.entries.get(name)
+        if existing and SOURCE_WEIGHT[existing[1]] > SOURCE_WEIGHT[source]:
+            return
+        self.entries[name] = (url, source)
+        for gram in _trigrams(name):
+            self.index[gram].add(name)
+
+    def _add_history(self, url, title=None):
+        """Index a visited URL under its site name and the leading part of its title"""
+        host = urlsplit(url).netloc.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        site = host.split(".")[0] if host else ""
+        home = f"{urlsplit(url).scheme}://{urlsplit(url).netloc}"
+        if site:
+            self._add(site, home, "history")
+            self._add(host, home, "history")
+        if title:
+            name = re.split(r"\s+[-|–—:]\s+", title)[0][:60]
+            self._add(re.sub(r"^the\s+", "", name, flags=re.IGNORECASE), url, "history")
+
+    def add_alias(self, name, url):
+        """
+        Add or replace a user alias and save it
+
+        Args:
+            name (str): Spoken name, e.g. "uni portal"
+            url (str): Destination URL
+        """
+        self._add(name, url, "alias")
+        user = self._load_json(self.aliases_path)
+        user.setdefault("aliases", {})[name] = url
+        self._save_json(self.aliases_path, user)
+
+    def record_visit(self, url, title=None):
+        """
+        Remember a visited page so it can be resolved by name later
+
+        The history file is written by a timer thread at most once per
+        Config.SITE_HISTORY_SAVE_DELAY, so navigations never wait on the disk.
+
+        Args:
+            url (str): Visited URL
+            title (str): Page title
+        """
+        if not url or not url.startswith(("http://", "https://")):
+            return
+        with self._lock:
+            visit = self.history.setdefault(url, {"title": title, "visits": 0})
+            visit["visits"] += 1
+            if title:
+                visit["title"] = title
+            # Keep the most visited pages only
+            if len(self.history) > Config.SITE_HISTORY_MAX:
+                ranked = sorted(self.history.items(), key=lambda item: item[1]["visits"], reverse=True)
+                self.history = dict(ranked[:Config.SITE_HISTORY_MAX])
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(Config.SITE_HISTORY_SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+        self._add_history(url, title)
+
+    def flush(self):
+        """Write visits recorded since the last save to the history file"""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+            if timer is None:
+                return
+            timer.cancel()
+            history = {url: dict(visit) for url, visit in self.history.items()}
+        with self._write_lock:
+            self._save_json(self.history_path, history)
+
+    def visit_count(self, url):
+        """
+        Times a URL was visited
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            int: Recorded visits, 0 if never visited
+        """
+        with self._lock:
+            visit = self.history.get(url)
+            return visit["visits"] if visit else 0
+
+    @staticmethod
+    def _save_json(path, data):
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            print(f"⚠️ [SiteResolver]: Could not write {path} - {str(e)}")
+
+    @staticmethod
+    def extract_destination(command):
+        """
+        Strip the "go to ... website" wrapper from a command
+
+        Args:
+            command (str): User's command
+
+        Returns:
+            str: The destination phrase, e.g. "youtube"
+        """
+        text = _normalize(command)
+        text = COMMAND_PREFIX.sub("", text)
+        return COMMAND_SUFFIX.sub("", text).strip(" .")
+
+    def match(self, destination):
+        """
+        Find the best-matching known name for a destination phrase
+
+        Args:
+            destination (str): Destination phrase
+
+        Returns:
+            tuple: (name, url, source, confidence) or None if nothing shares a trigram
+        """
+        if destination in self.entries:
+            url, source = self.entries[destination]
+            return destination, url, source, SOURCE_WEIGHT[source]
+
+        grams = _trigrams(destination)
+        overlap = defaultdict(int)
+        for gram in grams:
+            for name in self.index.get(gram, ()):
+                overlap[name] += 1
+        best = None
+        for name, shared in overlap.items():
+            url, source = self.entries[name]
+            # Dice coefficient over trigram sets
+            score = 2 * shared / (len(grams) + len(_trigrams(name))) * SOURCE_WEIGHT[source]
+            if best is None or score > best[3]:
+                best = (name, url, source, score)
+        return best
+
+    def resolve(self, command):
+        """
+        Resolve a navigation command without the AI
+
+        Args:
+            command (str): User's command, e.g. "open youtube"
+
+        Returns:
+            dict: {'url', 'description', 'confidence', 'source'} or None if unsure
+        """
+        destination = self.extract_destination(command)
+        if not destination:
+            self.misses += 1
+            return None
+
+        url = destination if destination.startswith(("http://", "https://")) else "https://" + destination
+        if DOMAIN.match(destination) and urlsplit(url).hostname.rsplit(".", 1)[-1] in KNOWN_TLDS:
+            self.hits += 1
+            return {"url": url, "description": f"Opening {destination}", "confidence": 1.0, "source": "url"}
+
+        # "nus mods" should also find "nusmods", "straits times" find "straitstimes"
+        candidates = [self.match(destination), self.match(destination.replace(" ", ""))]
+        candidates = [candidate for candidate in candidates if candidate]
+        best = max(candidates, key=lambda candidate: candidate[3]) if candidates else None
+        if best is None or best[3] < Config.SITE_RESOLVER_MIN_CONFIDENCE:
+            self.misses += 1
+            return None
+
+        name, url, source, confidence = best
+        self.hits += 1
+        return {
+            "url": url,
+            "description": f"Opening {name.title() if len(name) > 3 else name.upper()}",
+            "confidence": round(confidence, 3),
+            "source": source
+        }
+
+    def stats(self):
+        """
+        Get resolver counters
+
+        Returns:
+            dict: Local resolutions vs fall-throughs to the AI, and index size
+        """
+        return {
+            "resolved": self.hits,
+            "fell_through": self.misses,
+            "known_names": len(self.entries)
+        }
@@ -0,0 +1,224 @@
+"""
+Snapshot Store Module
+Bounded store of compressed page snapshots: an in-memory LRU that spills to a memory-mapped ring file
+"""
+
+import mmap
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    import zstandard
+except ImportError:  # optional, zlib is always available
+    zstandard = None
+
+
+class SnapshotStore:
+    """Keeps compressed HTML snapshots under a memory cap, spilling or dropping the least recently used"""
+
+    def __init__(self, max_bytes, codec="auto", spill_path=None, spill_bytes=0):
+        """
+        Initialize the store
+
+        Args:
+            max_bytes (int): Compressed bytes kept in memory
+            codec (str): 'zstd' (needs zstandard), 'zlib', or 'auto' for zstd when installed
+            spill_path (str): Ring file for evicted snapshots, or None to drop them
+            spill_bytes (int): Size of the ring file
+        """
+        self.max_bytes = max_bytes
+        self.codec = self._pick_codec(codec)
+        self._memory = OrderedDict()  # key -> (codec, blob, raw_size)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.spilled = 0
+        self.raw_bytes_in = 0
+        self.compressed_bytes_in = 0
+
+        # Spill tier: key -> (offset, length, codec, raw_size) inside a fixed-size ring file,
+        # created on the first eviction so a store that never fills up costs no disk
+        self._spill = OrderedDict()
+        self._spill_path = spill_path if spill_bytes > 0 else None
+        self._spill_bytes = spill_bytes
+        self._spill_file = None
+        self._spill_map = None
+        self._spill_head = 0
+
+    @staticmethod
+    def _pick_codec(codec):
+        """Resolve the codec name, falling back to zlib if zstandard isn't installed"""
+        if codec in ("auto", "zstd") and zstandard is not None:
+            return "zstd"
+        if codec == "zstd":
+            print("⚠️ [SnapshotStore]: zstandard not installed, using zlib")
+        return "zlib"
+
+    def _compress(self, data):
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return zlib.compress(data, 6)
+
+    @staticmethod
+    def _decompress(codec, blob):
+        if codec == "zstd":
+            return zstandard.ZstdDecompressor().decompress(blob)
+        return zlib.decompress(blob)
+
+    def put(self, key, html):
+        """
+        Store a snapshot, replacing any older one for the key
+
+        Args:
+            key (str): Snapshot key, e.g. the page URL
+            html (str): Page HTML
+        """
+        raw = html.encode("utf-8")
+        blob = self._compress(raw)
+        with self._lock:
+            self._remove(key)
+            self._memory[key] = (self.codec, blob, len(raw))
+            self._memory_bytes += len(blob)
+            self.raw_bytes_in += len(raw)
+            self.compressed_bytes_in += len(blob)
+            self._enforce_cap()
+
+    def get(self, key):
+        """
+        Look up a snapshot in memory, then in the spill file
+
+        Args:
+            key (str): Snapshot key
+
+        Returns:
+            str: Page HTML, or None if it was never stored or has been evicted
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                codec, blob, _ = entry
+            else:
+                located = self._spill.pop(key, None)
+                if located is None:
+                    self.misses += 1
+                    return None
+                offset, length, codec, raw_size = located
+                blob = bytes(self._spill_map[offset:offset + length])
+                self.spill_hits += 1
+                # Promote back to memory, it is likely to be used again soon
+                self._memory[key] = (codec, blob, raw_size)
+                self._memory_bytes += len(blob)
+                self._enforce_cap(keep=key)
+        return self._decompress(codec, blob).decode("utf-8")
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._memory or key in self._spill
+
+    def delete(self, key):
+        """
+        Remove a snapshot
+
+        Args:
+            key (str): Snapshot key
+        """
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        """Drop a key from both tiers (lock held)"""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[1])
+        self._spill.pop(key, None)
+
+    def _enforce_cap(self, keep=None):
+        """Evict least recently used snapshots until memory is under the cap (lock held)"""
+        while self._memory_bytes > self.max_bytes:
+            key = next((k for k in self._memory if k != keep), None)
+            if key is None:
+                break
+            codec, blob, raw_size = self._memory.pop(key)
+            self._memory_bytes -= len(blob)
+            self.evictions += 1
+            self._spill_write(key, codec, blob, raw_size)
+
+    def _open_spill(self):
+        """Create and map the ring file (lock held)"""
+        try:
+            os.makedirs(os.path.dirname(self._spill_path) or ".", exist_ok=True)
+            self._spill_file = open(self._spill_path, "w+b")
+            self._spill_file.truncate(self._spill_bytes)
+            self._spill_map = mmap.mmap(self._spill_file.fileno(), self._spill_bytes)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ [SnapshotStore]: Spill file disabled - {str(e)}")
+            self._close_spill()
+            self._spill_path = None
+
+    def _spill_write(self, key, codec, blob, raw_size):
+        """Append an evicted snapshot to the ring file, overwriting the oldest spilled ones (lock held)"""
+        if self._spill_map is None and self._spill_path:
+            self._open_spill()
+        if self._spill_map is None or len(blob) > len(self._spill_map):
+            return
+        offset = self._spill_head
+        if offset + len(blob) > len(self._spill_map):
+            offset = 0
+        end = offset + len(blob)
+        # Entries in the region about to be overwritten are gone
+        for other, (o_offset, o_length, _, _) in list(self._spill.items()):
+            if o_offset < end and offset < o_offset + o_length:
+                del self._spill[other]
+        self._spill_map[offset:end] = blob
+        self._spill[key] = (offset, len(blob), codec, raw_size)
+        self._spill_head = end
+        self.spilled += 1
+
+    def _close_spill(self):
+        """Release the spill map and file"""
+        if self._spill_map is not None:
+            self._spill_map.close()
+            self._spill_map = None
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        self._spill.clear()
+
+    def close(self):
+        """Release memory and the spill file"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._close_spill()
+            self._spill_path = None
+
+    def stats(self):
+        """
+        Get size and hit counters
+
+        Returns:
+            dict: Entries and bytes per tier, compression ratio, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                "codec": self.codec,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_raw_bytes": sum(raw for _, _, raw in self._memory.values()),
+                "max_bytes": self.max_bytes,
+                "spill_entries": len(self._spill),
+                "spill_bytes": sum(length for _, length, _, _ in self._spill.values()),
+                "compression_ratio": round(self.raw_bytes_in / self.compressed_bytes_in, 2) if self.compressed_bytes_in else None,
+                "hits": self.hits,
+                "spill_hits": self.spill_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "spilled": self.spilled
+            }
@@ -0,0 +1,87 @@
+"""
+Stream Parser Module
+Incremental parser that pulls complete action objects out of a streamed JSON array
+"""
+
+import json
+
+
+class ActionStreamParser:
+    """Emits each top-level object of a JSON array as soon as its closing brace arrives"""
+
+    def __init__(self):
+        """Initialize parser state"""
+        self.started = False   # seen the opening '[' of the array
+        self.finished = False  # seen the closing ']' of the array
+        self.depth = 0         # brace/bracket depth inside the current object
+        self.in_string = False
+        self.escaped = False
+        self.buffer = []
+
+    def feed(self, chunk):
+        """
+        Consume the next piece of streamed text
+
+        Args:
+            chunk (str): Text received from the model
+
+        Returns:
+            list: Action dictionaries completed by this chunk
+
+        Raises:
+            Exception: If a completed object is not valid JSON
+        """
+        completed = []
+        for ch in chunk:
+            if self.finished:
+                break
+
+            if not self.started:
+                # Skip markdown fences or chatter before the array
+                if ch == "[":
+                    self.started = True
+                continue
+
+            if self.depth == 0:
+                # Between objects: only an opening brace or the end of the array matter
+                if ch == "{":
+                    self.depth = 1
+                    self.buffer = [ch]
+                elif ch == "]":
+                    self.finished = True
+                continue
+
+            self.buffer.append(ch)
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    text = "".join(self.buffer)
+                    self.buffer = []
+                    try:
+                        completed.append(json.loads(text))
+                    except json.JSONDecodeError as e:
+                        raise Exception(f"ERROR [ActionStreamParser.feed]: Invalid action object - {str(e)}")
+        return completed
+
+    def close(self):
+        """
+        Check that the stream ended on a complete array
+
+        Raises:
+            Exception: If the array was never opened or an object was left unfinished
+        """
+        if not self.started:
+            raise Exception("ERROR [ActionStreamParser.close]: Response did not contain a JSON array")
+        if self.depth != 0:
+            raise Exception("ERROR [ActionStreamParser.close]: Response ended inside an action object")
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from cache import PersistentLRUCache, normalize_command
+
+
+@pytest.mark.parametrize("command, normalized", [
+    ("  Scroll   DOWN!! ", "scroll down"),
+    ("Open nus.edu.sg.", "open nus.edu.sg"),
+    ("click 'Log in'?", "click log in"),
+])
+def test_normalize_command(command, normalized):
+    assert normalize_command(command) == normalized
+
+
+def test_lru_eviction():
+    cache = PersistentLRUCache("test", max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    cache = PersistentLRUCache("test", max_entries=10, ttl=60)
+    cache.set("short", "x", ttl=0.01)
+    cache.set("long", "y")
+    time.sleep(0.02)
+
+    assert cache.get("short") is None
+    assert cache.get("long") == "y"
+    assert cache.stats()["expirations"] == 1
+
+
+def test_delete_and_clear():
+    cache = PersistentLRUCache("test", max_entries=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert cache.get("b") is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    cache = PersistentLRUCache("plans", max_entries=1, ttl=60, db_path=db_path)
+    cache.set("a", {"steps": [1, 2]})
+    cache.set("b", "two")
+    cache.delete("b")
+    cache.flush()
+
+    assert cache.get("a") == {"steps": [1, 2]}  # evicted from memory, served from disk
+    assert cache.stats()["disk_hits"] == 1
+    cache.close()
+
+    reopened = PersistentLRUCache("plans", max_entries=1, ttl=60, db_path=db_path)
+    assert reopened.get("a") == {"steps": [1, 2]}
+    assert reopened.get("b") is None
+    reopened.close()
+
+
+def test_expired_entries_are_not_reloaded(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    cache = PersistentLRUCache("plans", max_entries=10, ttl=0.01, db_path=db_path)
+    cache.set("a", 1)
+    cache.close()
+    time.sleep(0.02)
+
+    reopened = PersistentLRUCache("plans", max_entries=10, ttl=60, db_path=db_path)
+    assert reopened.get("a") is None
+    reopened.close()
+
+
+def test_unserializable_value_fails_the_caller(tmp_path):
+    cache = PersistentLRUCache("plans", max_entries=10, ttl=60, db_path=str(tmp_path / "cache.db"))
+    with pytest.raises(TypeError):
+        cache.set("a", object())
+    cache.close()
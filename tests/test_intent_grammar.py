@@ -0,0 +1,54 @@
+import pytest
+
+from intent_grammar import LocalIntentParser, MAX_REPEAT
+
+
+@pytest.fixture
+def parser():
+    return LocalIntentParser()
+
+
+def values(actions):
+    return [(action["action"], action.get("value")) for action in actions]
+
+
+@pytest.mark.parametrize("command, expected", [
+    ("scroll down", [("scroll", "down")]),
+    ("Please scroll up twice", [("scroll", "up"), ("scroll", "up")]),
+    ("down 3 times", [("scroll", "down")] * 3),
+    ("go to the top", [("press_key", "Home")]),
+    ("scroll to the bottom of the page", [("press_key", "End")]),
+    ("go back", [("back", None)]),
+    ("forward", [("forward", None)]),
+    ("refresh the page", [("reload", None)]),
+    ("press enter", [("press_key", "Enter")]),
+    ("hit the escape key", [("press_key", "Escape")]),
+    ("wait 2 seconds", [("wait", "2000")]),
+    ("wait for 500ms", [("wait", "500")]),
+    ("open google.com", [("navigate", "https://google.com")]),
+    ("go to https://nus.edu.sg/about", [("navigate", "https://nus.edu.sg/about")]),
+])
+def test_trivial_commands(parser, command, expected):
+    assert values(parser.parse(command)) == expected
+
+
+@pytest.mark.parametrize("command", [
+    "click the login button",
+    "search for cats",
+    "press submit",
+    "open notes.txt",
+    "open readme.md",
+    "press the flux capacitor",
+])
+def test_leaves_other_commands_to_the_ai(parser, command):
+    assert parser.parse(command) is None
+
+
+def test_repeat_count_is_capped(parser):
+    assert len(parser.parse("scroll down 50 times")) == MAX_REPEAT
+
+
+def test_stats(parser):
+    parser.parse("scroll down")
+    parser.parse("click login")
+    assert parser.stats() == {"short_circuited": 1, "sent_to_ai": 1, "short_circuit_rate": 0.5}
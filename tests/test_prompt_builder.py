@@ -0,0 +1,77 @@
+from prompt_builder import PromptBuilder, PromptSection, estimate_tokens
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_fits_without_trimming():
+    sections = [PromptSection("a", "hello"), PromptSection("b", "world")]
+    prompt, report = PromptBuilder(100).build(sections)
+    assert prompt == "hello\n\nworld"
+    assert report["trimmed"] == []
+    assert report["tokens"] == estimate_tokens(prompt)
+
+
+def test_trims_lowest_priority_first_from_the_end():
+    elements = "\n".join(f"element {i:03d} in view" for i in range(50))
+    sections = [
+        PromptSection("instructions", "x" * 200, required=True),
+        PromptSection("history", "older step\n" * 10, priority=80),
+        PromptSection("elements", elements, priority=10),
+        PromptSection("command", "click login", required=True),
+    ]
+    prompt, report = PromptBuilder(150).build(sections)
+
+    assert report["trimmed"] == ["elements"]
+    assert report["tokens"] <= 150
+    assert "element 000 in view" in prompt
+    assert "element 049 in view" not in prompt
+    assert sections[2].text.endswith("... (trimmed)")
+    assert sections[1].text == "older step\n" * 10
+
+
+def test_drops_sections_that_cannot_fit_and_keeps_required_ones():
+    sections = [
+        PromptSection("instructions", "x" * 400, required=True),
+        PromptSection("extra", "y" * 400, priority=10),
+        PromptSection("context", "z" * 400, priority=20),
+    ]
+    prompt, report = PromptBuilder(120).build(sections)
+
+    assert report["trimmed"] == ["extra", "context"]
+    assert report["sections"]["instructions"] == 100
+    assert report["sections"]["extra"] == 0
+    assert prompt.startswith("x" * 400)
+    assert "y" not in prompt
+
+
+def test_separators_count_against_the_budget():
+    sections = [
+        PromptSection("instructions", "x" * 40, required=True),
+        PromptSection("context", "\n".join("y" * 9 for _ in range(8)), priority=10),
+        PromptSection("command", "z" * 38, required=True),
+    ]
+    # 40 + 79 + 38 characters fit in 40 tokens alone, but not with the two "\n\n" joins
+    prompt, report = PromptBuilder(40).build(sections)
+
+    assert report["trimmed"] == ["context"]
+    assert len(prompt) <= 40 * 4
+    assert report["tokens"] <= 40
+
+
+def test_history_keeps_the_newest_commands():
+    from collections import deque
+    from ai_agent import AIAgent
+
+    agent = AIAgent.__new__(AIAgent)
+    agent.history = deque(f'"cmd{i}" -> Scroll down' for i in range(10))
+    sections = [PromptSection("command", "c" * 40, required=True), agent._history_section()]
+    prompt, report = PromptBuilder(40).build(sections)
+
+    assert report["trimmed"] == ["history"]
+    assert "cmd9" in prompt
+    assert "cmd0" not in prompt
+    assert report["tokens"] <= 40
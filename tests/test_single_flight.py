@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_duplicates_share_one_call():
+    flight = SingleFlight(window=0)
+    calls = []
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        release.wait(2)
+        return "done"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.run("k", work))) for _ in range(4)]
+    threads[0].start()
+    while not calls:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    while flight.stats()["coalesced"] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["done"] * 4
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_window_shares_recent_result_then_expires():
+    flight = SingleFlight(window=0.05)
+    assert flight.run("k", lambda: 1) == 1
+    assert flight.run("k", lambda: 2) == 1
+    time.sleep(0.1)
+    assert flight.run("k", lambda: 3) == 3
+    assert flight.run("other", lambda: 4) == 4
+    assert flight.stats()["executed"] == 3
+
+
+def test_exception_is_shared():
+    flight = SingleFlight(window=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.run("k", fail)
+    with pytest.raises(ValueError):
+        flight.run("k", lambda: "unused")
+
+
+def test_async_duplicates_share_one_coroutine():
+    flight = SingleFlight(window=0)
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def main():
+        return await asyncio.gather(*(flight.run_async("k", work) for _ in range(3)))
+
+    assert asyncio.run(main()) == ["done"] * 3
+    assert len(calls) == 1
+    assert flight.stats()["coalesced"] == 2
+
+
+def test_async_call_survives_one_cancelled_waiter():
+    flight = SingleFlight(window=0)
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.run_async("k", work))
+        second = asyncio.ensure_future(flight.run_async("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
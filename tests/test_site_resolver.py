@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from site_resolver import SiteResolver
+
+
+@pytest.fixture
+def resolver(tmp_path):
+    aliases = tmp_path / "aliases.json"
+    aliases.write_text(json.dumps({
+        "aliases": {"uni portal": "https://portal.example.edu"},
+        "bookmarks": {"straits times": "https://www.straitstimes.com"}
+    }))
+    return SiteResolver(str(aliases), str(tmp_path / "history.json"))
+
+
+@pytest.mark.parametrize("command, destination", [
+    ("open youtube", "youtube"),
+    ("go to the nusmods website", "nusmods"),
+    ("Navigate to Uni Portal page", "uni portal"),
+    ("visit github.com/foo", "github.com/foo"),
+])
+def test_extract_destination(command, destination):
+    assert SiteResolver.extract_destination(command) == destination
+
+
+def test_builtin_alias(resolver):
+    result = resolver.resolve("open youtube")
+    assert result["url"] == "https://www.youtube.com"
+    assert result["source"] == "alias"
+
+
+def test_user_alias_and_bookmark(resolver):
+    assert resolver.resolve("go to uni portal")["url"] == "https://portal.example.edu"
+    assert resolver.resolve("open the straits times website")["source"] == "bookmark"
+
+
+def test_spacing_variant(resolver):
+    assert resolver.resolve("open nus mods")["url"] == "https://nusmods.com"
+
+
+def test_typo_matches_fuzzily(resolver):
+    result = resolver.resolve("open youtub")
+    assert result["url"] == "https://www.youtube.com"
+    assert result["confidence"] < 1.0
+
+
+def test_typed_domain(resolver):
+    result = resolver.resolve("open github.com/foo")
+    assert result == {"url": "https://github.com/foo", "description": "Opening github.com/foo",
+                      "confidence": 1.0, "source": "url"}
+
+
+@pytest.mark.parametrize("command", ["open notes.txt", "open zzqqxx", "open"])
+def test_unknown_destinations_are_left_to_the_ai(resolver, command):
+    assert resolver.resolve(command) is None
+
+
+def test_history_is_recorded_and_reloaded(resolver, tmp_path):
+    resolver.record_visit("https://www.example.org/docs", "Example Docs - Guides")
+    resolver.record_visit("https://www.example.org/docs")
+    assert resolver.visit_count("https://www.example.org/docs") == 2
+    resolver.flush()
+
+    reloaded = SiteResolver(resolver.aliases_path, resolver.history_path)
+    result = reloaded.resolve("open example")
+    assert result["url"] == "https://www.example.org"
+    assert result["source"] == "history"
+    assert reloaded.resolve("open example docs")["url"] == "https://www.example.org/docs"
+
+
+def test_visits_are_written_later_in_one_go(resolver, monkeypatch):
+    writes = []
+    monkeypatch.setattr(SiteResolver, "_save_json", staticmethod(lambda path, data: writes.append(data)))
+    resolver.record_visit("https://a.example.com/")
+    resolver.record_visit("https://b.example.com/")
+    assert writes == []
+
+    resolver.flush()
+    resolver.flush()
+    assert len(writes) == 1
+    assert set(writes[0]) == {"https://a.example.com/", "https://b.example.com/"}
+
+
+def test_add_alias_is_saved(resolver):
+    resolver.add_alias("mail", "https://mail.example.com")
+    reloaded = SiteResolver(resolver.aliases_path, resolver.history_path)
+    assert reloaded.resolve("open mail")["url"] == "https://mail.example.com"
+    assert reloaded.resolve("go to uni portal")["url"] == "https://portal.example.edu"
@@ -0,0 +1,61 @@
+import pytest
+
+from stream_parser import ActionStreamParser
+
+
+def feed_all(parser, chunks):
+    actions = []
+    for chunk in chunks:
+        actions.extend(parser.feed(chunk))
+    return actions
+
+
+def test_emits_each_object_as_soon_as_it_closes():
+    parser = ActionStreamParser()
+    assert parser.feed('[{"action": "click", "selector": "#a"}, {"act') == [{"action": "click", "selector": "#a"}]
+    assert parser.feed('ion": "scroll", "value": "down"}]') == [{"action": "scroll", "value": "down"}]
+    parser.close()
+
+
+def test_skips_markdown_fence_and_chatter():
+    parser = ActionStreamParser()
+    text = 'Sure, here you go:\n```json\n[{"action": "back"}]\n```\nAnything else?'
+    assert feed_all(parser, text) == [{"action": "back"}]
+    parser.close()
+
+
+def test_braces_and_escaped_quotes_inside_strings():
+    parser = ActionStreamParser()
+    text = r'[{"action": "type", "selector": "input[name=\"q\"]", "value": "a {b} ] \\"}]'
+    assert feed_all(parser, text) == [{"action": "type", "selector": 'input[name="q"]', "value": "a {b} ] \\"}]
+
+
+def test_nested_values():
+    parser = ActionStreamParser()
+    actions = feed_all(parser, '[{"action": "x", "meta": {"keys": [1, {"a": 2}]}}]')
+    assert actions == [{"action": "x", "meta": {"keys": [1, {"a": 2}]}}]
+
+
+def test_ignores_text_after_the_array():
+    parser = ActionStreamParser()
+    assert feed_all(parser, '[{"action": "reload"}] [{"action": "back"}]') == [{"action": "reload"}]
+
+
+def test_truncated_object_fails_on_close():
+    parser = ActionStreamParser()
+    assert feed_all(parser, '[{"action": "click"}, {"action": "ty') == [{"action": "click"}]
+    with pytest.raises(Exception, match="inside an action object"):
+        parser.close()
+
+
+def test_missing_array_fails_on_close():
+    parser = ActionStreamParser()
+    assert parser.feed("I can't do that.") == []
+    with pytest.raises(Exception, match="did not contain a JSON array"):
+        parser.close()
+
+
+def test_invalid_object_raises():
+    parser = ActionStreamParser()
+    with pytest.raises(Exception, match="Invalid action object"):
+        parser.feed("[{'action': 'click'}]")
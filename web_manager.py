@@ -4,10 +4,27 @@ Handles browser automation using Playwright
 """
 
 import asyncio
+import threading
 from playwright.async_api import async_playwright
 from config import Config
 from html_templates import get_overlay_script
+from page_scripts import (
+    get_structure_fingerprint_script,
+    get_selector_check_script,
+    get_element_index_script,
+    get_snapshot_agent_script,
+    get_snapshot_since_script,
+    get_restore_script
+)
 from actions import BrowserActions, ActionExecutor
+from context_pool import BrowserContextPool
+from readiness import ReadinessEngine
+from locator import LocatorResolver
+from resource_profiles import ResourceInterceptor, profile_for_mode
+from snapshot_store import SnapshotStore
+from content_extractor import ContentExtractor
+from browser_profile import ProfileManager
+from prefetch import PrefetchPool
 
 class WebManager:
     """Manages browser instance and page interactions"""
@@ -18,9 +35,42 @@ class WebManager:
         self.browser = None
         self.context = None
         self.loop = None
-        self.original_html = {}
+        # Original HTML of simplified pages, compressed and capped so long sessions stay flat
+        self.snapshots = SnapshotStore(
+            Config.SNAPSHOT_MEMORY_BYTES,
+            Config.SNAPSHOT_CODEC,
+            Config.SNAPSHOT_SPILL_PATH,
+            Config.SNAPSHOT_SPILL_BYTES
+        )
+        self.content_extractor = ContentExtractor()
+        self.capture = None  # In-memory captures of the main page, created after browser starts
+        self.screencast = None  # Shared by every /screencast viewer
+        self.screencast_viewers = 0
+        self.profile = ProfileManager(
+            Config.PROFILE_ROOT,
+            Config.PROFILE_MAX_AGE_DAYS,
+            Config.PROFILE_MAX_BYTES,
+            Config.PROFILE_KEEP
+        ) if Config.PERSISTENT_PROFILE else None
+        self.prefetch = None  # Background tabs with likely next pages, created after browser starts
+        self.visit_count = lambda url: 0  # Set by the controller from the site resolver's history
+        self._own_navigations = 0  # navigate()/follow_link() calls in progress, which refill the pool themselves
         self.playwright_instance = None
         self.action_executor = None  # Will be initialized after browser starts
+        self.pool = None  # Isolated per-session contexts, created after browser starts
+        # Set once the background loop has a browser (or failed to start one)
+        self.ready = threading.Event()
+        self.startup_error = None
+        self._loop_thread = None
+        self._start_lock = threading.Lock()
+        # Python-side mirror of the in-page element snapshot agent
+        self.element_snapshot = {"id": None, "version": None, "entries": {}, "order": []}
+        self.snapshot_stats = {"full": 0, "delta": 0, "unchanged": 0}
+        # Shared by the main page and pooled sessions so timings are reported together
+        self.readiness = ReadinessEngine()
+        self.locator = LocatorResolver()
+        # Blocks heavy resources per profile in the main context and every pooled one
+        self.resources = ResourceInterceptor(profile_for_mode(Config.INTERACTION_MODE))
         print("✓ WebManager initialized")
     
     async def start_browser(self):
@@ -36,38 +86,150 @@ class WebManager:
             # Start Playwright
             self.playwright_instance = await async_playwright().start()
             
-            # Launch browser with custom flags
-            self.browser = await self.playwright_instance.chromium.launch(
-                headless=Config.BROWSER_HEADLESS,
-                args=Config.BROWSER_ARGS
-            )
-            
             # Create context with HTTPS error handling
-            self.context = await self.browser.new_context(ignore_https_errors=True)
-            self.page = await self.context.new_page()
+            context_options = {"ignore_https_errors": True}
             
-            # Set up page load event listener
-            self.page.on("load", lambda: asyncio.create_task(self._on_page_load()))
+            if self.profile:
+                # The main page keeps its profile on disk; pooled sessions stay throwaway
+                # and get a regular browser the first time one is needed
+                self.context = await self.playwright_instance.chromium.launch_persistent_context(
+                    self.profile.prepare(),
+                    headless=Config.BROWSER_HEADLESS,
+                    args=Config.BROWSER_ARGS + [f"--disk-cache-size={Config.PROFILE_DISK_CACHE_BYTES}"],
+                    **context_options
+                )
+                print(f"✓ Using persistent profile {self.profile.active}")
+            else:
+                # Launch browser with custom flags
+                await self._launch_browser()
+                self.context = await self.browser.new_context(**context_options)
+            await self.resources.attach(self.context)
+            
+            # Install the element snapshot agent at document start in every top-level page
+            init_scripts = [f"if (window.top === window) ({get_snapshot_agent_script()})();"]
+            for script in init_scripts:
+                await self.context.add_init_script(script=script)
+            # The control overlay only belongs to the main page, not to pooled sessions.
+            # It re-attaches itself on navigations, so there's no load handler to race.
+            await self.context.add_init_script(script=get_overlay_script())
+            # A persistent context opens with a blank page already
+            self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+            
+            # Extra sessions get their own isolated contexts in the same Chromium process
+            self.pool = BrowserContextPool(self._launch_browser, context_options, init_scripts,
+                                           self.readiness, self.resources, self.locator)
+            self.pool.start_reaper()
             
             # Initialize action executor with the page
-            browser_actions = BrowserActions(self.page)
+            browser_actions = BrowserActions(self.page, self.readiness, self.locator)
             self.action_executor = ActionExecutor(browser_actions)
+            self.capture = browser_actions.capture
+            
+            if Config.PREFETCH_LINKS:
+                self.prefetch = PrefetchPool(self.context, lambda url: self.visit_count(url))
+                browser_actions.navigate_hook = self.navigate
+                browser_actions.follow_link_hook = self.follow_link
+                self.page.on("framenavigated", self._on_frame_navigated)
             
             print("✓ Browser started successfully")
             
         except Exception as e:
             raise Exception(f"ERROR [WebManager.start_browser]: Failed to start browser - {str(e)}")
     
-    async def _on_page_load(self):
-        """Called automatically when page loads"""
+    async def _launch_browser(self):
+        """
+        Launch the regular (non-persistent) browser once and return it
+        
+        Returns:
+            Browser: Playwright browser for throwaway contexts
+        """
+        if self.browser is None:
+            self.browser = await self.playwright_instance.chromium.launch(
+                headless=Config.BROWSER_HEADLESS,
+                args=Config.BROWSER_ARGS
+            )
+        return self.browser
+    
+    def start_in_background(self):
+        """
+        Start the browser event loop thread and launch the browser on it.
+        Safe to call repeatedly; only the first call starts anything.
+        """
+        with self._start_lock:
+            if self._loop_thread is not None:
+                return
+            print("→ Pre-warming browser in the background")
+            self.loop = asyncio.new_event_loop()
+            
+            def run_loop():
+                """Run the browser event loop for the lifetime of the server"""
+                asyncio.set_event_loop(self.loop)
+                self.loop.create_task(self._warm_start())
+                self.loop.run_forever()
+            
+            self._loop_thread = threading.Thread(target=run_loop, name="browser-loop", daemon=True)
+            self._loop_thread.start()
+    
+    async def _warm_start(self):
+        """Launch the browser and signal readiness either way"""
         try:
-            await asyncio.sleep(0.3)
-            await self._inject_overlay()
+            self.startup_error = None
+            await self.start_browser()
         except Exception as e:
-            print(f"ERROR [WebManager._on_page_load]: Failed to inject overlay - {str(e)}")
+            self.startup_error = e
+            print(f"ERROR [WebManager._warm_start]: {str(e)}")
+            await self._discard_partial_start()
+        finally:
+            self.ready.set()
+    
+    async def _discard_partial_start(self):
+        """Shut down whatever a failed start_browser got running, so a retry starts clean"""
+        if self.pool:
+            try:
+                await self.pool.close()
+            except Exception:
+                pass
+        for resource, close in ((self.context, "close"), (self.browser, "close"), (self.playwright_instance, "stop")):
+            if resource is not None:
+                try:
+                    await getattr(resource, close)()
+                except Exception:
+                    pass
+        self.pool = self.context = self.browser = self.playwright_instance = None
+        self.page = self.action_executor = self.capture = self.prefetch = None
+    
+    def ensure_ready(self, timeout=None):
+        """
+        Block the calling thread until the browser is ready, starting it if needed
+        
+        Args:
+            timeout (float): Seconds to wait, defaults to Config.BROWSER_STARTUP_TIMEOUT
+            
+        Raises:
+            Exception: If the browser failed to start or isn't ready in time
+        """
+        timeout = Config.BROWSER_STARTUP_TIMEOUT if timeout is None else timeout
+        self.start_in_background()
+        if not self.ready.wait(timeout):
+            raise Exception(f"ERROR [WebManager.ensure_ready]: Browser not ready after {timeout}s")
+        error = self.startup_error
+        if error is not None:
+            with self._start_lock:
+                # Let the next caller retry the launch; ready stays clear while it
+                # runs, so concurrent callers that saw the same failure share one retry
+                if self.startup_error is error and self.ready.is_set():
+                    self.ready.clear()
+                    asyncio.run_coroutine_threadsafe(self._warm_start(), self.loop)
+            raise Exception(f"ERROR [WebManager.ensure_ready]: Browser failed to start - {str(error)}")
     
     async def _inject_overlay(self):
-        """Inject the AI control overlay into the current page"""
+        """
+        Re-attach the AI control overlay to the current page
+        
+        Only needed when the document was replaced without a navigation
+        (set_content), since the init script handles everything else. The
+        script is idempotent, so calling this on a page that has it is a no-op.
+        """
         try:
             overlay_script = get_overlay_script()
             await self.page.evaluate(overlay_script)
@@ -75,91 +237,173 @@ class WebManager:
         except Exception as e:
             raise Exception(f"ERROR [WebManager._inject_overlay]: Failed to inject overlay - {str(e)}")
     
-    async def get_page_context(self):
+    async def get_page_context(self, session=None):
         """
         Get current page information for AI
         
+        Args:
+            session (BrowserSession): Pooled session to inspect, defaults to the main page
+            
         Returns:
-            dict: Page context with url, title, and html
+            dict: Page context with url, title, and the interactive element index
             
         Raises:
             Exception: If page access fails
         """
         try:
-            url = self.page.url
-            title = await self.page.title()
-            html = await self.page.content()
+            target = session or self
+            url = target.page.url
+            title = await target.page.title()
+            # Only elements changed since the last command cross CDP
+            elements = await self._get_element_snapshot(target)
             
             return {
                 "url": url,
                 "title": title,
-                "html": html
+                "elements": elements
             }
         except Exception as e:
             raise Exception(f"ERROR [WebManager.get_page_context]: Failed to get page context - {str(e)}")
     
-    async def execute_actions(self, actions):
+    async def _get_element_snapshot(self, target):
+        """
+        Bring the element index up to date from the in-page snapshot agent
+        
+        Args:
+            target: WebManager or BrowserSession whose page and snapshot mirror to use
+            
+        Returns:
+            list: Element index entries, viewport first, with their index
+        """
+        page = target.page
+        snapshot = target.element_snapshot
+        args = [snapshot["id"], snapshot["version"], Config.ELEMENT_INDEX_MAX]
+        try:
+            delta = await page.evaluate(get_snapshot_since_script(), args)
+            if delta is None:
+                # Page predates the init script (e.g. set_content), install on demand
+                await page.evaluate(get_snapshot_agent_script())
+                delta = await page.evaluate(get_snapshot_since_script(), args)
+        except Exception as e:
+            print(f"ERROR [WebManager._get_element_snapshot]: Falling back to full extraction - {str(e)}")
+            return await page.evaluate(get_element_index_script(), Config.ELEMENT_INDEX_MAX)
+        
+        if delta["full"]:
+            snapshot["entries"] = {}
+            self.snapshot_stats["full"] += 1
+        elif delta["upserts"] or delta["removed"] or delta["order"] is not None:
+            self.snapshot_stats["delta"] += 1
+        else:
+            self.snapshot_stats["unchanged"] += 1
+        
+        for entry in delta["upserts"]:
+            snapshot["entries"][entry.pop("key")] = entry
+        for key in delta["removed"]:
+            snapshot["entries"].pop(key, None)
+        if delta["order"] is not None:
+            snapshot["order"] = delta["order"]
+        snapshot["id"] = delta["id"]
+        snapshot["version"] = delta["version"]
+        
+        print(f"✓ Element snapshot v{delta['version']}: "
+              f"{'full' if delta['full'] else 'delta'} +{len(delta['upserts'])} -{len(delta['removed'])}")
+        return [
+            dict(snapshot["entries"][key], index=index)
+            for index, key in enumerate(snapshot["order"])
+            if key in snapshot["entries"]
+        ]
+    
+    async def get_structure_fingerprint(self, session=None):
+        """
+        Hash the structural template of the current page
+        
+        Args:
+            session (BrowserSession): Pooled session to inspect, defaults to the main page
+            
+        Returns:
+            str: Fingerprint hex string, or None if the page can't be inspected
+        """
+        try:
+            return await (session or self).page.evaluate(get_structure_fingerprint_script())
+        except Exception as e:
+            print(f"ERROR [WebManager.get_structure_fingerprint]: {str(e)}")
+            return None
+    
+    async def check_selectors(self, checks, session=None):
+        """
+        Check that selectors still resolve on the current page
+        
+        Args:
+            checks (list): [selector, allow_text] pairs
+            session (BrowserSession): Pooled session to inspect, defaults to the main page
+            
+        Returns:
+            bool: True if every selector resolves
+        """
+        if not checks:
+            return True
+        try:
+            results = await (session or self).page.evaluate(get_selector_check_script(), checks)
+            return all(results)
+        except Exception as e:
+            print(f"ERROR [WebManager.check_selectors]: {str(e)}")
+            return False
+    
+    async def execute_actions(self, actions, session=None):
         """
         Execute a list of actions on the page
         
         Args:
             actions (list): List of action dictionaries from AI
+            session (BrowserSession): Pooled session to act on, defaults to the main page
             
         Returns:
             bool: True if all actions succeeded, False otherwise
         """
         try:
-            return await self.action_executor.execute(actions)
+            return await (session or self).action_executor.execute(actions)
         except Exception as e:
             print(f"ERROR [WebManager.execute_actions]: {str(e)}")
             return False
     
+    async def execute_action_stream(self, action_stream, session=None):
+        """
+        Execute actions on the page as they stream in from the AI
+        
+        Args:
+            action_stream: Async iterator of action dictionaries
+            session (BrowserSession): Pooled session to act on, defaults to the main page
+            
+        Returns:
+            bool: True if all actions succeeded, False otherwise
+        """
+        try:
+            return await (session or self).action_executor.execute_stream(action_stream)
+        except Exception as e:
+            print(f"ERROR [WebManager.execute_action_stream]: {str(e)}")
+            return False
+    
     async def simplify_page(self):
         """
-        Simplify the current page by removing unnecessary elements
+        Simplify the current page to its main content
+        
+        Switches to an in-page reader view built around the highest-scoring
+        content node (cached per URL and content hash) that only hides nodes, so
+        restoring is an instant toggle. Falls back to rewriting the page (with an HTML snapshot
+        for restore) if the in-page view can't be applied.
         
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            url = self.page.url
-            
-            # Store original HTML
-            if url not in self.original_html:
-                self.original_html[url] = await self.page.content()
-            
-            # Simplification script
-            simplify_script = """
-            (function() {
-                // Remove common clutter
-                const selectorsToRemove = [
-                    'script', 'style', 'iframe', 'noscript',
-                    '[role="banner"]', '[role="navigation"]',
-                    'header', 'footer', 'nav', 'aside',
-                    '.advertisement', '.ads', '.cookie-banner',
-                    '.popup', '.modal', '.sidebar'
-                ];
-                
-                selectorsToRemove.forEach(selector => {
-                    document.querySelectorAll(selector).forEach(el => el.remove());
-                });
-                
-                // Keep only main content
-                const main = document.querySelector('main, article, [role="main"], .content, #content');
-                if (main) {
-                    document.body.innerHTML = main.outerHTML;
-                }
-                
-                // Apply clean styling
-                document.body.style.cssText = `
-                    max-width: 800px; margin: 0 auto; padding: 20px;
-                    font-family: Georgia, serif; font-size: 18px;
-                    line-height: 1.6; background: white; color: #333;
-                `;
-            })();
-            """
-            
-            await self.page.evaluate(simplify_script)
+            if await self.content_extractor.simplify(self.page):
+                print("✓ Page simplified")
+                return True
+        except Exception as e:
+            print(f"⚠️ [WebManager.simplify_page]: In-page simplify failed, rewriting the page - {str(e)}")
+        
+        try:
+            await self._simplify_destructive()
             print("✓ Page simplified")
             return True
             
@@ -167,6 +411,47 @@ class WebManager:
             print(f"ERROR [WebManager.simplify_page]: Simplification failed - {str(e)}")
             return False
     
+    async def _simplify_destructive(self):
+        """Remove clutter from the page for good, keeping the original HTML for restore"""
+        url = self.page.url
+        
+        # Store original HTML
+        if url not in self.snapshots:
+            self.snapshots.put(url, await self.page.content())
+        
+        # Simplification script
+        simplify_script = """
+        (function() {
+            // Remove common clutter
+            const selectorsToRemove = [
+                'script', 'style', 'iframe', 'noscript',
+                '[role="banner"]', '[role="navigation"]',
+                'header', 'footer', 'nav', 'aside',
+                '.advertisement', '.ads', '.cookie-banner',
+                '.popup', '.modal', '.sidebar'
+            ];
+            
+            selectorsToRemove.forEach(selector => {
+                document.querySelectorAll(selector).forEach(el => el.remove());
+            });
+            
+            // Keep only main content
+            const main = document.querySelector('main, article, [role="main"], .content, #content');
+            if (main) {
+                document.body.innerHTML = main.outerHTML;
+            }
+            
+            // Apply clean styling
+            document.body.style.cssText = `
+                max-width: 800px; margin: 0 auto; padding: 20px;
+                font-family: Georgia, serif; font-size: 18px;
+                line-height: 1.6; background: white; color: #333;
+            `;
+        })();
+        """
+        
+        await self.page.evaluate(simplify_script)
+    
     async def restore_original_html(self):
         """
         Restore the page to its original state
@@ -175,13 +460,21 @@ class WebManager:
             bool: True if successful, False if no original found
         """
         try:
+            # Leaving the in-page reader view keeps scroll position and form state
+            if await self.page.evaluate(get_restore_script()):
+                print("✓ Page restored to original state")
+                return True
+            
             url = self.page.url
             
-            if url not in self.original_html:
+            html = self.snapshots.get(url)
+            if html is None:
                 print("✗ No original HTML to restore")
                 return False
             
-            await self.page.set_content(self.original_html[url])
+            await self.page.set_content(html)
+            self.snapshots.delete(url)
+            await self._inject_overlay()
             print("✓ Page restored to original state")
             return True
             
@@ -189,13 +482,129 @@ class WebManager:
             print(f"ERROR [WebManager.restore_original_html]: Restore failed - {str(e)}")
             return False
     
+    async def navigate(self, url, ready=None):
+        """
+        Navigate the main page, using a prefetched tab when one matches
+        
+        Args:
+            url (str): URL to navigate to
+            ready (str): Readiness strategy, defaults to Config.NAVIGATION_READINESS
+        """
+        self._own_navigations += 1
+        try:
+            if not await self._use_prefetched(url):
+                await self.readiness.navigate(self.page, url, ready)
+        finally:
+            self._own_navigations -= 1
+        if self.prefetch:
+            self.prefetch.schedule(self.page)
+    
+    async def follow_link(self, url):
+        """
+        Open a clicked link's target from its prefetched tab instead of loading it again
+        
+        Args:
+            url (str): Where the clicked link points
+            
+        Returns:
+            bool: True if a prefetched tab was promoted, False if the click should go ahead
+        """
+        self._own_navigations += 1
+        try:
+            if not await self._use_prefetched(url):
+                return False
+        finally:
+            self._own_navigations -= 1
+        self.prefetch.schedule(self.page)
+        return True
+    
+    async def _use_prefetched(self, url):
+        """Promote the prefetched tab for a URL, if the pool has one loaded"""
+        prefetched = await self.prefetch.take(url) if self.prefetch else None
+        if prefetched is None:
+            return False
+        await self._bind_page(prefetched)
+        return True
+    
+    def _on_frame_navigated(self, frame):
+        """Drop the prefetched tabs when the main page navigates by itself (e.g. after a click)"""
+        if frame == self.page.main_frame and self.prefetch and not self._own_navigations:
+            self.prefetch.discard()
+    
+    async def _bind_page(self, page):
+        """
+        Make another tab of the main context the active page and close the old one
+        
+        Args:
+            page: Playwright page to promote
+        """
+        old_page = self.page
+        self.page = page
+        if self.prefetch:
+            old_page.remove_listener("framenavigated", self._on_frame_navigated)
+            page.on("framenavigated", self._on_frame_navigated)
+        self.action_executor.actions.bind(page)
+        self.capture = self.action_executor.actions.capture
+        # The mirror belongs to the old page's snapshot agent
+        self.element_snapshot = {"id": None, "version": None, "entries": {}, "order": []}
+        if self.screencast is not None:
+            # Viewers are streaming the old page's CDP session
+            await self.screencast.stop()
+            self.screencast = None
+            self.screencast_viewers = 0
+        await page.bring_to_front()
+        await old_page.close()
+    
+    async def capture_screenshot(self, **options):
+        """
+        Capture the main page into memory
+        
+        Args:
+            **options: format, quality, scale, clip, full_page (see PageCapture.capture)
+            
+        Returns:
+            bytes: Encoded image
+        """
+        return await self.capture.capture(**options)
+    
+    async def start_screencast(self):
+        """
+        Join the main page's screencast, starting it for the first viewer
+        
+        Returns:
+            Screencast: The shared screencast
+        """
+        if self.screencast is None:
+            screencast = self.capture.screencast()
+            await screencast.start()
+            self.screencast = screencast
+        self.screencast_viewers += 1
+        return self.screencast
+    
+    async def stop_screencast(self):
+        """Leave the screencast, stopping it when the last viewer leaves"""
+        self.screencast_viewers = max(0, self.screencast_viewers - 1)
+        if self.screencast_viewers == 0 and self.screencast is not None:
+            await self.screencast.stop()
+            self.screencast = None
+    
     async def close(self):
         """Close the browser and cleanup"""
         try:
+            if self.screencast is not None:
+                await self.screencast.stop()
+            if self.prefetch:
+                await self.prefetch.clear()
+            if self.pool:
+                await self.pool.close()
+            if self.profile and self.context:
+                # Closing a persistent context flushes the profile to disk
+                await self.context.close()
             if self.browser:
                 await self.browser.close()
             if self.playwright_instance:
                 await self.playwright_instance.stop()
+            self.snapshots.close()
             print("✓ Browser closed")
         except Exception as e:
             print(f"ERROR [WebManager.close]: Cleanup failed - {str(e)}")
\ No newline at end of file